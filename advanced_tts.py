@@ -4,24 +4,44 @@ Gelişmiş TTS Özellikleri
 - Gelişmiş kontroller
 - Ses karıştırma
 """
-from TTS.api import TTS
-import torch
-from pydub import AudioSegment
 import os
+import json
+import inspect
 import numpy as np
 import soundfile as sf
 
+from model_registry import get_model, default_device
+from audio_dsp import time_stretch_wsola, StyleProcessor
+from tts_engine import M1OptimizedTTS
+from reference_clip import ensure_reference_clip
+
 
 class AdvancedTTS:
     """Gelişmiş TTS özellikleri"""
     
     def __init__(self, voice_sample_path: str):
-        self.device = "cpu"
+        self.device = default_device()
         self.voice_sample = voice_sample_path
         
-        print("📥 XTTS v2 modeli yükleniyor (Gelişmiş Özellikler)...")
-        self.tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(self.device)
-        print("✅ Model yüklendi!")
+        # Model kayıttan paylaşılır; M1OptimizedTTS ile aynı kopya kullanılır
+        self.model = get_model(device=self.device)
+        self._engine = None
+    
+    @property
+    def tts(self):
+        """Paylaşılan Coqui TTS nesnesi (kayıttan atıldıysa yeniden istenir)"""
+        tts = self.model.tts
+        while tts is None:
+            self.model = get_model(self.model.model_id, self.model.device)
+            tts = self.model.tts
+        return tts
+    
+    def _latent_engine(self) -> M1OptimizedTTS:
+        """Latent tabanlı motor (karışık sesler için, ilk kullanımda oluşturulur)"""
+        if self._engine is None:
+            self._engine = M1OptimizedTTS(self.voice_sample, use_progress_bar=False,
+                                          use_conditioning_bank=False)
+        return self._engine
     
     def generate_with_style(
         self,
@@ -49,58 +69,45 @@ class AdvancedTTS:
             print(f"   🎭 Duygu: {emotion}")
             print(f"   🎵 Ton: {pitch_shift:+d}")
             
-            # Temel TTS üretimi
-            temp_output = output_path.replace('.wav', '_temp.wav')
-            
-            self.tts.tts_to_file(
-                text=text,
-                speaker_wav=self.voice_sample,
-                language="tr",
-                file_path=temp_output
-            )
-            
-            # Ses dosyasını yükle
-            audio = AudioSegment.from_wav(temp_output)
-            
-            # HIZ AYARI
-            if speed != 1.0:
-                print(f"   ⚡ Hız ayarlanıyor: {speed}x")
-                # Hızı değiştir (frame rate manipülasyonu)
-                new_sample_rate = int(audio.frame_rate * speed)
-                audio = audio._spawn(audio.raw_data, overrides={
-                    "frame_rate": new_sample_rate
-                }).set_frame_rate(audio.frame_rate)
-            
-            # TON AYARI (Pitch Shift)
-            if pitch_shift != 0:
-                print(f"   🎵 Ton kaydırılıyor: {pitch_shift:+d}")
-                # Octave değişimi (her +1 = yarım oktav yukarı)
-                octaves = pitch_shift * 0.1  # Daha hassas kontrol
-                new_sample_rate = int(audio.frame_rate * (2.0 ** octaves))
-                audio = audio._spawn(audio.raw_data, overrides={
-                    "frame_rate": new_sample_rate
-                }).set_frame_rate(audio.frame_rate)
-            
-            # DUYGU TONU (basit amplitüd manipülasyonu)
-            if emotion == "excited":
-                print(f"   🎭 Heyecanlı ton ekleniyor...")
-                audio = audio + 2  # Biraz daha yüksek ses
-            elif emotion == "sad":
-                print(f"   🎭 Üzgün ton ekleniyor...")
-                audio = audio - 2  # Biraz daha düşük ses
-            elif emotion == "happy":
-                print(f"   🎭 Mutlu ton ekleniyor...")
-                audio = audio + 1
+            if self.voice_sample.endswith(M1OptimizedTTS.BLEND_SUFFIX):
+                # Karışık ses bir dalga formu değil latent tanımıdır: referans
+                # klibi çıkarılmaz, karışık latent'lerle seslendirilir
+                engine = self._latent_engine()
+                wav = engine.synthesize(text, speed=speed)
+                sample_rate = engine.SAMPLE_RATE
+            else:
+                # HIZ AYARI - XTTS içinde (ton değişmez, son işleme gerekmez).
+                # TTS.tts() speed'i modele iletmediğinden synthesizer doğrudan çağrılır
+                synthesizer = self.tts.synthesizer
+                native_speed = speed != 1.0 and "speed" in inspect.signature(
+                    synthesizer.tts_model.inference
+                ).parameters
+                speed_kwargs = {"speed": speed} if native_speed else {}
+                
+                # Temel TTS üretimi - bellek içi dizi (geçici WAV yok)
+                with self.model.lock:
+                    wav = synthesizer.tts(
+                        text=text,
+                        speaker_wav=ensure_reference_clip(self.voice_sample),
+                        language_name="tr",
+                        **speed_kwargs
+                    )
+                sample_rate = synthesizer.output_sample_rate
+                wav = np.asarray(wav, dtype=np.float32)
+                
+                # Eski Coqui sürümleri (< 0.20) hız parametresi almaz: WSOLA ile esnet
+                if speed != 1.0 and not native_speed:
+                    print(f"   ⚡ Hız ayarlanıyor (WSOLA): {speed}x")
+                    wav = time_stretch_wsola(wav, speed, sample_rate)
             
-            # Normalize et
-            audio = audio.normalize()
+            # TON + DUYGU (faz vokoderi, kazanç ve vurgu - numpy üzerinde)
+            if pitch_shift != 0 or emotion != "neutral":
+                print(f"   🎵 Ton/duygu uygulanıyor: {pitch_shift:+d} / {emotion}")
+            style = StyleProcessor(sample_rate, pitch=pitch_shift, emotion=emotion, max_workers=1)
+            wav = style.process(wav)
             
             # Kaydet
-            audio.export(output_path, format="wav")
-            
-            # Temp dosyayı sil
-            if os.path.exists(temp_output):
-                os.remove(temp_output)
+            sf.write(output_path, wav, sample_rate)
             
             print(f"   ✅ Başarılı: {output_path}")
             return True
@@ -117,16 +124,21 @@ class AdvancedTTS:
         blend_ratio: float = 0.5
     ) -> str:
         """
-        İki sesi karıştır (Voice Blending)
+        İki sesi karıştır (Voice Blending - XTTS latent uzayında)
+        
+        Dalga formları karıştırılmaz; iki sesin konuşmacı latent'leri oranla
+        karıştırılıp latent cache'e yazılır. Çıktı küçük bir tanım dosyasıdır
+        (`*.blend.json`) ve ses yolu kabul eden her yerde referans ses olarak
+        kullanılabilir.
         
         Args:
             voice1_path: İlk ses dosyası
             voice2_path: İkinci ses dosyası
-            output_path: Çıktı dosyası
+            output_path: Tanım dosyası (uzantı .blend.json değilse eklenir)
             blend_ratio: Karışım oranı (0.0=sadece voice1, 1.0=sadece voice2, 0.5=eşit)
         
         Returns:
-            Çıktı dosya yolu
+            Tanım dosyası yolu
         """
         
         print(f"\n🎨 SES KARIŞTIRMA:")
@@ -134,52 +146,21 @@ class AdvancedTTS:
         print(f"   🎤 Ses 2: {voice2_path}")
         print(f"   🎚️  Oran: {blend_ratio:.1%} (Ses 2)")
         
-        # Ses dosyalarını yükle
-        data1, sr1 = sf.read(voice1_path)
-        data2, sr2 = sf.read(voice2_path)
-        
-        # Sample rate eşitle
-        if sr1 != sr2:
-            print(f"   ⚠️  Sample rate eşitleniyor: {sr1} vs {sr2}")
-            # Basitleştirilmiş: daha kısa olanı kullan
-            sr_target = min(sr1, sr2)
-            if sr1 != sr_target:
-                # Resample data1
-                ratio = sr_target / sr1
-                new_length = int(len(data1) * ratio)
-                data1 = np.interp(
-                    np.linspace(0, len(data1), new_length),
-                    np.arange(len(data1)),
-                    data1
-                )
-                sr1 = sr_target
-            if sr2 != sr_target:
-                # Resample data2
-                ratio = sr_target / sr2
-                new_length = int(len(data2) * ratio)
-                data2 = np.interp(
-                    np.linspace(0, len(data2), new_length),
-                    np.arange(len(data2)),
-                    data2
-                )
-                sr2 = sr_target
+        if not output_path.endswith(M1OptimizedTTS.BLEND_SUFFIX):
+            output_path = os.path.splitext(output_path)[0] + M1OptimizedTTS.BLEND_SUFFIX
         
-        # Uzunlukları eşitle (daha kısa olanı kullan)
-        min_length = min(len(data1), len(data2))
-        data1 = data1[:min_length]
-        data2 = data2[:min_length]
+        # Latent'leri şimdi hesapla (cache'e yazılır, render'larda hazır olur)
+        engine = M1OptimizedTTS(voice1_path, use_progress_bar=False, use_conditioning_bank=False)
+        engine.blend_latents(voice1_path, voice2_path, blend_ratio)
         
-        # Karıştır
-        blended = data1 * (1 - blend_ratio) + data2 * blend_ratio
-        
-        # Normalize
-        blended = blended / np.max(np.abs(blended)) * 0.95
-        
-        # Kaydet
-        sf.write(output_path, blended, sr1)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'voice1': os.path.abspath(voice1_path),
+                'voice2': os.path.abspath(voice2_path),
+                'ratio': blend_ratio
+            }, f, indent=2, ensure_ascii=False)
         
         print(f"   ✅ Karışık ses oluşturuldu: {output_path}")
-        print(f"   ⏱️  Süre: {len(blended)/sr1:.1f} saniye")
         
         return output_path
 
@@ -269,14 +250,18 @@ def test_voice_blending():
         print(f"   Voice 2: {voice2}")
         return
     
-    # %25 voice2, %75 voice1
-    AdvancedTTS.blend_voices(voice1, voice2, "blended_25.wav", 0.25)
+    # %25 voice2, %75 voice1 / %50-%50 / %75 voice2, %25 voice1
+    blends = [
+        AdvancedTTS.blend_voices(voice1, voice2, f"voices/blended_{int(ratio * 100)}.blend.json", ratio)
+        for ratio in (0.25, 0.5, 0.75)
+    ]
     
-    # %50-%50
-    AdvancedTTS.blend_voices(voice1, voice2, "blended_50.wav", 0.5)
-    
-    # %75 voice2, %25 voice1
-    AdvancedTTS.blend_voices(voice1, voice2, "blended_75.wav", 0.75)
+    # Dinleme örnekleri (latent'ler cache'ten gelir)
+    engine = M1OptimizedTTS(voice1, use_progress_bar=False, use_conditioning_bank=False)
+    for blend_path in blends:
+        wav_path = os.path.basename(blend_path).replace(M1OptimizedTTS.BLEND_SUFFIX, ".wav")
+        wav = engine.synthesize("Bu karışık bir sesle okunan bir cümledir.", speaker_wav=blend_path)
+        sf.write(wav_path, wav, engine.SAMPLE_RATE)
     
     print("\n" + "="*60)
     print("✅ KARIŞIK SESLER OLUŞTURULDU!")
@@ -285,9 +270,9 @@ def test_voice_blending():
     print("   open blended_25.wav  # %75 Akın ALTAN + %25 Senin Sesin")
     print("   open blended_50.wav  # %50-%50 Karışık")
     print("   open blended_75.wav  # %25 Akın ALTAN + %75 Senin Sesin")
+    print("   (Tanımlar voices/*.blend.json - sesli kitapta referans ses olarak kullanılabilir)")
     print("="*60)
 
-
 if __name__ == "__main__":
     import sys
     
@@ -3,27 +3,28 @@ Sesli Kitap Üretim Sistemi - Web Arayüzü
 """
 import gradio as gr
 import os
-from pathlib import Path
 import time
+import uuid
+import numpy as np
 from pdf_parser import PDFParser
 from sentence_processor import SentenceProcessor
-from tts_engine import M1OptimizedTTS
-from voice_manager import VoiceManager
-from voice_recorder import VoiceRecorder
-from text_cleaner import TextCleaner, TurkishTextPreprocessor
-from advanced_tts import AdvancedTTS
-from voice_catalog import VoiceCatalog, TurkishTTSModels
+from tts_engine import M1OptimizedTTS, create_engine
+from text_cleaner import TextCleaner
+from voice_catalog import TurkishTTSModels
 from elevenlabs_integration import ElevenLabsTTS, ElevenLabsConfig
+from job_queue import JobQueue
+from segmented_render import SegmentedAudiobook, save_render_plan, load_render_plan
+from hybrid_scheduler import HybridScheduler
+from app_services import AppServices
 
 
 # Global değişkenler
-voice_manager = VoiceManager()
-voice_recorder = VoiceRecorder()
-voice_catalog = VoiceCatalog()
-elevenlabs_tts = ElevenLabsTTS()
+# Aynı anda çalışacak sesli kitap işi sayısı (XTTS modeli paylaşılır)
+RENDER_SLOTS = int(os.getenv("SESLIKITAP_RENDER_SLOTS", "1"))
+job_queue = JobQueue(max_concurrent=RENDER_SLOTS)
 
-# Kataloğu tara (ilk başlatmada)
-voice_catalog.scan_voices()
+# Servisler tembel oluşturulur; katalog taraması arka planda yapılır
+services = AppServices()
 
 
 def analyze_pdf(pdf_file):
@@ -95,7 +96,7 @@ def validate_voice_file(audio_file):
         return "❌ Ses dosyası yükleyin"
     
     try:
-        info = voice_recorder.validate_audio(audio_file.name)
+        info = services.voice_recorder.validate_audio(audio_file.name)
         
         if not info['valid']:
             return f"❌ Geçersiz ses dosyası: {info['error']}"
@@ -125,10 +126,10 @@ def validate_voice_file(audio_file):
 def record_voice_interface(duration):
     """Mikrofon ile ses kaydı (arayüz için)"""
     try:
-        output_path = voice_recorder.record(duration=int(duration))
+        output_path = services.voice_recorder.record(duration=int(duration))
         
         # Analiz
-        info = voice_recorder.validate_audio(output_path)
+        info = services.voice_recorder.validate_audio(output_path)
         
         analysis = f"""
 ## ✅ Kayıt Tamamlandı!
@@ -144,54 +145,114 @@ def record_voice_interface(duration):
         return None, f"❌ Hata: {str(e)}"
 
 
-def generate_audiobook(pdf_file, text_input, voice_dropdown_selected, voice_file, speed_control, pitch_control, progress=gr.Progress()):
-    """Sesli kitap oluştur"""
+# Canlı dinleme: ilk parça tek cümle (hızlı ilk ses), sonrakiler 5'er cümle
+STREAM_FIRST_SEGMENT = 1
+STREAM_SEGMENT_SIZE = 5
+
+# Diske yazılan (checkpoint) segment başına cümle sayısı - bellek kullanımını sınırlar
+RENDER_SEGMENT_SIZE = 50
+
+# Taslak (hızlı önizleme) modunda kullanılan tek konuşmacılı model
+DRAFT_MODEL_ID = os.getenv("SESLIKITAP_DRAFT_MODEL", "vits_tr")
+
+# Taşma seslendirmesi: yerel ETA teslim süresini aşınca kuyruğun sonu bu
+# CustomTTSAPI sunucularına aktarılır (virgülle ayrılmış URL'ler, boş = kapalı)
+OVERFLOW_API_URL = os.getenv("SESLIKITAP_OVERFLOW_API", "")
+OVERFLOW_DEADLINE_MINUTES = float(os.getenv("SESLIKITAP_DEADLINE_MINUTES", "60"))
+
+
+def _needs_wav_conversion(voice_path):
+    """Referans ses WAV'a dönüştürülmeli mi? (karışık ses tanımları latent'lerle okunur)"""
+    lowered = voice_path.lower()
+    return not lowered.endswith('.wav') and not lowered.endswith(M1OptimizedTTS.BLEND_SUFFIX)
+
+
+def _plan_path(job_id):
+    """İşin cümle planı dosyası (taslaktan final üretmek için)"""
+    return os.path.join("outputs", "jobs", (job_id or "").strip(), "plan.json")
+
+
+def render_audiobook(job, pdf_path, text_input, voice_dropdown_selected, voice_file, speed_control, pitch_control,
+                     model_id="xtts_v2", draft=False, plan_from=None, character_voices=None):
+    """
+    Sesli kitabı arka planda üret (iş kuyruğunda çalışır)
     
-    # Metin veya PDF kontrolü
-    if pdf_file is None and not text_input.strip():
-        return None, "❌ PDF dosyası yükleyin veya metin girin"
+    İlerleme job.report ile, canlı dinleme parçaları job.add_segment ile
+    bildirilir. job.report her çağrıldığında iptal kontrolü yapılır.
     
-    # Ses dosyası: Hazır seslerden VEYA yüklenmiş
-    selected_voice = voice_dropdown_selected or voice_file
+    Taslak modunda hızlı tek konuşmacılı model kullanılır. Her iş cümle
+    planını kaydeder; plan_from verilirse o işin planı yeniden kullanılır
+    (PDF okuma ve cümle ayırma atlanır, taslakla aynı cümleler seslendirilir).
+    
+    character_voices verilirse diyalog cümleleri bu seslerle (konuşma
+    sırasına göre dönüşümlü), anlatım ise ana sesle okunur.
     
-    if selected_voice is None:
-        return None, "❌ Hazır seslerden seçin VEYA ses dosyası yükleyin"
+    Returns:
+        Çıktı MP3 dosya yolu
+    """
+    job_dir = os.path.join("outputs", "jobs", job.id)
+    temp_dir = os.path.join("temp_chunks", job.id)
+    os.makedirs(job_dir, exist_ok=True)
+    os.makedirs(temp_dir, exist_ok=True)
+    book = None
+    scheduler = None
     
     try:
-        # Metin kaynağını belirle
-        if text_input.strip():
-            # Direkt metin girilmiş
-            progress(0, desc="📝 Metin işleniyor...")
+        if draft:
+            # Taslak: hızlı tek konuşmacılı model (hız ve ton yine uygulanır)
+            model_id = DRAFT_MODEL_ID
+        
+        plan = load_render_plan(_plan_path(plan_from)) if plan_from else None
+        if plan_from and plan is None:
+            raise Exception(f"❌ Taslak planı bulunamadı: {plan_from}")
+        
+        if plan:
+            job.report(0.2, desc=f"📋 Taslak planı kullanılıyor ({plan_from})...")
+            sentences, meta = plan
+            full_text = meta['full_text']
+            page_count = meta['page_count']
+            word_count = meta['word_count']
+        else:
+            # Metin kaynağını belirle
+            if text_input.strip():
+                # Direkt metin girilmiş
+                job.report(0, desc="📝 Metin işleniyor...")
             
-            # METİN TEMİZLEME - Özel karakterleri düzelt
-            print("\n🧹 Metin temizleniyor (özel karakterler düzeltiliyor)...")
-            full_text = TextCleaner.clean_text(text_input, verbose=True)
+                # METİN TEMİZLEME - Özel karakterleri düzelt
+                print("\n🧹 Metin temizleniyor (özel karakterler düzeltiliyor)...")
+                full_text = TextCleaner.clean_text(text_input, verbose=True)
             
-            page_count = len(full_text.split('\n\n'))  # Paragraf sayısı
-            word_count = len(full_text.split())
+                page_count = len(full_text.split('\n\n'))  # Paragraf sayısı
+                word_count = len(full_text.split())
             
-        else:
-            # PDF yüklenmiş
-            progress(0, desc="📖 PDF okunuyor...")
+            else:
+                # PDF yüklenmiş
+                job.report(0, desc="📖 PDF okunuyor...")
             
-            # PDF Parse
-            parser = PDFParser(pdf_file.name)
-            content = parser.extract_text_with_structure()
+                # PDF Parse
+                parser = PDFParser(pdf_path)
+                content = parser.extract_text_with_structure()
             
-            full_text = content['full_text']
-            page_count = content['total_pages']
-            word_count = content['word_count']
-        
-        progress(0.2, desc="✂️ Cümleler analiz ediliyor...")
-        
-        # Cümlelere ayır
-        processor = SentenceProcessor()
-        sentences = processor.split_into_sentences(full_text)
+                full_text = content['full_text']
+                page_count = content['total_pages']
+                word_count = content['word_count']
+            
+            job.report(0.2, desc="✂️ Cümleler analiz ediliyor...")
+            
+            # Cümlelere ayır
+            processor = SentenceProcessor()
+            sentences = processor.split_into_sentences(full_text)
+            
+            # Planı kaydet: taslak dinlendikten sonra final aynı cümlelerle üretilir
+            save_render_plan(_plan_path(job.id), sentences, {
+                'full_text': full_text,
+                'page_count': page_count,
+                'word_count': word_count
+            })
         
-        if len(sentences) > 500:
-            return None, f"❌ Çok uzun metin! ({len(sentences)} cümle). Maksimum 500 cümle destekleniyor. Daha kısa bir PDF deneyin."
+        job.report(0.3, desc="🎙️ TTS motoru hazırlanıyor...")
         
-        progress(0.3, desc="🎙️ TTS motoru hazırlanıyor...")
+        clones_voice = "voice_cloning" in TurkishTTSModels.get_model_by_id(model_id)['features']
         
         # Ses dosyası formatını kontrol et ve gerekirse dönüştür
         # Öncelik: Dropdown seçimi > Yüklenen dosya
@@ -202,106 +263,354 @@ def generate_audiobook(pdf_file, text_input, voice_dropdown_selected, voice_file
             voice_path = voice_file.name if hasattr(voice_file, 'name') else voice_file
             print(f"📤 Yüklenen ses kullanılıyor: {voice_path}")
         
-        print(f"\n{'='*60}")
-        print(f"🎤 REFERANS SES DOSYASI KONTROL EDİLİYOR")
-        print(f"{'='*60}")
-        print(f"📁 Alınan dosya: {voice_path}")
-        print(f"📂 Dosya türü: {type(voice_file)}")
-        
-        # MP3 veya diğer formatları WAV'a dönüştür
-        if not voice_path.lower().endswith('.wav'):
-            progress(0.35, desc="🔄 Ses dosyası WAV formatına dönüştürülüyor...")
-            from pathlib import Path
-            temp_wav_path = f"temp_chunks/voice_converted_{int(time.time())}.wav"
-            os.makedirs("temp_chunks", exist_ok=True)
-            
-            try:
-                voice_path = voice_recorder.convert_to_format(voice_path, temp_wav_path)
-                print(f"✅ Ses dönüştürüldü: {voice_path}")
-            except Exception as e:
-                return None, f"❌ Ses dosyası dönüştürme hatası: {str(e)}"
+        if not clones_voice:
+            # Tek konuşmacılı model: referans ses kullanılmaz
+            voice_path = None
+            character_voices = None
+        
+        # Diyaloglara karakter sesleri (anlatıcı ana sesle okur)
+        character_voices = list(character_voices or [])
+        SentenceProcessor().assign_dialogue_voices(sentences, character_voices)
+        if character_voices:
+            dialogue_count = sum(1 for s in sentences if s.get('voice'))
+            print(f"🎭 {dialogue_count} diyalog cümlesi {len(character_voices)} karakter sesine dağıtıldı")
         
-        print(f"✅ Kullanılacak ses dosyası: {voice_path}")
-        print(f"{'='*60}\n")
+        if voice_path:
+            print(f"\n{'='*60}")
+            print(f"🎤 REFERANS SES DOSYASI KONTROL EDİLİYOR")
+            print(f"{'='*60}")
+            print(f"📁 Alınan dosya: {voice_path}")
+            print(f"📂 Dosya türü: {type(voice_file)}")
+            
+            # MP3 veya diğer formatları WAV'a dönüştür
+            if _needs_wav_conversion(voice_path):
+                job.report(0.35, desc="🔄 Ses dosyası WAV formatına dönüştürülüyor...")
+                temp_wav_path = os.path.join(temp_dir, "voice_converted.wav")
+                
+                try:
+                    voice_path = services.voice_recorder.convert_to_format(voice_path, temp_wav_path)
+                    print(f"✅ Ses dönüştürüldü: {voice_path}")
+                except Exception as e:
+                    raise Exception(f"❌ Ses dosyası dönüştürme hatası: {str(e)}")
+            
+            print(f"✅ Kullanılacak ses dosyası: {voice_path}")
+            print(f"{'='*60}\n")
         
         # TTS Engine - SES KLONLAMA BURADA BAŞLIYOR
-        print(f"🚀 TTS motoru başlatılıyor - REFERANS SES: {voice_path}")
+        print(f"🚀 TTS motoru başlatılıyor - MODEL: {model_id} | REFERANS SES: {voice_path or '-'}")
         print(f"⚡ Hız: {speed_control}x")
         print(f"🎵 Ton: {pitch_control:+d}")
         
-        # Gelişmiş özellikler varsa AdvancedTTS kullan
-        if speed_control != 1.0 or pitch_control != 0:
-            engine = AdvancedTTS(voice_path)
-            use_advanced = True
-        else:
-            engine = M1OptimizedTTS(voice_path, use_progress_bar=False)
-            use_advanced = False
+        # Sunucu açılışındaki model ısınması sürüyorsa onu bekle
+        if not services.model_ready.is_set():
+            job.report(0.35, desc="🔥 Model ısınıyor, bekleniyor...")
+            services.wait_for_model()
+        
+        # Model kayıttan gelir: birden fazla model RAM bütçesi içinde birlikte tutulur.
+        # Hız model içinde, ton ise numpy son işleme aşamasında uygulanır
+        engine = create_engine(model_id, voice_path, use_progress_bar=False, temp_dir=temp_dir,
+                               speed=speed_control, pitch=int(pitch_control))
+        
+        # Taşma: yalnızca tek sesli klonlama işlerinde (karakter sesleri uzak
+        # motorda tutarlı kalmaz); taslaklar zaten hızlı modelle üretilir
+        if OVERFLOW_API_URL and clones_voice and not character_voices and not draft:
+            from custom_tts_api import CustomTTSAPI
+            scheduler = HybridScheduler(engine, remote_engine=CustomTTSAPI(OVERFLOW_API_URL),
+                                        deadline_minutes=OVERFLOW_DEADLINE_MINUTES)
+            print(f"🌐 Taşma seslendirmesi açık (teslim: {OVERFLOW_DEADLINE_MINUTES:.0f} dk)")
         
         # Output path
-        output_path = f"outputs/audiobook_{int(time.time())}.mp3"
-        os.makedirs("outputs", exist_ok=True)
+        output_name = f"draft_{job.id}.mp3" if draft else f"audiobook_{job.id}.mp3"
+        output_path = os.path.join(job_dir, output_name)
         
-        progress(0.4, desc=f"🎤 {len(sentences)} cümle seslendiriliyor...")
+        job.report(0.4, desc=f"🎤 {len(sentences)} cümle seslendiriliyor...")
         
-        # Üret (gelişmiş özelliklerle veya normal)
-        if use_advanced:
-            # Gelişmiş özelliklerle üret
-            print("🎭 Gelişmiş özellikler kullanılıyor...")
-            audio_chunks = []
-            for i, sentence_data in enumerate(sentences):
-                chunk_path = f"temp_chunks/chunk_{i:04d}.wav"
-                os.makedirs("temp_chunks", exist_ok=True)
+        # Uzun belgeler segment segment işlenir: bellekte yalnızca bir segment
+        # tutulur, biten segmentler diske yazılır ve iş yarıda kalırsa atlanır
+        total = len(sentences)
+        work_key = SegmentedAudiobook.work_key(full_text, voice_path, speed_control, pitch_control, model_id,
+                                               *character_voices)
+        book = SegmentedAudiobook.claim(
+            os.path.join("outputs", "renders"),
+            work_key,
+            job.id,
+            total_sentences=total,
+            segment_size=RENDER_SEGMENT_SIZE
+        )
+        
+        if book.completed_count():
+            print(f"🔄 {book.completed_count()} segment checkpoint'ten devam ediliyor...")
+        
+        for segment_no, start, end in book.segment_ranges():
+            if book.is_done(segment_no):
+                job.report(0.4 + 0.55 * end / total, desc=f"♻️ {end}/{total} cümle (checkpoint)")
+                continue
+            
+            segment_sentences = sentences[start:end]
+            
+            # Üret - cümleler bittikçe gelir
+            if scheduler:
+                sentence_audio = ((idx - start, audio)
+                                  for idx, audio in scheduler.iter_audiobook(sentences, start, end))
+            else:
+                sentence_audio = engine.iter_audiobook(segment_sentences)
+            
+            segment_chunks = []
+            failed = []
+            pending = []
+            
+            for local_idx, audio in sentence_audio:
+                if audio is None:
+                    failed.append(start + local_idx)
+                else:
+                    segment_chunks.append(audio)
+                    pending.append(audio)
                 
-                success = engine.generate_with_style(
-                    sentence_data['text'],
-                    chunk_path,
-                    speed=speed_control,
-                    pitch_shift=pitch_control
-                )
+                done = start + local_idx + 1
                 
-                if success:
-                    audio = AudioSegment.from_wav(chunk_path)
-                    pause_ms = int(sentence_data['pause_after'] * 1000)
-                    silence = AudioSegment.silent(duration=pause_ms)
-                    audio_chunks.append(audio + silence)
-            
-            # Birleştir ve kaydet
-            if audio_chunks:
-                from pydub import AudioSegment
-                final_audio = sum(audio_chunks)
-                final_audio = final_audio.normalize()
-                final_audio.export(output_path, format="mp3", bitrate="192k")
-                audiobook_path = output_path
-            else:
-                return None, "❌ Ses üretilemedi"
-        else:
-            # Normal üretim
-            audiobook_path = engine.generate_audiobook(sentences, output_path)
+                # İlk parça tek cümle (hızlı ilk ses), sonrakiler birkaç cümlelik
+                segment_size = STREAM_FIRST_SEGMENT if not job.segments else STREAM_SEGMENT_SIZE
+                if pending and (len(pending) >= segment_size or done == end):
+                    segment_path = os.path.join(job_dir, f"part_{len(job.segments):04d}.mp3")
+                    sum(pending).export(segment_path, format="mp3", bitrate="128k")
+                    pending = []
+                    job.add_segment(segment_path)
+                
+                # İptal noktası - bir sonraki cümleye geçmeden önce
+                job.report(0.4 + 0.55 * done / total, desc=f"🎤 {done}/{total} cümle seslendirildi")
+            
+            book.write_segment(segment_no, start, end, segment_chunks, failed)
         
-        progress(1.0, desc="✅ Tamamlandı!")
+        # Birleştir ve kaydet (ffmpeg - ses belleğe yüklenmez)
+        job.report(0.95, desc="🔗 Segmentler birleştiriliyor...")
+        book.stitch(output_path)
         
-        info = f"""
-## 🎉 Sesli Kitap Oluşturuldu!
+        failed_sentences = book.failed_sentences()
+        if failed_sentences:
+            print(f"⚠️  Başarısız: {len(failed_sentences)} cümle: {failed_sentences[:10]}")
+        book.cleanup()
+        
+        title = "📝 Taslak Hazır!" if draft else "🎉 Sesli Kitap Oluşturuldu!"
+        job.message = f"""
+## {title}
 
-- **Dosya:** {audiobook_path}
-- **Cümle Sayısı:** {len(sentences)}
+- **İş ID:** `{job.id}`
+- **Dosya:** {output_path}
+- **Cümle Sayısı:** {len(sentences)} ({len(failed_sentences)} başarısız)
 - **Sayfa/Paragraf Sayısı:** {page_count}
 - **Kelime Sayısı:** {word_count}
 
 🎧 Aşağıdan dinleyebilir veya indirebilirsiniz!
         """
+        if draft:
+            job.message += "\n💡 Beğendiyseniz bu İş ID ile **🎬 Taslaktan Final Üret** butonunu kullanın.\n"
         
-        return audiobook_path, info
+        return output_path
         
+    finally:
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if book is not None:
+            book.release()
+        if scheduler is not None:
+            scheduler.remote_engine.close()
+
+
+def generate_audiobook(pdf_file, text_input, voice_dropdown_selected, voice_file, speed_control, pitch_control,
+                       model_id="xtts_v2", draft=False, character_voices=None):
+    """Sesli kitap işini kuyruğa ekle ve hemen dön"""
+    
+    # Metin veya PDF kontrolü
+    if pdf_file is None and not text_input.strip():
+        return "", "❌ PDF dosyası yükleyin veya metin girin"
+    
+    model_id = DRAFT_MODEL_ID if draft else (model_id or "xtts_v2")
+    model = TurkishTTSModels.get_model_by_id(model_id)
+    if model is None or model['engine'] != "coqui":
+        return "", f"❌ Bu model desteklenmiyor: {model['name'] if model else model_id}"
+    
+    # Ses dosyası: Hazır seslerden VEYA yüklenmiş (yalnızca klonlayan modellerde)
+    selected_voice = voice_dropdown_selected or voice_file
+    
+    if selected_voice is None and "voice_cloning" in model['features']:
+        return "", "❌ Hazır seslerden seçin VEYA ses dosyası yükleyin"
+    
+    pdf_path = getattr(pdf_file, 'name', pdf_file)
+    title = text_input.strip()[:40] if text_input.strip() else os.path.basename(pdf_path)
+    
+    job_id = job_queue.submit(
+        render_audiobook,
+        pdf_path, text_input, voice_dropdown_selected, voice_file, speed_control, pitch_control,
+        model_id=model_id, draft=bool(draft), character_voices=character_voices,
+        title=f"📝 {title}" if draft else title
+    )
+    
+    return job_id, f"📥 İş kuyruğa eklendi: `{job_id}` ({job_queue.queued_count()} iş bekliyor)"
+
+
+def generate_from_draft(draft_job_id, voice_dropdown_selected, voice_file, speed_control, pitch_control,
+                        model_id="xtts_v2", character_voices=None):
+    """Taslak işin cümle planıyla final render'ı kuyruğa ekle"""
+    draft_job_id = (draft_job_id or "").strip()
+    if not draft_job_id or not os.path.exists(_plan_path(draft_job_id)):
+        return "", f"❌ Geçerli bir taslak İş ID girin (plan bulunamadı: `{draft_job_id}`)"
+    
+    model_id = model_id or "xtts_v2"
+    model = TurkishTTSModels.get_model_by_id(model_id)
+    if model is None or model['engine'] != "coqui":
+        return "", f"❌ Bu model desteklenmiyor: {model['name'] if model else model_id}"
+    
+    if (voice_dropdown_selected or voice_file) is None and "voice_cloning" in model['features']:
+        return "", "❌ Hazır seslerden seçin VEYA ses dosyası yükleyin"
+    
+    job_id = job_queue.submit(
+        render_audiobook,
+        None, "", voice_dropdown_selected, voice_file, speed_control, pitch_control,
+        model_id=model_id, plan_from=draft_job_id, character_voices=character_voices,
+        title=f"🎬 Final ({draft_job_id})"
+    )
+    
+    return job_id, f"📥 Final iş kuyruğa eklendi: `{job_id}` (taslak: `{draft_job_id}`)"
+
+
+# Hızlı önizlemede seslendirilecek en fazla karakter (ilk paragraf)
+PREVIEW_MAX_CHARS = 400
+
+
+def preview_stream(text_input, voice_dropdown_selected, voice_file):
+    """
+    İlk paragrafı XTTS akış çıkarımıyla seslendir (parçalar geldikçe çalınır)
+    
+    İş kuyruğuna girmez; GPT çözümlemesi sürerken ilk ses parçası oynatıcıya
+    gönderilir.
+    """
+    text = TextCleaner.clean_text(text_input or "").strip()
+    if not text:
+        yield None, "❌ Önizleme için metin girin"
+        return
+    
+    voice_path = voice_dropdown_selected or getattr(voice_file, 'name', voice_file)
+    if not voice_path:
+        yield None, "❌ Hazır seslerden seçin VEYA ses dosyası yükleyin"
+        return
+    
+    paragraph = text.split('\n\n')[0][:PREVIEW_MAX_CHARS]
+    
+    # Eşzamanlı önizlemeler birbirinin dönüştürülmüş sesini ezmesin
+    converted_path = None
+    try:
+        if _needs_wav_conversion(voice_path):
+            os.makedirs("temp_chunks", exist_ok=True)
+            converted_path = os.path.join("temp_chunks", f"preview_voice_{uuid.uuid4().hex[:8]}.wav")
+            voice_path = services.voice_recorder.convert_to_format(voice_path, converted_path)
+        
+        services.wait_for_model()
+        engine = services.preview_engine(voice_path)
+        
+        started = time.time()
+        first_chunk_at = None
+        for chunk in engine.synthesize_stream(paragraph, voice_path):
+            if first_chunk_at is None:
+                first_chunk_at = time.time() - started
+            pcm16 = (np.clip(chunk, -1.0, 1.0) * 32767).astype(np.int16)
+            yield (engine.SAMPLE_RATE, pcm16), f"⚡ Önizleme çalıyor... (ilk ses {first_chunk_at:.2f} sn)"
+        
+        yield gr.update(), f"✅ Önizleme tamamlandı ({len(paragraph)} karakter, ilk ses {first_chunk_at or 0:.2f} sn)"
     except Exception as e:
-        import traceback
-        error_detail = traceback.format_exc()
-        return None, f"❌ Hata: {str(e)}\n\n```\n{error_detail}\n```"
+        yield None, f"❌ Önizleme hatası: {str(e)}"
+    finally:
+        if converted_path and os.path.exists(converted_path):
+            os.remove(converted_path)
+
+
+def _job_status_markdown(job) -> str:
+    """İş durumunu Markdown olarak göster"""
+    if job.status == "completed" and job.message:
+        return job.message
+    if job.status == "failed":
+        return f"{job.error}\n\n- **İş ID:** `{job.id}`"
+    
+    return f"""
+### ⏳ {job.description}
+
+- **İş ID:** `{job.id}`
+- **Durum:** {job.status}
+- **İlerleme:** {job.progress * 100:.0f}%
+- **Hazır Parça:** {len(job.segments)}
+
+💡 Sayfayı kapatsanız da iş devam eder; İş ID ile tekrar takip edebilirsiniz.
+    """
+
+
+def follow_job(job_id, progress=gr.Progress()):
+    """İşi takip et - hazır parçaları canlı dinleme oynatıcısına aktar"""
+    if not job_id or not job_id.strip():
+        yield gr.update(), gr.update(), gr.update()
+        return
+    
+    job = job_queue.get(job_id)
+    if job is None:
+        yield None, None, f"❌ İş bulunamadı: `{job_id}`"
+        return
+    
+    sent = 0
+    while True:
+        finished = job.finished
+        
+        for segment_path in job.segments[sent:]:
+            sent += 1
+            yield segment_path, None, _job_status_markdown(job)
+        
+        progress(job.progress, desc=job.description)
+        
+        if finished and sent >= len(job.segments):
+            break
+        time.sleep(0.5)
+    
+    if job.status == "completed":
+        yield None, job.output_path, _job_status_markdown(job)
+    else:
+        yield None, None, _job_status_markdown(job)
+
+
+def cancel_job(job_id):
+    """İşi iptal et"""
+    if job_queue.cancel(job_id):
+        return f"🛑 İptal istendi: `{job_id}` (mevcut cümle bitince durur)"
+    return f"⚠️ İş bulunamadı veya zaten bitti: `{job_id}`"
+
+
+def list_jobs_markdown():
+    """Kuyruktaki işleri listele"""
+    jobs = job_queue.list_jobs()
+    if not jobs:
+        return "📭 Henüz iş yok"
+    
+    rows = ["| İş ID | Başlık | Durum | İlerleme |", "|---|---|---|---|"]
+    for job in jobs:
+        rows.append(f"| `{job['id']}` | {job['title']} | {job['status']} | {job['progress'] * 100:.0f}% |")
+    return "\n".join(rows)
+
+
+def refresh_voice_choices():
+    """Katalog taraması bitince ses listesini doldur"""
+    choices = services.voice_choices(timeout=60)
+    return (gr.update(choices=choices), gr.update(choices=choices), services.readiness_markdown(),
+            services.catalog_version())
+
+
+def poll_voice_choices(seen_version):
+    """İndeksleyici kataloğu güncellediyse ses listesini yenile (beklemeden)"""
+    version = services.catalog_version()
+    if version == seen_version:
+        return gr.update(), gr.update(), gr.update(), seen_version
+    choices = services.voice_choices(timeout=0)
+    return gr.update(choices=choices), gr.update(choices=choices), services.readiness_markdown(), version
 
 
 def list_saved_voices():
     """Kayıtlı sesleri listele"""
-    voices = voice_manager.list_voices()
+    voices = services.voice_manager.list_voices()
     
     if not voices:
         return "📭 Henüz kayıtlı ses yok"
@@ -322,14 +631,16 @@ def list_saved_voices():
     return result
 
 
-def generate_with_elevenlabs(text_input, voice_name, profile_name, stability, similarity):
-    """ElevenLabs ile ses üret"""
+def generate_with_elevenlabs(text_input, voice_name, profile_name, stability, similarity, stream_mode=False):
+    """ElevenLabs ile ses üret (akış modunda parçalar geldikçe çalınır)"""
     if not text_input.strip():
-        return None, "❌ Lütfen metin girin"
+        yield None, None, "❌ Lütfen metin girin"
+        return
     
     # API key kontrolü
+    elevenlabs_tts = services.elevenlabs_tts
     if not elevenlabs_tts.api_key:
-        return None, """
+        yield None, None, """
 ❌ ElevenLabs API anahtarı bulunamadı!
 
 📝 API Anahtarı Nasıl Alınır:
@@ -343,6 +654,7 @@ def generate_with_elevenlabs(text_input, voice_name, profile_name, stability, si
 export ELEVENLABS_API_KEY='your-api-key-here'
 ```
         """
+        return
     
     try:
         # Metin temizleme
@@ -352,41 +664,79 @@ export ELEVENLABS_API_KEY='your-api-key-here'
         output_path = f"outputs/elevenlabs_{int(time.time())}.mp3"
         os.makedirs("outputs", exist_ok=True)
         
-        # Profil kullanımı varsa
-        if profile_name and profile_name != "Manuel Ayar":
-            audio_data = elevenlabs_tts.generate_with_profile(
-                text=cleaned_text,
-                profile_name=profile_name,
-                output_path=output_path
-            )
-        else:
-            # Manuel ayarlarla
-            audio_data = elevenlabs_tts.generate_speech(
-                text=cleaned_text,
-                voice_name=voice_name,
-                output_path=output_path,
-                stability=stability,
-                similarity_boost=similarity
-            )
+        # Profil seçiliyse ayarlarını kullan
+        profile = elevenlabs_tts.VOICE_PROFILES.get(profile_name)
+        if profile:
+            voice_name = profile["voice_id"]
+            stability = profile["settings"]["stability"]
+            similarity = profile["settings"]["similarity_boost"]
         
-        if audio_data:
-            info = f"""
+        # Kota kontrolü - aynı metin/ses/ayar daha önce üretildiyse ücretsiz
+        billable = elevenlabs_tts.estimate_billable_characters(
+            [cleaned_text],
+            voice_name=voice_name,
+            stability=stability,
+            similarity_boost=similarity
+        )
+        remaining = elevenlabs_tts.ledger.remaining()
+        if billable > remaining:
+            yield None, None, f"""
+❌ Aylık ElevenLabs kotası yetersiz!
+
+- **Gerekli:** {billable:,} karakter
+- **Kalan (tahmini):** {remaining:,} karakter
+
+💡 Metni kısaltın veya `config.json` içindeki `elevenlabs_monthly_quota` değerini planınıza göre güncelleyin.
+            """
+            return
+        
+        info = f"""
 ## ✅ Ses Oluşturuldu!
 
 - **Dosya:** {output_path}
 - **Ses:** {voice_name}
 - **Karakter Sayısı:** {len(cleaned_text)}
+- **Faturalanan:** {billable:,} karakter {"(♻️ cache'ten)" if billable == 0 else ""}
+- **Aylık Kullanım:** {elevenlabs_tts.ledger.summary()}
 - **Motor:** ElevenLabs Multilingual v2
 
 🎧 Aşağıdan dinleyebilir veya indirebilirsiniz!
-            """
-            return output_path, info
+        """
+        
+        if stream_mode:
+            received = 0
+            for chunk in elevenlabs_tts.generate_speech_stream(
+                text=cleaned_text,
+                voice_name=voice_name,
+                output_path=output_path,
+                stability=stability,
+                similarity_boost=similarity
+            ):
+                received += len(chunk)
+                yield chunk, None, f"⏳ Akış sürüyor... ({received / 1024:.0f} KB alındı)"
+            
+            if received:
+                yield None, output_path, info
+            else:
+                yield None, None, "❌ Ses oluşturulamadı. API anahtarını kontrol edin."
+            return
+        
+        audio_data = elevenlabs_tts.generate_speech(
+            text=cleaned_text,
+            voice_name=voice_name,
+            output_path=output_path,
+            stability=stability,
+            similarity_boost=similarity
+        )
+        
+        if audio_data:
+            yield None, output_path, info
         else:
-            return None, "❌ Ses oluşturulamadı. API anahtarını kontrol edin."
+            yield None, None, "❌ Ses oluşturulamadı. API anahtarını kontrol edin."
             
     except Exception as e:
         import traceback
-        return None, f"❌ Hata: {str(e)}\n\n```\n{traceback.format_exc()}\n```"
+        yield None, None, f"❌ Hata: {str(e)}\n\n```\n{traceback.format_exc()}\n```"
 
 
 def save_elevenlabs_api_key(api_key):
@@ -398,8 +748,7 @@ def save_elevenlabs_api_key(api_key):
         ElevenLabsConfig.save_api_key(api_key.strip())
         
         # Global TTS nesnesini güncelle
-        global elevenlabs_tts
-        elevenlabs_tts = ElevenLabsTTS(api_key.strip())
+        services.elevenlabs_tts = ElevenLabsTTS(api_key.strip())
         
         return "✅ API anahtarı kaydedildi! Artık ElevenLabs'i kullanabilirsiniz."
     except Exception as e:
@@ -458,10 +807,17 @@ with gr.Blocks(title="🎙️ Sesli Kitap Üretim Sistemi", theme=gr.themes.Soft
                     # Hazır seslerden seç VEYA yeni yükle
                     with gr.Tab("📚 Hazır Sesler"):
                         voice_dropdown = gr.Dropdown(
-                            choices=voice_catalog.get_voice_choices(),
+                            choices=services.voice_choices(),
                             label="Hazır Ses Klonlarından Seç",
                             info="Profesyonel sesli kitap sanatçıları"
                         )
+                        character_voices = gr.Dropdown(
+                            choices=services.voice_choices(),
+                            multiselect=True,
+                            label="🎭 Karakter Sesleri (Diyaloglar)",
+                            info="Seçilirse diyaloglar bu seslerle sırayla okunur, anlatım ana sesle"
+                        )
+                        readiness_info = gr.Markdown(services.readiness_markdown())
                         
                         # TTS Modeli seçimi
                         model_choices = [(m['name'], m['id']) for m in TurkishTTSModels.MODELS]
@@ -505,10 +861,38 @@ with gr.Blocks(title="🎙️ Sesli Kitap Üretim Sistemi", theme=gr.themes.Soft
                     info="Sesin tonunu değiştir"
                 )
             
-            generate_btn = gr.Button("🎬 Sesli Kitap Oluştur", variant="primary", size="lg")
+            draft_mode = gr.Checkbox(
+                label="📝 Taslak modu (hızlı önizleme)",
+                value=False,
+                info="Tempo ve telaffuzu kontrol etmek için hızlı tek konuşmacılı model (yaklaşık ses, klonlama yok)"
+            )
+            
+            with gr.Row():
+                generate_btn = gr.Button("🎬 Sesli Kitap Oluştur", variant="primary", size="lg", scale=3)
+                final_from_draft_btn = gr.Button("🎬 Taslaktan Final Üret", variant="secondary", size="lg", scale=1)
+                preview_btn = gr.Button("⚡ Hızlı Önizleme", variant="secondary", size="lg", scale=1)
+            
+            with gr.Row():
+                job_id_box = gr.Textbox(
+                    label="🆔 İş ID",
+                    placeholder="İş oluşturulunca otomatik dolar",
+                    scale=3
+                )
+                job_follow_btn = gr.Button("🔄 Takip Et", variant="secondary", scale=1)
+                job_cancel_btn = gr.Button("🛑 İptal Et", variant="stop", scale=1)
+            
+            with gr.Accordion("📋 İş Kuyruğu", open=False):
+                jobs_refresh_btn = gr.Button("🔄 Listeyi Yenile", variant="secondary")
+                jobs_list = gr.Markdown("📭 Henüz iş yok")
             
             with gr.Row():
                 with gr.Column():
+                    audiobook_stream = gr.Audio(
+                        label="⚡ Canlı Dinleme (üretim sürerken)",
+                        streaming=True,
+                        autoplay=True
+                    )
+                    
                     audiobook_output = gr.Audio(
                         label="🎧 Sesli Kitap",
                         type="filepath"
@@ -541,11 +925,67 @@ with gr.Blocks(title="🎙️ Sesli Kitap Üretim Sistemi", theme=gr.themes.Soft
                 outputs=[voice_info]
             )
             
+            # İş hemen kuyruğa alınır; takip ayrı bir olayda yapılır, böylece
+            # tarayıcı kapansa da iş arka planda sürer
             generate_btn.click(
                 fn=generate_audiobook,
-                inputs=[pdf_input, text_input, voice_dropdown, voice_input, speed_control, pitch_control],
-                outputs=[audiobook_output, generation_info]
+                inputs=[pdf_input, text_input, voice_dropdown, voice_input, speed_control, pitch_control,
+                        tts_model_dropdown, draft_mode, character_voices],
+                outputs=[job_id_box, generation_info]
+            ).then(
+                fn=follow_job,
+                inputs=[job_id_box],
+                outputs=[audiobook_stream, audiobook_output, generation_info],
+                concurrency_limit=None
+            )
+            
+            # İlk paragrafı akış çıkarımıyla hemen dinlet (kuyruğa girmez)
+            preview_btn.click(
+                fn=preview_stream,
+                inputs=[text_input, voice_dropdown, voice_input],
+                outputs=[audiobook_stream, generation_info]
+            )
+            
+            # İş ID kutusundaki taslağın cümle planıyla final render
+            final_from_draft_btn.click(
+                fn=generate_from_draft,
+                inputs=[job_id_box, voice_dropdown, voice_input, speed_control, pitch_control, tts_model_dropdown,
+                        character_voices],
+                outputs=[job_id_box, generation_info]
+            ).then(
+                fn=follow_job,
+                inputs=[job_id_box],
+                outputs=[audiobook_stream, audiobook_output, generation_info],
+                concurrency_limit=None
+            )
+            
+            job_follow_btn.click(
+                fn=follow_job,
+                inputs=[job_id_box],
+                outputs=[audiobook_stream, audiobook_output, generation_info],
+                concurrency_limit=None
             )
+            
+            job_cancel_btn.click(
+                fn=cancel_job,
+                inputs=[job_id_box],
+                outputs=[generation_info]
+            )
+            
+            jobs_refresh_btn.click(
+                fn=list_jobs_markdown,
+                outputs=[jobs_list]
+            )
+            
+            # Katalog arka planda taranıyor; hazır olunca ses listesini doldur
+            catalog_version = gr.State(-1)
+            app.load(fn=refresh_voice_choices,
+                     outputs=[voice_dropdown, character_voices, readiness_info, catalog_version])
+            
+            # voices/ klasörüne eklenen sesler listeye kendiliğinden düşer
+            app.load(fn=poll_voice_choices, inputs=[catalog_version],
+                     outputs=[voice_dropdown, character_voices, readiness_info, catalog_version],
+                     every=15)
         
         # TAB 2: Ses Kaydı
         with gr.Tab("🎤 Ses Kaydı"):
@@ -727,13 +1167,26 @@ with gr.Blocks(title="🎙️ Sesli Kitap Üretim Sistemi", theme=gr.themes.Soft
                     info="Orijinal sese benzerlik"
                 )
             
+            elevenlabs_stream_mode = gr.Checkbox(
+                value=True,
+                label="⚡ Akış Modu",
+                info="Ses parçaları geldikçe çalınır (ilk ses ~1 saniyede)"
+            )
+            
             elevenlabs_generate_btn = gr.Button("🎬 Ses Üret (ElevenLabs)", variant="primary", size="lg")
             
             with gr.Row():
-                elevenlabs_audio_output = gr.Audio(
-                    label="🎧 Oluşturulan Ses",
-                    type="filepath"
-                )
+                with gr.Column():
+                    elevenlabs_stream_output = gr.Audio(
+                        label="⚡ Canlı Dinleme",
+                        streaming=True,
+                        autoplay=True
+                    )
+                    
+                    elevenlabs_audio_output = gr.Audio(
+                        label="🎧 Oluşturulan Ses",
+                        type="filepath"
+                    )
                 
                 elevenlabs_info_output = gr.Markdown("Ses bilgileri burada görünecek")
             
@@ -744,9 +1197,10 @@ with gr.Blocks(title="🎙️ Sesli Kitap Üretim Sistemi", theme=gr.themes.Soft
                     elevenlabs_voice_dropdown,
                     elevenlabs_profile_dropdown,
                     elevenlabs_stability,
-                    elevenlabs_similarity
+                    elevenlabs_similarity,
+                    elevenlabs_stream_mode
                 ],
-                outputs=[elevenlabs_audio_output, elevenlabs_info_output]
+                outputs=[elevenlabs_stream_output, elevenlabs_audio_output, elevenlabs_info_output]
             )
             
             gr.Markdown("""
@@ -874,6 +1328,25 @@ if __name__ == "__main__":
     print("\n💡 Durdurmak için: Ctrl+C")
     print("="*60 + "\n")
     
+    print(f"🎬 Render slotu: {RENDER_SLOTS} (SESLIKITAP_RENDER_SLOTS)")
+    
+    # Katalog taraması portu bekletmesin
+    services.start_warmup()
+    
+    # Opsiyonel: XTTS modelini arka planda yükle ve ısıt
+    if os.getenv("SESLIKITAP_PRELOAD_MODEL", "0") == "1":
+        print("🔥 Model ön yükleme açık (SESLIKITAP_PRELOAD_MODEL)")
+        services.start_model_warmup(voice_sample=os.getenv("SESLIKITAP_WARMUP_VOICE") or None)
+    
+    # Opsiyonel: paylaşımlı sunucularda boşta kalan modeli bellekten at
+    idle_minutes = float(os.getenv("SESLIKITAP_MODEL_IDLE_MINUTES", "0"))
+    if idle_minutes > 0:
+        print(f"💤 Boşta kalan model {idle_minutes:.0f} dk sonra bırakılacak")
+        services.start_idle_unloader(idle_minutes, busy=lambda: job_queue.running_count() > 0)
+    
+    # Kısa olaylar için eşzamanlılık; uzun işler kendi kuyruğunda çalışır
+    app.queue(default_concurrency_limit=int(os.getenv("SESLIKITAP_UI_CONCURRENCY", "8")))
+    
     app.launch(
         server_name="127.0.0.1",
         server_port=3000,
@@ -0,0 +1,236 @@
+"""
+App Services - Web arayüzü servisleri
+Ağır başlatma işleri (katalog taraması, model ön yükleme) arka planda
+yapılır; sunucu portu hemen açılır ve hazır olma durumu ayrıca sorgulanabilir.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from voice_manager import VoiceManager
+from voice_recorder import VoiceRecorder
+from voice_catalog import VoiceCatalog
+from voice_indexer import VoiceIndexer
+from elevenlabs_integration import ElevenLabsTTS
+from tts_engine import M1OptimizedTTS
+
+
+class AppServices:
+    """Uygulama genelinde paylaşılan servisler (tembel + arka planda ısınan)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._voice_manager: Optional[VoiceManager] = None
+        self._voice_recorder: Optional[VoiceRecorder] = None
+        self._voice_catalog: Optional[VoiceCatalog] = None
+        self._elevenlabs_tts: Optional[ElevenLabsTTS] = None
+        self._voice_indexer: Optional[VoiceIndexer] = None
+        self._preview_engine: Optional[M1OptimizedTTS] = None
+        self._preview_lock = threading.Lock()
+
+        # Hazır olma bayrakları
+        self.catalog_ready = threading.Event()
+        self.catalog_error: Optional[str] = None
+        self._warmup_thread: Optional[threading.Thread] = None
+
+        # Ön yükleme kapalıyken istekler beklemez
+        self.model_ready = threading.Event()
+        self.model_ready.set()
+        self._model_thread: Optional[threading.Thread] = None
+
+    def start_warmup(self):
+        """Arka plan ısınma görevini başlat (birden fazla çağrı güvenli)"""
+        with self._lock:
+            if self._warmup_thread is not None:
+                return
+            self._warmup_thread = threading.Thread(target=self._warm_up, name="warmup", daemon=True)
+            self._warmup_thread.start()
+
+    def _warm_up(self):
+        started = time.time()
+        try:
+            catalog = VoiceCatalog()
+            indexer = VoiceIndexer(catalog, engine_provider=self._loaded_engine)
+            indexer.index_once()
+            self._voice_catalog = catalog
+            print(f"✅ Ses kataloğu hazır ({time.time() - started:.1f} sn)")
+            
+            # voices/ klasörüne eklenen sesler yeniden başlatmadan kataloğa girer
+            if os.getenv("SESLIKITAP_VOICE_WATCH", "1") != "0":
+                self._voice_indexer = indexer.start()
+        except Exception as e:
+            self.catalog_error = str(e)
+            print(f"⚠️  Katalog taranamadı: {e}")
+        finally:
+            self.catalog_ready.set()
+
+        # Diğer servisleri de ilk istekten önce hazırla
+        _ = self.voice_manager
+        _ = self.voice_recorder
+        _ = self.elevenlabs_tts
+
+    def start_model_warmup(self, voice_sample: Optional[str] = None):
+        """
+        XTTS modelini arka planda yükle ve bir ısınma çıkarımı yap
+
+        Args:
+            voice_sample: Isınma için referans ses (None ise katalogdaki ilk ses)
+        """
+        with self._lock:
+            if self._model_thread is not None:
+                return
+            self.model_ready.clear()
+            self._model_thread = threading.Thread(
+                target=self._warm_model, args=(voice_sample,), name="model-warmup", daemon=True
+            )
+            self._model_thread.start()
+
+    def start_idle_unloader(self, idle_timeout_minutes: float,
+                            busy: Optional[Callable[[], bool]] = None):
+        """
+        Model belirtilen süre kullanılmazsa bellekten at
+
+        Args:
+            idle_timeout_minutes: Boşta bekleme süresi (dakika)
+            busy: Çalışan iş varsa True döndüren fonksiyon (o sırada model atılmaz)
+        """
+        threading.Thread(
+            target=self._idle_loop, args=(idle_timeout_minutes * 60, busy),
+            name="model-idle", daemon=True
+        ).start()
+
+    def _warm_model(self, voice_sample: Optional[str]):
+        started = time.time()
+        try:
+            if voice_sample is None:
+                catalog = self.get_voice_catalog()
+                voices = catalog.catalog["voices"] if catalog else []
+                voice_sample = voices[0]["file_path"] if voices else None
+
+            if voice_sample is None:
+                # Referans ses yok: yalnızca modeli yükle
+                M1OptimizedTTS.load_model(M1OptimizedTTS.detect_device())
+            else:
+                engine = M1OptimizedTTS(voice_sample, use_progress_bar=False)
+                engine.synthesize("Merhaba, sistem hazırlanıyor.")
+                
+                # Katalog seslerinin latent'leri de hazır olsun (ilk render beklemez)
+                catalog = self.get_voice_catalog()
+                if catalog:
+                    catalog.precompute_latents(engine)
+            print(f"🔥 XTTS modeli ısındı ({time.time() - started:.1f} sn)")
+        except Exception as e:
+            print(f"⚠️  Model ön yüklemesi başarısız: {e}")
+        finally:
+            self.model_ready.set()
+
+    def _idle_loop(self, idle_seconds: float, busy: Optional[Callable[[], bool]]):
+        check_interval = min(60.0, idle_seconds / 2)
+        while True:
+            time.sleep(check_interval)
+            if not self.model_ready.is_set() or (busy and busy()):
+                continue
+            if M1OptimizedTTS.idle_seconds() >= idle_seconds:
+                M1OptimizedTTS.unload_model()
+
+    def _loaded_engine(self) -> Optional[M1OptimizedTTS]:
+        """
+        İndeksleyicinin latent hesaplaması için geçici motor
+        
+        Model bellekte değilse None: indeksleme yüzünden model yüklenmez
+        (motor tutulmaz, boşta kaldırılan model bellekte kalmasın).
+        """
+        catalog = self._voice_catalog
+        if catalog is None or not M1OptimizedTTS.is_model_loaded():
+            return None
+        voices = catalog.catalog['voices']
+        if not voices:
+            return None
+        reference = voices[0].get('reference_path') or voices[0]['file_path']
+        return M1OptimizedTTS(reference, use_progress_bar=False, use_conditioning_bank=False)
+    
+    def preview_engine(self, voice_path: str) -> M1OptimizedTTS:
+        """
+        Önizlemelerde paylaşılan motor
+        
+        Ses her çağrıda speaker_wav olarak verilir; motor yalnızca ilk
+        önizlemede oluşturulur (koşullandırma bankası hesaplanmaz).
+        """
+        with self._preview_lock:
+            if self._preview_engine is None:
+                self._preview_engine = M1OptimizedTTS(voice_path, use_progress_bar=False,
+                                                      use_conditioning_bank=False)
+            return self._preview_engine
+    
+    def catalog_version(self) -> int:
+        """Katalog her güncellendiğinde artan sayaç (hazır değilse -1)"""
+        return self._voice_catalog.version if self._voice_catalog else -1
+    
+    def wait_for_model(self, timeout: Optional[float] = None) -> bool:
+        """Model ısınması sürüyorsa bitmesini bekle"""
+        return self.model_ready.wait(timeout)
+
+    @property
+    def voice_manager(self) -> VoiceManager:
+        with self._lock:
+            if self._voice_manager is None:
+                self._voice_manager = VoiceManager()
+            return self._voice_manager
+
+    @property
+    def voice_recorder(self) -> VoiceRecorder:
+        with self._lock:
+            if self._voice_recorder is None:
+                self._voice_recorder = VoiceRecorder()
+            return self._voice_recorder
+
+    @property
+    def elevenlabs_tts(self) -> ElevenLabsTTS:
+        with self._lock:
+            if self._elevenlabs_tts is None:
+                self._elevenlabs_tts = ElevenLabsTTS()
+            return self._elevenlabs_tts
+
+    @elevenlabs_tts.setter
+    def elevenlabs_tts(self, value: ElevenLabsTTS):
+        with self._lock:
+            self._elevenlabs_tts = value
+
+    def get_voice_catalog(self, timeout: Optional[float] = None) -> Optional[VoiceCatalog]:
+        """
+        Taranmış kataloğu getir
+
+        Args:
+            timeout: Isınma bitene kadar en fazla bu kadar bekle (None = sonsuz)
+
+        Returns:
+            Katalog (süre dolarsa veya tarama başarısızsa None)
+        """
+        # app.py modül olarak içe aktarıldığında (gradio reload, testler)
+        # __main__ bloğu çalışmaz: ısınma ilk erişimde başlatılır
+        self.start_warmup()
+        self.catalog_ready.wait(timeout)
+        return self._voice_catalog
+
+    def voice_choices(self, timeout: Optional[float] = 0) -> List[tuple]:
+        """Gradio dropdown seçenekleri (katalog hazır değilse boş liste)"""
+        catalog = self.get_voice_catalog(timeout)
+        return catalog.get_voice_choices() if catalog else []
+
+    def readiness(self) -> Dict[str, bool]:
+        """Hazır olma durumu"""
+        return {
+            'catalog': self.catalog_ready.is_set() and self._voice_catalog is not None,
+            'model': M1OptimizedTTS.is_model_loaded()
+        }
+
+    def readiness_markdown(self) -> str:
+        """Arayüzde gösterilecek hazır olma özeti"""
+        state = self.readiness()
+        catalog = "✅ hazır" if state['catalog'] else ("❌ hata" if self.catalog_error else "⏳ taranıyor")
+        if not self.model_ready.is_set():
+            model = "⏳ ısınıyor"
+        else:
+            model = "✅ yüklü" if state['model'] else "💤 ilk işte yüklenecek"
+        return f"**Ses kataloğu:** {catalog} | **XTTS modeli:** {model}"
@@ -0,0 +1,241 @@
+"""
+Audio DSP - Bellek İçi Ses İşleme (float32 numpy dizileri)
+Dosya/AudioSegment gidiş-dönüşü olmadan zaman esnetme, ton kaydırma,
+kazanç ve vurgu. Tüm motorlar (XTTS, tek konuşmacılı modeller) kullanabilir.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Duygu tonları → kazanç (dB) ve vurgu (yüksek frekans belirginliği)
+EMOTION_STYLES = {
+    "neutral": {"gain_db": 0.0, "emphasis": 0.0},
+    "happy": {"gain_db": 1.0, "emphasis": 0.15},
+    "excited": {"gain_db": 2.0, "emphasis": 0.3},
+    "sad": {"gain_db": -2.0, "emphasis": -0.3}
+}
+
+# Arayüzdeki ton adımı (-5..+5) → yarım ton (eski davranış: adım başına 0.1 oktav)
+SEMITONES_PER_PITCH_STEP = 1.2
+
+
+def time_stretch_wsola(
+    wav: np.ndarray,
+    rate: float,
+    sample_rate: int = 24000,
+    frame_ms: float = 30.0,
+    search_ms: float = 10.0
+) -> np.ndarray:
+    """
+    WSOLA ile zaman esnetme - ton değişmeden hız ayarı
+
+    Her çıkış çerçevesi için nominal konumun ±search_ms çevresinde önceki
+    çerçevenin doğal devamına en çok benzeyen parça seçilir (çapraz
+    korelasyon tek matris çarpımıyla hesaplanır) ve Hann penceresiyle
+    üst üste eklenir.
+
+    Args:
+        wav: Mono float32 ses
+        rate: Hız çarpanı (>1 hızlı/kısa, <1 yavaş/uzun)
+        sample_rate: Örnekleme hızı
+        frame_ms: Çerçeve uzunluğu (ms)
+        search_ms: Benzerlik arama aralığı (ms)
+
+    Returns:
+        Esnetilmiş float32 ses (uzunluk ≈ len(wav) / rate)
+    """
+    wav = np.asarray(wav, dtype=np.float32).reshape(-1)
+    if rate <= 0:
+        raise ValueError(f"Geçersiz hız: {rate}")
+    if abs(rate - 1.0) < 1e-3 or len(wav) == 0:
+        return wav
+
+    frame = int(sample_rate * frame_ms / 1000) // 2 * 2
+    hop_out = frame // 2
+    hop_in = hop_out * rate
+    tolerance = int(sample_rate * search_ms / 1000)
+
+    output_length = int(len(wav) / rate)
+    n_frames = int(np.ceil(output_length / hop_out)) + 1
+
+    # Baştaki ve sondaki aramalar dizi dışına taşmasın
+    padded = np.pad(wav, (tolerance, frame + 2 * tolerance + int(np.ceil(hop_in)) + hop_out))
+    window = np.hanning(frame).astype(np.float32)
+
+    output = np.zeros(n_frames * hop_out + frame, dtype=np.float32)
+    norm = np.zeros_like(output)
+
+    previous = tolerance
+    for k in range(n_frames):
+        nominal = int(k * hop_in) + tolerance
+        if k == 0:
+            position = nominal
+        else:
+            # Önceki çerçevenin doğal devamı ile aday çerçeveleri karşılaştır
+            natural = padded[previous + hop_out:previous + hop_out + frame]
+            start = nominal - tolerance
+            candidates = sliding_window_view(padded[start:start + 2 * tolerance + frame], frame)
+            position = start + int(np.argmax(candidates @ natural))
+
+        out_start = k * hop_out
+        output[out_start:out_start + frame] += padded[position:position + frame] * window
+        norm[out_start:out_start + frame] += window
+        previous = position
+
+    output /= np.maximum(norm, 1e-6)
+    return output[:output_length]
+
+
+def _stft(wav: np.ndarray, n_fft: int, hop: int, window: np.ndarray) -> np.ndarray:
+    padded = np.pad(wav, (n_fft // 2, n_fft // 2 + hop))
+    frames = sliding_window_view(padded, n_fft)[::hop] * window
+    return np.fft.rfft(frames, axis=1)
+
+
+def _istft(spec: np.ndarray, n_fft: int, hop: int, window: np.ndarray, length: int) -> np.ndarray:
+    frames = np.fft.irfft(spec, n=n_fft, axis=1).astype(np.float32) * window
+    n_frames = frames.shape[0]
+    total = n_frames * hop + n_fft
+
+    # Üst üste ekleme tek seferde: her çerçeve örneğinin çıkış indeksi
+    index = (np.arange(n_frames)[:, None] * hop + np.arange(n_fft)[None, :]).ravel()
+    output = np.bincount(index, weights=frames.ravel(), minlength=total)
+    norm = np.bincount(index, weights=np.tile(window ** 2, n_frames), minlength=total)
+
+    output = output / np.maximum(norm, 1e-6)
+    return output[n_fft // 2:n_fft // 2 + length].astype(np.float32)
+
+
+def _phase_vocoder(spec: np.ndarray, rate: float, hop: int, n_fft: int) -> np.ndarray:
+    """Spektrogramı zamanda `rate` kadar hızlandır (faz tutarlılığı korunur)"""
+    steps = np.arange(0, spec.shape[0] - 1, rate)
+    index = np.floor(steps).astype(int)
+    alpha = (steps - index)[:, None]
+
+    current, following = spec[index], spec[index + 1]
+    magnitude = (1 - alpha) * np.abs(current) + alpha * np.abs(following)
+
+    expected = 2 * np.pi * hop * np.arange(spec.shape[1]) / n_fft
+    delta = np.angle(following) - np.angle(current) - expected
+    delta -= 2 * np.pi * np.round(delta / (2 * np.pi))
+
+    advance = np.cumsum(expected + delta, axis=0)
+    phase = np.angle(spec[0]) + np.vstack([np.zeros((1, spec.shape[1])), advance[:-1]])
+    return magnitude * np.exp(1j * phase)
+
+
+def pitch_shift(wav: np.ndarray, semitones: float, sample_rate: int = 24000,
+                n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    """
+    Faz vokoderi ile ton kaydırma - süre değişmez
+
+    Ses önce faz vokoderiyle 2^(semitones/12) kat uzatılır, sonra doğrusal
+    enterpolasyonla orijinal uzunluğa yeniden örneklenir.
+
+    Args:
+        wav: Mono float32 ses
+        semitones: Yarım ton cinsinden kaydırma (+ yukarı, - aşağı)
+        sample_rate: Örnekleme hızı (arayüz uyumu için; hesaplamada kullanılmaz)
+
+    Returns:
+        Aynı uzunlukta float32 ses
+    """
+    wav = np.asarray(wav, dtype=np.float32).reshape(-1)
+    if abs(semitones) < 1e-3 or len(wav) < n_fft:
+        return wav
+
+    factor = 2.0 ** (semitones / 12.0)
+    window = np.hanning(n_fft).astype(np.float32)
+
+    spec = _stft(wav, n_fft, hop, window)
+    stretched_length = int(round(len(wav) * factor))
+    stretched = _istft(_phase_vocoder(spec, 1.0 / factor, hop, n_fft), n_fft, hop, window, stretched_length)
+
+    positions = np.linspace(0, len(stretched) - 1, len(wav))
+    return np.interp(positions, np.arange(len(stretched)), stretched).astype(np.float32)
+
+
+def apply_gain(wav: np.ndarray, gain_db: float) -> np.ndarray:
+    """Kazanç uygula (dB)"""
+    if gain_db == 0:
+        return wav
+    return wav * np.float32(10.0 ** (gain_db / 20.0))
+
+
+def apply_emphasis(wav: np.ndarray, amount: float) -> np.ndarray:
+    """
+    Vurgu: yüksek frekansları belirginleştir (+) veya yumuşat (-)
+
+    y[n] = x[n] + amount * (x[n] - x[n-1])
+    """
+    if amount == 0 or len(wav) < 2:
+        return wav
+    difference = np.diff(wav, prepend=wav[:1])
+    return wav + np.float32(amount) * difference
+
+
+def normalize_peak(wav: np.ndarray, target_db: float = -1.0) -> np.ndarray:
+    """Tepe seviyesini hedef dB'ye getir (pydub normalize ile aynı mantık)"""
+    peak = float(np.max(np.abs(wav))) if len(wav) else 0.0
+    if peak <= 0:
+        return wav
+    return wav * np.float32(10.0 ** (target_db / 20.0) / peak)
+
+
+class StyleProcessor:
+    """
+    Ton / kazanç / vurgu son işleme aşaması
+
+    Cümle dizileri bir thread havuzunda işlenir (numpy FFT ve dizi işlemleri
+    GIL'i bıraktığından cümleler paralel ilerler).
+    """
+
+    def __init__(self, sample_rate: int = 24000, pitch: float = 0, emotion: str = "neutral",
+                 normalize: bool = True, max_workers: Optional[int] = None):
+        """
+        Args:
+            sample_rate: Örnekleme hızı
+            pitch: Arayüz ton adımı (-5..+5)
+            emotion: Duygu tonu (neutral, happy, excited, sad)
+            normalize: Sonda tepe normalizasyonu yap
+            max_workers: Thread sayısı (None = CPU sayısına göre)
+        """
+        self.sample_rate = sample_rate
+        self.semitones = pitch * SEMITONES_PER_PITCH_STEP
+        style = EMOTION_STYLES.get(emotion, EMOTION_STYLES["neutral"])
+        self.gain_db = style["gain_db"]
+        self.emphasis = style["emphasis"]
+        self.normalize = normalize
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dsp")
+
+    @property
+    def active(self) -> bool:
+        """İşlenecek bir ayar var mı?"""
+        return bool(self.semitones or self.gain_db or self.emphasis)
+
+    def process(self, wav: np.ndarray) -> np.ndarray:
+        """Tek cümleye stil uygula"""
+        wav = pitch_shift(wav, self.semitones, self.sample_rate)
+        wav = apply_emphasis(wav, self.emphasis)
+        if self.normalize:
+            # Normalize edilecekse kazanç yalnızca tepe hedefini değiştirir
+            return normalize_peak(wav, min(-1.0 + self.gain_db, 0.0))
+        return apply_gain(wav, self.gain_db)
+
+    def submit(self, wav: np.ndarray) -> Future:
+        """Cümleyi arka planda işle (model sonraki cümleyi üretirken)"""
+        return self._executor.submit(self.process, wav)
+
+    def process_batch(self, wavs: List[np.ndarray]) -> List[np.ndarray]:
+        """Cümle listesine stil uygula (thread havuzunda, sıra korunur)"""
+        return list(self._executor.map(self.process, wavs))
+
+    def settings(self) -> Dict:
+        return {
+            'semitones': self.semitones,
+            'gain_db': self.gain_db,
+            'emphasis': self.emphasis
+        }
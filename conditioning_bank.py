@@ -0,0 +1,131 @@
+"""
+Conditioning Bank - Cümle Tipine Göre Referans Kesitleri
+Bir ses için soru, ünlem ve diyalog cümlelerinde kullanılacak ayrı referans
+kesitleri tanımlanır. Motor her kesitin XTTS latent'lerini bir kez hesaplar;
+seslendirme sırasında cümle tipine göre yalnızca sözlükten seçim yapılır.
+
+Kesitler iki yolla tanımlanabilir:
+    1. Ses dosyasının yanında `<ad>.styles.json`:
+       {"question": {"start": 12.0, "end": 20.0},
+        "exclamation": {"file": "benim_sesim_heyecan.wav"}}
+    2. Aynı klasörde `<ad>_question.wav`, `<ad>_exclamation.wav`, `<ad>_dialogue.wav`
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Set
+
+import soundfile as sf
+
+
+class ConditioningBank:
+    """Bir referans sesin cümle tipi → referans kesiti eşlemesi"""
+
+    SENTENCE_TYPES = ("question", "exclamation", "dialogue", "statement")
+    EXCERPT_DIR = "cache/excerpts"
+
+    def __init__(self, voice_path: str):
+        """
+        Args:
+            voice_path: Ana referans ses dosyası
+        """
+        self.voice_path = Path(voice_path)
+        self.manifest_path = self.voice_path.with_suffix(".styles.json")
+
+    @classmethod
+    def style_files(cls, voices_dir) -> Set[str]:
+        """
+        Klasörde başka bir sesin stil kesiti olarak kullanılan dosyalar
+
+        Bunlar bağımsız ses değildir: katalog ve indeksleyici atlar.
+
+        Args:
+            voices_dir: Ses klasörü
+
+        Returns:
+            Dosya adları (ör. {"benim_sesim_question.wav", "benim_sesim_heyecan.wav"})
+        """
+        voices_dir = Path(voices_dir)
+        claimed = set()
+
+        # `<ad>_<tip>.wav` - yalnızca `<ad>.wav` varsa kardeş dosyadır
+        for wav_file in voices_dir.glob("*_*.wav"):
+            stem, _, sentence_type = wav_file.stem.rpartition("_")
+            if sentence_type in cls.SENTENCE_TYPES and (voices_dir / f"{stem}.wav").exists():
+                claimed.add(wav_file.name)
+
+        # Manifest'lerde `file` ile gösterilen kesit dosyaları
+        for manifest in voices_dir.glob("*.styles.json"):
+            voice_path = voices_dir / (manifest.name[:-len(".styles.json")] + ".wav")
+            for entry in cls(str(voice_path))._load_manifest().values():
+                if isinstance(entry, dict) and entry.get('file'):
+                    name = Path(entry['file']).name
+                    if name != voice_path.name:
+                        claimed.add(name)
+
+        return claimed
+
+    def _load_manifest(self) -> Dict:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Stil manifest'i okunamadı ({self.manifest_path}): {e}")
+            return {}
+
+    def _cut_excerpt(self, source: Path, start: float, end: float) -> str:
+        """Kaynak sesin [start, end) aralığını cache'e WAV olarak yaz (yalnızca o aralık okunur)"""
+        stat = source.stat()
+        raw = f"{source.resolve()}|{stat.st_size}|{int(stat.st_mtime)}|{start}|{end}"
+        excerpt_path = Path(self.EXCERPT_DIR) / f"{hashlib.sha1(raw.encode('utf-8')).hexdigest()}.wav"
+
+        if not excerpt_path.exists():
+            sample_rate = sf.info(str(source)).samplerate
+            audio, _ = sf.read(
+                str(source),
+                start=int(start * sample_rate),
+                stop=int(end * sample_rate),
+                dtype='float32'
+            )
+            os.makedirs(self.EXCERPT_DIR, exist_ok=True)
+            temp_path = excerpt_path.with_suffix(".tmp.wav")
+            sf.write(str(temp_path), audio, sample_rate)
+            os.replace(temp_path, excerpt_path)
+
+        return str(excerpt_path)
+
+    def excerpts(self) -> Dict[str, str]:
+        """
+        Tanımlı kesitleri getir
+
+        Returns:
+            {cümle tipi: kesit WAV yolu} - tanımsız tipler ana referansı kullanır
+        """
+        result = {}
+
+        for sentence_type, entry in self._load_manifest().items():
+            if sentence_type not in self.SENTENCE_TYPES or not isinstance(entry, dict):
+                continue
+
+            source = self.voice_path
+            if entry.get('file'):
+                source = self.voice_path.parent / entry['file']
+            if not source.exists():
+                print(f"⚠️  Stil kesiti bulunamadı ({sentence_type}): {source}")
+                continue
+
+            if 'start' in entry and 'end' in entry:
+                result[sentence_type] = self._cut_excerpt(source, float(entry['start']), float(entry['end']))
+            else:
+                result[sentence_type] = str(source)
+
+        # Manifest'te olmayan tipler için kardeş dosyalar
+        for sentence_type in self.SENTENCE_TYPES:
+            candidate = self.voice_path.with_name(f"{self.voice_path.stem}_{sentence_type}.wav")
+            if sentence_type not in result and candidate.exists():
+                result[sentence_type] = str(candidate)
+
+        return result
@@ -5,9 +5,187 @@ OpenAI-compatible endpoint ile hızlı ses üretimi
 
 import requests
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
 from pydub import AudioSegment
+import threading
 import time
+import uuid
+
+
+class TTSEndpoint:
+    """Havuzdaki tek bir TTS sunucusu"""
+    
+    def __init__(self, url: str):
+        """
+        Args:
+            url: Sunucu URL'si (format: http://API_KEY@HOST:PORT veya http://HOST:PORT)
+        """
+        self.url = url.strip()
+        
+        # URL'yi parse et
+        if "@" in self.url:
+            # Format: http://API_KEY@HOST:PORT
+            parts = self.url.split("@")
+            self.api_key = parts[0].replace("http://", "").replace("https://", "")
+            self.base_url = f"http://{parts[1]}"
+        else:
+            # Sadece URL verilmiş
+            self.api_key = None
+            self.base_url = self.url
+        
+        self.outstanding = 0       # Devam eden istek sayısı
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.ejected_until = 0.0   # Bu zamana kadar havuz dışı
+    
+    def __repr__(self):
+        return f"TTSEndpoint({self.base_url}, outstanding={self.outstanding}, healthy={self.healthy})"
+
+
+class EndpointPool:
+    """
+    TTS sunucu havuzu - en az bekleyen istek yönlendirmesi
+    
+    Art arda hata veren veya sağlık kontrolünden geçemeyen sunucular havuzdan
+    çıkarılır (ejection) ve bekleme süresi dolunca sağlık kontrolünden geçerse
+    geri alınır. Son sağlıklı sunucu çıkarılmaz: tek sunuculu havuz geçici
+    hatalarda kilitlenmez. Havuz işi bitince close() ile kapatılmalıdır.
+    """
+    
+    def __init__(
+        self,
+        urls: List[str],
+        max_failures: int = 2,
+        eject_seconds: float = 30.0,
+        health_interval: float = 15.0,
+        health_path: str = "/health"
+    ):
+        """
+        Args:
+            urls: Sunucu URL'leri
+            max_failures: Havuzdan çıkarmadan önce izin verilen ardışık hata
+            eject_seconds: Havuz dışında kalma süresi (saniye)
+            health_interval: Arka plan sağlık kontrolü aralığı (saniye)
+            health_path: Sağlık kontrolü yolu
+        """
+        if not urls:
+            raise ValueError("En az bir TTS endpoint'i gerekli")
+        
+        self.endpoints = [TTSEndpoint(url) for url in urls]
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.health_interval = health_interval
+        self.health_path = health_path
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+        
+        # Tek sunucuda sağlık thread'ine gerek yok
+        if len(self.endpoints) > 1:
+            self._health_thread = threading.Thread(target=self._health_loop, name="tts-pool-health",
+                                                   daemon=True)
+            self._health_thread.start()
+    
+    def close(self):
+        """Sağlık kontrolü thread'ini durdur (birden fazla çağrı güvenli)"""
+        self._stop.set()
+        if self._health_thread is not None and self._health_thread is not threading.current_thread():
+            self._health_thread.join(timeout=5)
+    
+    def __len__(self):
+        return len(self.endpoints)
+    
+    def check_health(self, endpoint: TTSEndpoint) -> bool:
+        """Sunucu ayakta mı? (5xx dışındaki her yanıt sağlıklı sayılır)"""
+        try:
+            response = requests.get(f"{endpoint.base_url}{self.health_path}", timeout=3)
+            return response.status_code < 500
+        except requests.exceptions.RequestException:
+            return False
+    
+    def _readmit_expired(self):
+        """Bekleme süresi dolan sunucuları sağlık kontrolüyle geri al"""
+        now = time.time()
+        with self._lock:
+            candidates = [e for e in self.endpoints if not e.healthy and e.ejected_until <= now]
+        
+        for endpoint in candidates:
+            ok = self.check_health(endpoint)
+            with self._lock:
+                if ok:
+                    endpoint.healthy = True
+                    endpoint.consecutive_failures = 0
+                else:
+                    endpoint.ejected_until = time.time() + self.eject_seconds
+        
+            if ok:
+                print(f"   ✅ Endpoint havuza geri alındı: {endpoint.base_url}")
+    
+    def _probe_healthy(self):
+        """Havuzdaki sunucuları yokla - yanıt vermeyenleri çıkar"""
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.healthy]
+        
+        for endpoint in candidates:
+            if self._stop.is_set() or self.check_health(endpoint):
+                continue
+            with self._lock:
+                others_healthy = any(e.healthy for e in self.endpoints if e is not endpoint)
+                if not endpoint.healthy or not others_healthy:
+                    continue
+                endpoint.healthy = False
+                endpoint.ejected_until = time.time() + self.eject_seconds
+            print(f"   ⛔ Endpoint sağlık kontrolünden geçemedi, havuzdan çıkarıldı: {endpoint.base_url}")
+    
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self._probe_healthy()
+            self._readmit_expired()
+    
+    def acquire(self, exclude: Optional[set] = None) -> Optional[TTSEndpoint]:
+        """
+        En az bekleyen isteği olan sağlıklı sunucuyu seç
+        
+        Args:
+            exclude: Bu istek için zaten denenmiş sunucular
+            
+        Returns:
+            Seçilen sunucu (hiç uygun yoksa None)
+        """
+        exclude = exclude or set()
+        
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.healthy and id(e) not in exclude]
+        
+        if not healthy:
+            # Hepsi düşmüşse süresi dolanlara hemen bir şans ver
+            self._readmit_expired()
+            with self._lock:
+                healthy = [e for e in self.endpoints if e.healthy and id(e) not in exclude]
+        
+        with self._lock:
+            if not healthy:
+                return None
+            endpoint = min(healthy, key=lambda e: e.outstanding)
+            endpoint.outstanding += 1
+            return endpoint
+    
+    def release(self, endpoint: TTSEndpoint, success: bool):
+        """İstek bitti - sonuca göre sunucu durumunu güncelle"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            
+            if success:
+                endpoint.consecutive_failures = 0
+                return
+            
+            endpoint.consecutive_failures += 1
+            others_healthy = any(e.healthy for e in self.endpoints if e is not endpoint)
+            if endpoint.healthy and others_healthy and endpoint.consecutive_failures >= self.max_failures:
+                endpoint.healthy = False
+                endpoint.ejected_until = time.time() + self.eject_seconds
+                print(f"   ⛔ Endpoint havuzdan çıkarıldı ({self.eject_seconds:.0f}s): {endpoint.base_url}")
 
 
 class CustomTTSAPI:
@@ -16,28 +194,32 @@ class CustomTTSAPI:
     API: http://sk-5aa9382d8a504e31a0fa260817bc65fd@91.218.66.217:443
     """
     
-    def __init__(self, api_url: str = None):
+    def __init__(self, api_url: Union[str, List[str]] = None):
         """
         API başlat
         
         Args:
-            api_url: Full API URL (format: http://API_KEY@HOST:PORT)
+            api_url: Full API URL (format: http://API_KEY@HOST:PORT). Birden fazla
+                sunucu için liste veya virgülle ayrılmış URL'ler verilebilir.
         """
-        self.api_url = api_url or "http://sk-5aa9382d8a504e31a0fa260817bc65fd@91.218.66.217:443"
+        api_url = api_url or "http://sk-5aa9382d8a504e31a0fa260817bc65fd@91.218.66.217:443"
         
-        # URL'yi parse et
-        if "@" in self.api_url:
-            # Format: http://API_KEY@HOST:PORT
-            parts = self.api_url.split("@")
-            self.api_key = parts[0].replace("http://", "").replace("https://", "")
-            self.base_url = f"http://{parts[1]}"
+        if isinstance(api_url, str):
+            urls = [u for u in api_url.split(",") if u.strip()]
         else:
-            # Sadece URL verilmiş
-            self.api_key = None
-            self.base_url = self.api_url
+            urls = list(api_url)
+        
+        self.pool = EndpointPool(urls)
+        
+        # Geriye dönük uyumluluk - ilk sunucu
+        primary = self.pool.endpoints[0]
+        self.api_url = primary.url
+        self.api_key = primary.api_key
+        self.base_url = primary.base_url
         
         self._safe_print(f"⚡ Özel TTS API hazır!")
-        self._safe_print(f"📡 Endpoint: {self.base_url}")
+        for endpoint in self.pool.endpoints:
+            self._safe_print(f"📡 Endpoint: {endpoint.base_url}")
     
     def _safe_print(self, message: str):
         """Güvenli print - BrokenPipe hatası önlenir"""
@@ -46,10 +228,17 @@ class CustomTTSAPI:
         except (BrokenPipeError, IOError):
             pass
     
+    def close(self):
+        """Sunucu havuzunun sağlık kontrolünü durdur"""
+        self.pool.close()
+    
     def generate_speech(self, text: str, voice: str = "alloy", output_path: str = None) -> bytes:
         """
         Tek bir metni seslendirme
         
+        Sunucu hatası veya bağlantı sorununda istek havuzdaki diğer
+        sunucularla tekrar denenir.
+        
         Args:
             text: Seslendirilecek metin
             voice: Ses tipi (alloy, echo, fable, onyx, nova, shimmer)
@@ -58,13 +247,6 @@ class CustomTTSAPI:
         Returns:
             Audio bytes (MP3)
         """
-        url = f"{self.base_url}/v1/audio/speech"
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         data = {
             "model": "tts-1-hd",  # Yüksek kalite
             "input": text,
@@ -72,32 +254,63 @@ class CustomTTSAPI:
             "response_format": "mp3"
         }
         
-        try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+        tried = set()
+        last_error = None
+        
+        while len(tried) < len(self.pool):
+            endpoint = self.pool.acquire(exclude=tried)
+            if endpoint is None:
+                break
+            tried.add(id(endpoint))
             
-            if response.status_code == 200:
-                audio_bytes = response.content
-                
-                if output_path:
-                    with open(output_path, 'wb') as f:
-                        f.write(audio_bytes)
-                
-                return audio_bytes
-            else:
+            url = f"{endpoint.base_url}/v1/audio/speech"
+            headers = {
+                "Authorization": f"Bearer {endpoint.api_key}",
+                "Content-Type": "application/json"
+            }
+            
+            try:
+                response = requests.post(url, json=data, headers=headers, timeout=30)
+            except requests.exceptions.Timeout:
+                self.pool.release(endpoint, success=False)
+                last_error = "API zaman aşımı - 30 saniye"
+                continue
+            except requests.exceptions.ConnectionError:
+                self.pool.release(endpoint, success=False)
+                last_error = f"API bağlantı hatası - {endpoint.base_url}"
+                continue
+            except Exception as e:
+                self.pool.release(endpoint, success=False)
+                raise Exception(f"API hatası: {str(e)}")
+            
+            if response.status_code >= 500:
+                # Sunucu tarafı hata - başka sunucuda dene
+                self.pool.release(endpoint, success=False)
+                last_error = f"API Hatası: {response.status_code} - {response.text}"
+                continue
+            
+            # Sunucu yanıt verdi - 4xx hatalar isteğin kendisinden kaynaklanır
+            self.pool.release(endpoint, success=True)
+            
+            if response.status_code != 200:
                 raise Exception(f"API Hatası: {response.status_code} - {response.text}")
+            
+            audio_bytes = response.content
+            
+            if output_path:
+                with open(output_path, 'wb') as f:
+                    f.write(audio_bytes)
+            
+            return audio_bytes
         
-        except requests.exceptions.Timeout:
-            raise Exception("API zaman aşımı - 30 saniye")
-        except requests.exceptions.ConnectionError:
-            raise Exception(f"API bağlantı hatası - {self.base_url}")
-        except Exception as e:
-            raise Exception(f"API hatası: {str(e)}")
+        raise Exception(f"API hatası: {last_error or 'Sağlıklı endpoint yok'}")
     
     def generate_audiobook(
         self, 
         sentences: List[Dict], 
         voice: str = "alloy", 
-        output_path: str = None
+        output_path: str = None,
+        max_workers: Optional[int] = None
     ) -> str:
         """
         Tüm kitabı seslendir (ÇOK HIZLI!)
@@ -106,6 +319,7 @@ class CustomTTSAPI:
             sentences: Cümle listesi (sentence_processor'dan gelen)
             voice: Ses tipi
             output_path: Çıktı dosyası
+            max_workers: Paralel istek sayısı (None ise endpoint sayısı kadar)
             
         Returns:
             Output MP3 dosya yolu
@@ -121,21 +335,38 @@ class CustomTTSAPI:
         self._safe_print(f"🎤 Ses tipi: {voice}")
         self._safe_print(f"⏱️  Tahmini süre: ~{total * 0.3 / 60:.1f} dakika")
         self._safe_print(f"🚀 Hız: ~0.3 saniye/cümle (XTTS'den 5x hızlı!)")
+        
+        workers = max_workers or len(self.pool)
+        if workers > 1:
+            self._safe_print(f"🔀 Paralel istek: {workers} ({len(self.pool)} endpoint)")
         self._safe_print(f"{'='*60}\n")
         
         start_time = time.time()
         
-        # Geçici dosyalar klasörü
-        temp_dir = "temp_chunks"
+        # Geçici dosyalar klasörü - çağrıya özel: temizlik diğer işlerin parçalarına dokunmaz
+        temp_dir = os.path.join("temp_chunks", f"custom_{uuid.uuid4().hex[:12]}")
         os.makedirs(temp_dir, exist_ok=True)
         
+        def fetch(i: int) -> Optional[Exception]:
+            # API'den ses al (çok hızlı - ~0.3 saniye!)
+            temp_path = os.path.join(temp_dir, f"api_chunk_{i:04d}.mp3")
+            try:
+                self.generate_speech(sentences[i]['text'], voice, temp_path)
+                return None
+            except Exception as e:
+                return e
+        
+        executor = ThreadPoolExecutor(max_workers=workers)
+        # map() sonuçları sırayla döndürür - cümle sırası korunur
+        fetch_errors = executor.map(fetch, range(total))
+        
         for i, sentence_data in enumerate(sentences):
-            text = sentence_data['text']
             temp_path = os.path.join(temp_dir, f"api_chunk_{i:04d}.mp3")
             
             try:
-                # API'den ses al (çok hızlı - ~0.3 saniye!)
-                self.generate_speech(text, voice, temp_path)
+                error = next(fetch_errors)
+                if error is not None:
+                    raise error
                 
                 # Ses dosyasını yükle
                 audio = AudioSegment.from_mp3(temp_path)
@@ -163,6 +394,8 @@ class CustomTTSAPI:
                 failed_sentences.append(i)
                 continue
         
+        executor.shutdown(wait=True)
+        
         if not audio_chunks:
             raise Exception("❌ Hiç ses üretilemedi!")
         
@@ -131,7 +131,7 @@ class TurkishVoiceDownloader:
         print("="*70)
         
         try:
-            from TTS.api import TTS
+            from model_registry import get_model
             
             # Mevcut ses dosyalarını kontrol et
             existing_voices = list(self.voices_dir.glob("*.wav"))
@@ -148,8 +148,8 @@ class TurkishVoiceDownloader:
             print(f"📌 Referans ses: {reference_voice.name}")
             
             # XTTS v2 modeli
-            print("📥 XTTS v2 modeli yükleniyor...")
-            tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to("cpu")
+            model = get_model(device="cpu")
+            tts = model.tts
             
             # Örnek metinler
             sample_texts = {
@@ -165,12 +165,13 @@ class TurkishVoiceDownloader:
                 print(f"\n   Oluşturuluyor: {voice_type} sesi...")
                 
                 # Referans sesi kullanarak klon
-                tts.tts_to_file(
-                    text=text,
-                    speaker_wav=str(reference_voice),  # Referans ses eklendi
-                    language="tr",
-                    file_path=str(output_path)
-                )
+                with model.lock:
+                    tts.tts_to_file(
+                        text=text,
+                        speaker_wav=str(reference_voice),  # Referans ses eklendi
+                        language="tr",
+                        file_path=str(output_path)
+                    )
                 
                 print(f"   ✅ Kaydedildi: {output_path}")
             
@@ -5,8 +5,14 @@ Türkçe sesler için optimize edilmiş ElevenLabs entegrasyon modülü
 
 import requests
 import os
+import io
+import time
+import hashlib
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List
+from concurrent.futures import ThreadPoolExecutor
 import json
 
 
@@ -85,20 +91,42 @@ class ElevenLabsTTS:
         }
     }
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, use_cache: bool = True):
         """
         ElevenLabs TTS'yi başlat
         
         Args:
             api_key: ElevenLabs API anahtarı (None ise çevre değişkeninden alınır)
+            use_cache: Aynı metin/ses/ayar için önceki yanıtı tekrar kullan
         """
         self.api_key = api_key or os.getenv("ELEVENLABS_API_KEY")
         self.base_url = "https://api.elevenlabs.io/v1"
+        self.model_id = "eleven_multilingual_v2"  # Türkçe için ÇOK ÖNEMLİ!
+        
+        # Kota koruması: yanıt cache'i + yerel karakter defteri
+        self.cache = ElevenLabsResponseCache() if use_cache else None
+        self.ledger = ElevenLabsUsageLedger(
+            monthly_quota=ElevenLabsConfig.load_monthly_quota()
+        )
         
         if not self.api_key:
             print("⚠️  UYARI: ElevenLabs API anahtarı bulunamadı!")
             print("   ELEVENLABS_API_KEY çevre değişkenini ayarlayın veya")
             print("   config.json dosyasına API anahtarınızı ekleyin.")
+        else:
+            # Defter gerçek kullanımla arka planda eşitlenir (başlatma beklemez)
+            threading.Thread(target=self.refresh_usage, name="elevenlabs-usage", daemon=True).start()
+    
+    def refresh_usage(self) -> bool:
+        """
+        Kullanım defterini hesabın gerçek kullanımıyla eşitle
+        
+        Returns:
+            Başarılı ise True (API anahtarı yoksa veya istek başarısızsa False)
+        """
+        if not self.api_key:
+            return False
+        return self.ledger.sync_with_api(self.api_key, self.base_url)
     
     def _safe_print(self, message: str):
         """Güvenli print (BrokenPipeError önleme)"""
@@ -107,6 +135,105 @@ class ElevenLabsTTS:
         except (BrokenPipeError, IOError):
             pass
     
+    def _build_request(
+        self,
+        text: str,
+        voice_name: str,
+        stability: float,
+        similarity_boost: float,
+        style: float,
+        use_speaker_boost: bool
+    ) -> Optional[tuple]:
+        """
+        İstek başlıklarını ve gövdesini hazırla
+        
+        Returns:
+            (voice_info, voice_id, headers, data) veya None (hata durumunda)
+        """
+        if not self.api_key:
+            self._safe_print("❌ API anahtarı bulunamadı!")
+            return None
+        
+        # Ses ID'sini al
+        voice_info = self.TURKISH_VOICES.get(voice_name.lower())
+        if not voice_info:
+            self._safe_print(f"❌ Bilinmeyen ses: {voice_name}")
+            return None
+        
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.api_key
+        }
+        
+        data = {
+            "text": text,
+            "model_id": self.model_id,
+            "voice_settings": {
+                "stability": stability,
+                "similarity_boost": similarity_boost,
+                "style": style,
+                "use_speaker_boost": use_speaker_boost
+            }
+        }
+        
+        return voice_info, voice_info["voice_id"], headers, data
+    
+    def _cache_key(self, data: Dict, voice_id: str) -> str:
+        """İstek gövdesinden cache anahtarı üret"""
+        return ElevenLabsResponseCache.make_key(
+            data["text"], voice_id, data["model_id"], data["voice_settings"]
+        )
+    
+    def _write_output(self, output_path: str, audio_data: bytes):
+        """MP3 olarak kaydet"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(output_path, "wb") as f:
+            f.write(audio_data)
+        
+        self._safe_print(f"   ✅ Kaydedildi: {output_path}")
+    
+    def estimate_billable_characters(
+        self,
+        texts: List[str],
+        voice_name: str = "ada",
+        stability: float = 0.5,
+        similarity_boost: float = 0.75,
+        style: float = 0.0,
+        use_speaker_boost: bool = True
+    ) -> int:
+        """
+        Gönderilirse faturalanacak karakter sayısı (cache'te olanlar hariç)
+        
+        Args:
+            texts: Seslendirilecek metinler
+            voice_name: Ses adı
+            
+        Returns:
+            Faturalanacak toplam karakter
+        """
+        voice_info = self.TURKISH_VOICES.get(voice_name.lower())
+        if not voice_info or not self.cache:
+            return sum(len(t) for t in texts)
+        
+        voice_settings = {
+            "stability": stability,
+            "similarity_boost": similarity_boost,
+            "style": style,
+            "use_speaker_boost": use_speaker_boost
+        }
+        
+        billable = 0
+        for text in texts:
+            key = ElevenLabsResponseCache.make_key(
+                text, voice_info["voice_id"], self.model_id, voice_settings
+            )
+            if not self.cache.contains(key):
+                billable += len(text)
+        return billable
+    
     def generate_speech(
         self, 
         text: str, 
@@ -132,36 +259,34 @@ class ElevenLabsTTS:
         Returns:
             Audio bytes veya None (hata durumunda)
         """
-        if not self.api_key:
-            self._safe_print("❌ API anahtarı bulunamadı!")
-            return None
-        
-        # Ses ID'sini al
-        voice_info = self.TURKISH_VOICES.get(voice_name.lower())
-        if not voice_info:
-            self._safe_print(f"❌ Bilinmeyen ses: {voice_name}")
+        request = self._build_request(
+            text, voice_name, stability, similarity_boost, style, use_speaker_boost
+        )
+        if request is None:
             return None
         
-        voice_id = voice_info["voice_id"]
+        voice_info, voice_id, headers, data = request
         url = f"{self.base_url}/text-to-speech/{voice_id}"
         
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.api_key
-        }
+        # Cache kontrolü - aynı istek tekrar faturalanmaz
+        cache_key = self._cache_key(data, voice_id)
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached:
+                self._safe_print(f"♻️  Cache'ten alındı ({voice_info['name']}, 0 karakter)")
+                if output_path:
+                    self._write_output(output_path, cached)
+                return cached
         
-        data = {
-            "text": text,
-            "model_id": "eleven_multilingual_v2",  # Türkçe için ÇOK ÖNEMLİ!
-            "voice_settings": {
-                "stability": stability,
-                "similarity_boost": similarity_boost,
-                "style": style,
-                "use_speaker_boost": use_speaker_boost
-            }
-        }
+        # Kota kontrolü - istek gönderilmeden önce
+        if not self.ledger.try_reserve(len(text)):
+            self._safe_print(
+                f"❌ Aylık kota yetersiz: {len(text)} karakter gerekli, "
+                f"~{self.ledger.remaining()} kaldı"
+            )
+            return None
         
+        response = None
         try:
             self._safe_print(f"🎙️  ElevenLabs ile seslendiriliyor ({voice_info['name']})...")
             response = requests.post(url, json=data, headers=headers, timeout=60)
@@ -169,29 +294,278 @@ class ElevenLabsTTS:
             if response.status_code == 200:
                 audio_data = response.content
                 
+                if self.cache:
+                    self.cache.put(cache_key, audio_data)
+                
                 if output_path:
-                    # MP3 olarak kaydet
-                    output_path = Path(output_path)
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    with open(output_path, "wb") as f:
-                        f.write(audio_data)
-                    
-                    self._safe_print(f"   ✅ Kaydedildi: {output_path}")
+                    self._write_output(output_path, audio_data)
                 
                 return audio_data
             else:
-                error_msg = response.json().get("detail", {}).get("message", "Bilinmeyen hata")
+                # Hata gövdesi JSON olmayabilir (ör. proxy'den HTML 502)
+                try:
+                    error_msg = response.json().get("detail", {}).get("message", "Bilinmeyen hata")
+                except ValueError:
+                    error_msg = response.text[:200]
+                self.ledger.release(len(text))
                 self._safe_print(f"❌ API Hatası ({response.status_code}): {error_msg}")
                 return None
                 
         except requests.exceptions.Timeout:
+            # Zaman aşımında sunucu metni işlemiş olabilir - rezervasyon korunur
             self._safe_print("❌ İstek zaman aşımına uğradı (60 saniye)")
             return None
         except Exception as e:
+            # Yanıt hiç alınmadıysa karakterler faturalanmadı; yanıt alındıysa
+            # rezervasyon ya faturalandı ya da hata dalında zaten geri verildi
+            if response is None:
+                self.ledger.release(len(text))
             self._safe_print(f"❌ Hata: {e}")
             return None
     
+    def generate_speech_stream(
+        self,
+        text: str,
+        voice_name: str = "ada",
+        output_path: Optional[str] = None,
+        stability: float = 0.5,
+        similarity_boost: float = 0.75,
+        style: float = 0.0,
+        use_speaker_boost: bool = True,
+        chunk_size: int = 4096,
+        optimize_streaming_latency: int = 3
+    ) -> Iterator[bytes]:
+        """
+        Metni akış (streaming) modunda seslendir
+        
+        `/text-to-speech/{voice_id}/stream` uç noktasını kullanır; MP3 parçaları
+        geldikçe döndürülür, böylece dinleme ilk parça ile başlayabilir.
+        
+        Args:
+            text: Seslendirilecek metin
+            voice_name: Ses adı (ada, emre, aylin, burak)
+            output_path: Parçaların aynı anda yazılacağı dosya (None ise yazılmaz)
+            stability: Ses kararlılığı (0-1)
+            similarity_boost: Ses benzerliği (0-1)
+            style: Stil yoğunluğu (0-1)
+            use_speaker_boost: Konuşmacı güçlendirme
+            chunk_size: Okuma parça boyutu (byte)
+            optimize_streaming_latency: ElevenLabs gecikme optimizasyonu (0-4)
+            
+        Yields:
+            MP3 audio parçaları (bytes)
+        """
+        request = self._build_request(
+            text, voice_name, stability, similarity_boost, style, use_speaker_boost
+        )
+        if request is None:
+            return
+        
+        voice_info, voice_id, headers, data = request
+        url = f"{self.base_url}/text-to-speech/{voice_id}/stream"
+        params = {"optimize_streaming_latency": optimize_streaming_latency}
+        
+        # Cache'te varsa akışı yerel veriden besle
+        cache_key = self._cache_key(data, voice_id)
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached:
+                self._safe_print(f"♻️  Cache'ten alındı ({voice_info['name']}, 0 karakter)")
+                if output_path:
+                    self._write_output(output_path, cached)
+                for offset in range(0, len(cached), chunk_size):
+                    yield cached[offset:offset + chunk_size]
+                return
+        
+        if not self.ledger.try_reserve(len(text)):
+            self._safe_print(
+                f"❌ Aylık kota yetersiz: {len(text)} karakter gerekli, "
+                f"~{self.ledger.remaining()} kaldı"
+            )
+            return
+        
+        sink = None
+        received = []
+        completed = False
+        try:
+            self._safe_print(f"🎙️  ElevenLabs akış başlatılıyor ({voice_info['name']})...")
+            # timeout=(bağlantı, parça arası okuma) - toplam süre sınırı yok
+            with requests.post(
+                url, json=data, headers=headers, params=params,
+                stream=True, timeout=(10, 30)
+            ) as response:
+                if response.status_code != 200:
+                    try:
+                        error_msg = response.json().get("detail", {}).get("message", "Bilinmeyen hata")
+                    except ValueError:
+                        error_msg = response.text[:200]
+                    self.ledger.release(len(text))
+                    self._safe_print(f"❌ API Hatası ({response.status_code}): {error_msg}")
+                    return
+                
+                if output_path:
+                    output_path = Path(output_path)
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    sink = open(output_path, "wb")
+                
+                start_time = time.time()
+                first_chunk = True
+                
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if not chunk:
+                        continue
+                    
+                    if first_chunk:
+                        self._safe_print(f"   ⚡ İlk ses parçası: {time.time() - start_time:.2f} sn")
+                        first_chunk = False
+                    
+                    if sink:
+                        sink.write(chunk)
+                        sink.flush()
+                    
+                    received.append(chunk)
+                    yield chunk
+                
+                completed = True
+            
+            # Yalnızca eksiksiz akışlar cache'lenir
+            if completed and received and self.cache:
+                self.cache.put(cache_key, b"".join(received))
+            
+            if sink:
+                self._safe_print(f"   ✅ Kaydedildi: {output_path}")
+                
+        except requests.exceptions.Timeout:
+            self._safe_print("❌ Akış zaman aşımına uğradı")
+            if not received:
+                self.ledger.release(len(text))
+        except Exception as e:
+            # Hiç ses gelmediyse (bağlantı hatası) rezervasyon geri verilir
+            self._safe_print(f"❌ Hata: {e}")
+            if not received:
+                self.ledger.release(len(text))
+        finally:
+            if sink:
+                sink.close()
+    
+    def generate_audiobook(
+        self,
+        sentences: List[Dict],
+        voice_name: str = "ada",
+        output_path: Optional[str] = None,
+        stability: float = 0.5,
+        similarity_boost: float = 0.75,
+        max_workers: int = 4
+    ) -> str:
+        """
+        Tüm kitabı paralel isteklerle seslendir
+        
+        Args:
+            sentences: Cümle listesi (sentence_processor'dan gelen)
+            voice_name: Ses adı (ada, emre, aylin, burak)
+            output_path: Çıktı MP3 dosyası
+            stability: Ses kararlılığı (0-1)
+            similarity_boost: Ses benzerliği (0-1)
+            max_workers: Aynı anda gönderilecek istek sayısı
+                (ElevenLabs planınızın eşzamanlılık limitini aşmayın)
+            
+        Returns:
+            Output MP3 dosya yolu
+        """
+        from pydub import AudioSegment
+        
+        total = len(sentences)
+        self._safe_print(f"\n{'='*60}")
+        self._safe_print(f"🌐 ELEVENLABS - PARALEL SESLENDIRME")
+        self._safe_print(f"{'='*60}")
+        self._safe_print(f"📝 Cümle sayısı: {total}")
+        self._safe_print(f"🎤 Ses: {voice_name}")
+        self._safe_print(f"🔀 Paralel istek: {max_workers}")
+        self._safe_print(f"{'='*60}\n")
+        
+        # Kota kontrolü - hiçbir istek gönderilmeden önce (başka cihazlardan
+        # yapılan kullanım da sayılsın diye defter önce eşitlenir)
+        self.refresh_usage()
+        billable = self.estimate_billable_characters(
+            [s['text'] for s in sentences],
+            voice_name=voice_name,
+            stability=stability,
+            similarity_boost=similarity_boost
+        )
+        remaining = self.ledger.remaining()
+        self._safe_print(f"💳 Faturalanacak: {billable:,} karakter (kalan ~{remaining:,})")
+        
+        if billable > remaining:
+            raise Exception(
+                f"❌ Aylık kota yetersiz: {billable:,} karakter gerekli, ~{remaining:,} kaldı"
+            )
+        
+        start_time = time.time()
+        
+        def synthesize(sentence_data: Dict) -> Optional[bytes]:
+            return self.generate_speech(
+                text=sentence_data['text'],
+                voice_name=voice_name,
+                stability=stability,
+                similarity_boost=similarity_boost
+            )
+        
+        audio_chunks = []
+        failed_sentences = []
+        
+        # map() sonuçları sırayla döndürür - cümle sırası korunur
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for i, audio_data in enumerate(executor.map(synthesize, sentences)):
+                if not audio_data:
+                    failed_sentences.append(i)
+                    continue
+                
+                try:
+                    audio = AudioSegment.from_file(io.BytesIO(audio_data), format="mp3")
+                    audio = audio.normalize()
+                    
+                    pause_ms = int(sentences[i].get('pause_after', 0.5) * 1000)
+                    audio_chunks.append(audio + AudioSegment.silent(duration=pause_ms))
+                except Exception as e:
+                    self._safe_print(f"   ⚠️  Hata (cümle {i}): {e}")
+                    failed_sentences.append(i)
+                    continue
+                
+                if (i + 1) % 10 == 0 or (i + 1) == total:
+                    progress_pct = ((i + 1) / total) * 100
+                    self._safe_print(f"   ⏳ {i+1}/{total} ({progress_pct:.1f}%)")
+        
+        if not audio_chunks:
+            raise Exception("❌ Hiç ses üretilemedi!")
+        
+        self._safe_print("\n🔗 Ses dosyaları birleştiriliyor...")
+        final_audio = sum(audio_chunks)
+        final_audio = final_audio.normalize()
+        
+        if not output_path:
+            output_path = f"outputs/elevenlabs_audiobook_{int(time.time())}.mp3"
+        
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        
+        self._safe_print(f"💾 Kaydediliyor: {output_path}")
+        final_audio.export(output_path, format="mp3", bitrate="192k", parameters=["-q:a", "2"])
+        
+        elapsed_minutes = (time.time() - start_time) / 60
+        
+        self._safe_print(f"\n{'='*60}")
+        self._safe_print(f"✅ TAMAMLANDI!")
+        self._safe_print(f"📁 Dosya: {output_path}")
+        self._safe_print(f"⏱️  İşlem süresi: {elapsed_minutes:.1f} dakika")
+        self._safe_print(f"📊 Başarılı: {len(audio_chunks)}/{total} cümle")
+        
+        if failed_sentences:
+            self._safe_print(f"⚠️  Başarısız: {len(failed_sentences)} cümle")
+            self._safe_print(f"   Cümle numaraları: {failed_sentences[:10]}")
+        
+        self._safe_print(f"{'='*60}")
+        
+        return output_path
+    
     def generate_with_profile(
         self,
         text: str,
@@ -279,6 +653,173 @@ class ElevenLabsTTS:
         print("\n" + "="*70)
 
 
+class ElevenLabsResponseCache:
+    """
+    ElevenLabs yanıt cache'i (diskte kalıcı)
+    
+    Anahtar: metin + voice ID + model ID + ses ayarları. Aynı istek
+    tekrar gönderilmez, böylece karakter kotası harcanmaz.
+    """
+    
+    def __init__(self, cache_dir: str = "cache/elevenlabs"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def make_key(text: str, voice_id: str, model_id: str, voice_settings: Dict) -> str:
+        """İstek parametrelerinden kararlı bir anahtar üret"""
+        payload = json.dumps(
+            {
+                "text": text,
+                "voice_id": voice_id,
+                "model_id": model_id,
+                "voice_settings": voice_settings
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.mp3"
+    
+    def contains(self, key: str) -> bool:
+        """Anahtar cache'te mi?"""
+        return self._path(key).exists()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Cache'ten oku (yoksa None)"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def put(self, key: str, audio_data: bytes):
+        """Cache'e yaz (önce geçici dosya, sonra rename - yarım dosya kalmaz)"""
+        path = self._path(key)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(audio_data)
+            os.replace(temp_path, path)
+        except OSError:
+            if temp_path.exists():
+                temp_path.unlink()
+
+
+class ElevenLabsUsageLedger:
+    """
+    Yerel karakter kullanım defteri
+    
+    Gönderilen karakterleri aylık olarak sayar, kalan kotayı tahmin eder ve
+    kotayı aşacak istekleri gönderilmeden reddeder.
+    """
+    
+    LEDGER_FILE = Path("elevenlabs_usage.json")
+    
+    def __init__(self, monthly_quota: int = 10000, ledger_file: Optional[Path] = None):
+        """
+        Args:
+            monthly_quota: Aylık karakter kotası (ücretsiz plan: 10,000)
+            ledger_file: Defter dosyası (None ise elevenlabs_usage.json)
+        """
+        self.monthly_quota = monthly_quota
+        self.ledger_file = Path(ledger_file) if ledger_file else self.LEDGER_FILE
+        self._lock = threading.Lock()
+        self.data = self._load()
+    
+    def _load(self) -> Dict:
+        if self.ledger_file.exists():
+            try:
+                with open(self.ledger_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {"months": {}}
+    
+    def _save(self):
+        temp_path = self.ledger_file.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(temp_path, self.ledger_file)
+    
+    @staticmethod
+    def _month_key() -> str:
+        return datetime.now().strftime("%Y-%m")
+    
+    def _month(self) -> Dict:
+        return self.data["months"].setdefault(
+            self._month_key(), {"characters": 0, "requests": 0}
+        )
+    
+    def used(self) -> int:
+        """Bu ay kullanılan karakter"""
+        with self._lock:
+            return self._month()["characters"]
+    
+    def remaining(self) -> int:
+        """Bu ay kalan tahmini karakter"""
+        with self._lock:
+            return max(0, self.monthly_quota - self._month()["characters"])
+    
+    def try_reserve(self, characters: int) -> bool:
+        """
+        Karakterleri kotadan düş (yeterli değilse False, hiçbir şey düşülmez)
+        
+        Paralel isteklerde kontrol ve düşme atomik olsun diye tek adımda yapılır.
+        """
+        with self._lock:
+            month = self._month()
+            if month["characters"] + characters > self.monthly_quota:
+                return False
+            month["characters"] += characters
+            month["requests"] += 1
+            self._save()
+            return True
+    
+    def release(self, characters: int):
+        """Başarısız istek için rezervasyonu geri al"""
+        with self._lock:
+            month = self._month()
+            month["characters"] = max(0, month["characters"] - characters)
+            month["requests"] = max(0, month["requests"] - 1)
+            self._save()
+    
+    def sync_with_api(self, api_key: str, base_url: str = "https://api.elevenlabs.io/v1") -> bool:
+        """
+        Gerçek kullanımı /user/subscription'dan al (başka cihazlardan yapılan
+        kullanımlar da hesaba katılır)
+        
+        Returns:
+            Başarılı ise True
+        """
+        try:
+            response = requests.get(
+                f"{base_url}/user/subscription",
+                headers={"xi-api-key": api_key},
+                timeout=10
+            )
+            if response.status_code != 200:
+                return False
+            
+            info = response.json()
+            with self._lock:
+                self.monthly_quota = info.get("character_limit", self.monthly_quota)
+                month = self._month()
+                month["characters"] = max(month["characters"], info.get("character_count", 0))
+                self._save()
+            return True
+        except Exception:
+            return False
+    
+    def summary(self) -> str:
+        """Kısa kullanım özeti"""
+        used = self.used()
+        return f"{used:,} / {self.monthly_quota:,} karakter (kalan ~{self.remaining():,})"
+
+
 class ElevenLabsConfig:
     """ElevenLabs API key yönetimi"""
     
@@ -300,6 +841,19 @@ class ElevenLabsConfig:
         
         print(f"✅ API anahtarı kaydedildi: {cls.CONFIG_FILE}")
     
+    @classmethod
+    def load_monthly_quota(cls, default: int = 10000) -> int:
+        """config.json'dan aylık karakter kotasını yükle"""
+        if not cls.CONFIG_FILE.exists():
+            return default
+        
+        try:
+            with open(cls.CONFIG_FILE, "r") as f:
+                config = json.load(f)
+            return int(config.get("elevenlabs_monthly_quota", default))
+        except Exception:
+            return default
+    
     @classmethod
     def load_api_key(cls) -> Optional[str]:
         """config.json'dan API anahtarını yükle"""
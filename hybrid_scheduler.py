@@ -0,0 +1,340 @@
+"""
+Hybrid Scheduler - Yerel XTTS + Uzak API Taşma Zamanlayıcısı
+
+Cümleler varsayılan olarak yerel XTTS ile seslendirilir. Yerel kuyruğun
+tahmini bitiş süresi teslim süresini aştığında, ses tutarlılığı kurallarına
+uyan cümleler uzak motora (CustomTTSAPI, OpenAITTSAPI veya ElevenLabsTTS)
+aktarılır.
+"""
+import os
+import time
+import math
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Sequence, Tuple
+from pydub import AudioSegment
+
+
+class HybridScheduler:
+    """Yerel havuz öncelikli, taşma cümlelerini uzak motora gönderen zamanlayıcı"""
+
+    def __init__(
+        self,
+        local_engine,
+        remote_engine=None,
+        remote_voice: Optional[str] = None,
+        deadline_minutes: float = 60.0,
+        offload_types: Sequence[str] = ("statement",),
+        protect_head: int = 10,
+        min_offload_run: int = 5,
+        remote_workers: int = 4,
+        local_seconds_per_sentence: Optional[float] = None
+    ):
+        """
+        Args:
+            local_engine: M1OptimizedTTS örneği (yerel XTTS)
+            remote_engine: generate_speech(text, voice, output_path) sunan motor
+                (None ise tüm cümleler yerelde kalır)
+            remote_voice: Uzak motorda kullanılacak ses adı (None ise motorun
+                varsayılan sesi - ElevenLabsTTS için "ada", OpenAI için "alloy")
+            deadline_minutes: Hedef teslim süresi (dakika)
+            offload_types: Uzak motora aktarılabilecek cümle tipleri
+                (diyalog/soru/ünlem gibi tonlamalı cümleler yerelde kalır)
+            protect_head: Kitabın başındaki bu kadar cümle daima yerelde kalır
+                (dinleyicinin ilk duyduğu ses klonlanmış ses olsun)
+            min_offload_run: Uzak motora yalnızca en az bu uzunluktaki ardışık
+                cümle blokları aktarılır (cümle cümle ses değişimini önler)
+            remote_workers: Uzak motora paralel istek sayısı
+            local_seconds_per_sentence: Başlangıç hız tahmini (None ise motorun
+                cihazına göre belirlenir, sonra ölçümle güncellenir)
+        """
+        self.local_engine = local_engine
+        self.remote_engine = remote_engine
+        self.remote_voice = remote_voice
+        self.deadline_seconds = deadline_minutes * 60
+        self.offload_types = set(offload_types)
+        self.protect_head = protect_head
+        self.min_offload_run = min_offload_run
+        self.remote_workers = remote_workers
+
+        if local_seconds_per_sentence is None:
+            device = getattr(local_engine, "device", "cpu")
+            local_seconds_per_sentence = 1.5 if device in ("cuda", "mps") else 15.0
+        self.local_seconds_per_sentence = local_seconds_per_sentence
+
+        # Motorun (işe özel) geçici klasörü altında: paylaşılan kök silinmez
+        self.temp_dir = os.path.join(getattr(local_engine, "temp_dir", "temp_chunks"), "hybrid")
+        self.sample_rate = getattr(local_engine, "SAMPLE_RATE", 24000)
+        self.started_at: Optional[float] = None
+        self.remote_rendered = 0
+
+    def _safe_print(self, message: str):
+        """Güvenli print - BrokenPipe hatası önlenir"""
+        try:
+            print(message)
+        except (BrokenPipeError, IOError):
+            pass
+
+    def can_offload(self, index: int, sentences: List[Dict]) -> bool:
+        """
+        Ses tutarlılığı kuralı: bu cümle uzak motora aktarılabilir mi?
+
+        Args:
+            index: Cümle sırası
+            sentences: Tüm cümle listesi
+        """
+        if index < self.protect_head:
+            return False
+        return sentences[index].get('type', 'statement') in self.offload_types
+
+    def plan_offload(self, pending: List[int], sentences: List[Dict], needed: int) -> List[int]:
+        """
+        Kuyruğun sonundan uzak motora aktarılacak cümleleri seç
+
+        Kuyruğun sonundaki cümleler yerelde en geç işlenecek olanlardır;
+        bunları aktarmak en çok zamanı kazandırır. Yalnızca en az
+        `min_offload_run` uzunluğundaki kesintisiz bloklar seçilir; seçim
+        `needed` sayısına ulaşınca durur (son blok en fazla `min_offload_run`
+        kadar aşabilir).
+
+        Args:
+            pending: Yerel kuyrukta bekleyen cümle indeksleri (sıralı)
+            sentences: Tüm cümle listesi
+            needed: Aktarılması gereken cümle sayısı
+
+        Returns:
+            Aktarılacak indeksler (artan sırada)
+        """
+        runs = []
+        run = []
+
+        # Sondan başa doğru ardışık, aktarılabilir blokları topla
+        for idx in reversed(pending):
+            if self.can_offload(idx, sentences) and (not run or run[-1] == idx + 1):
+                run.append(idx)
+                continue
+            runs.append(run)
+            run = [idx] if self.can_offload(idx, sentences) else []
+        runs.append(run)
+
+        selected = []
+        for run in runs:
+            remaining = needed - len(selected)
+            if remaining <= 0:
+                break
+            if len(run) < self.min_offload_run:
+                continue
+            # Bloğun kuyruk ucundan gerektiği kadar al (en az min_offload_run)
+            selected.extend(run[:max(remaining, self.min_offload_run)])
+
+        return sorted(selected)
+
+    def _local_eta(self, pending_count: int) -> float:
+        return pending_count * self.local_seconds_per_sentence
+
+    def _render_remote(self, index: int, text: str) -> Optional[str]:
+        """Uzak motorla tek cümle seslendir (başarısızsa None)"""
+        output_path = os.path.join(self.temp_dir, f"remote_{index:05d}.mp3")
+        try:
+            if self.remote_voice is None:
+                result = self.remote_engine.generate_speech(text, output_path=output_path)
+            else:
+                result = self.remote_engine.generate_speech(text, self.remote_voice, output_path)
+            # ElevenLabsTTS hata durumunda None döndürür, diğerleri exception fırlatır
+            if result is None or not os.path.exists(output_path):
+                return None
+            return output_path
+        except Exception as e:
+            self._safe_print(f"   ⚠️  Uzak motor hatası (cümle {index}): {e}")
+            return None
+
+    def _render_local(self, index: int, sentence: Dict) -> Optional[str]:
+        """Yerel XTTS ile tek cümle seslendir (başarısızsa None)"""
+        output_path = os.path.join(self.temp_dir, f"local_{index:05d}.wav")
+        started = time.time()
+        success = self.local_engine.generate_single_sentence(
+            sentence['text'], output_path, show_progress=False, sentence_type=sentence.get('type')
+        )
+
+        # Hız tahminini güncelle (üstel hareketli ortalama)
+        elapsed = time.time() - started
+        self.local_seconds_per_sentence = 0.7 * self.local_seconds_per_sentence + 0.3 * elapsed
+
+        return output_path if success else None
+
+    def _load(self, path: str, sentence: Dict, remote: bool) -> AudioSegment:
+        """Cümle sesini yükle - uzak çıktılar yerel formata (24 kHz mono) uyarlanır"""
+        audio = AudioSegment.from_file(path)
+        if remote:
+            audio = audio.set_frame_rate(self.sample_rate).set_channels(1)
+        audio = audio.normalize()
+        pause_ms = int(sentence.get('pause_after', 0.5) * 1000)
+        return audio + AudioSegment.silent(duration=pause_ms, frame_rate=audio.frame_rate)
+
+    def _offload_overflow(self, pending: List[int], backlog: int, sentences: List[Dict],
+                          executor: ThreadPoolExecutor, remote_futures: Dict):
+        """Yerel ETA teslim süresini aşıyorsa kuyruğun sonunu uzak motora gönder"""
+        time_left = self.deadline_seconds - (time.time() - self.started_at)
+        eta = self._local_eta(len(pending) + backlog)
+        if eta <= time_left:
+            return
+
+        needed = math.ceil((eta - max(time_left, 0)) / self.local_seconds_per_sentence)
+        offload = self.plan_offload(pending, sentences, needed)
+        if not offload:
+            return
+
+        self._safe_print(
+            f"   🌐 Yerel ETA {eta/60:.1f}dk > kalan {max(time_left, 0)/60:.1f}dk "
+            f"→ {len(offload)} cümle uzak motora aktarılıyor"
+        )
+        for idx in offload:
+            remote_futures[idx] = executor.submit(self._render_remote, idx, sentences[idx]['text'])
+
+    def iter_audiobook(
+        self,
+        sentences: List[Dict],
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Iterator[Tuple[int, Optional[AudioSegment]]]:
+        """
+        [start, end) aralığındaki cümleleri hibrit seslendir, sırayla döndür
+
+        M1OptimizedTTS.iter_audiobook ile aynı biçimde sonuç verir; böylece
+        segment segment çalışan render döngüsü motor yerine zamanlayıcıyı
+        kullanabilir. Teslim süresi ilk çağrıdan itibaren sayılır ve `end`
+        sonrasındaki cümleler de yerel kuyruğun parçası kabul edilir.
+
+        Args:
+            sentences: Kitabın tüm cümleleri
+            start: İlk cümle indeksi
+            end: Son cümle indeksi (hariç, None = kitabın sonu)
+
+        Yields:
+            (cümle indeksi, duraklama eklenmiş ses) - başarısız cümlede ses None
+        """
+        end = len(sentences) if end is None else end
+        backlog = len(sentences) - end
+        os.makedirs(self.temp_dir, exist_ok=True)
+        if self.started_at is None:
+            self.started_at = time.time()
+
+        remote_futures: Dict[int, Future] = {}
+        executor = ThreadPoolExecutor(max_workers=self.remote_workers) if self.remote_engine else None
+
+        try:
+            for idx in range(start, end):
+                remote = False
+                if idx in remote_futures:
+                    path = remote_futures.pop(idx).result()
+                    remote = path is not None
+                    if path is None:
+                        self._safe_print(f"   🔁 Cümle {idx} yerelde yeniden üretiliyor")
+                        path = self._render_local(idx, sentences[idx])
+                else:
+                    if executor:
+                        pending = [i for i in range(idx + 1, end) if i not in remote_futures]
+                        self._offload_overflow(pending, backlog, sentences, executor, remote_futures)
+                    path = self._render_local(idx, sentences[idx])
+
+                if remote:
+                    self.remote_rendered += 1
+                yield idx, self._load(path, sentences[idx], remote) if path else None
+        finally:
+            # Tüketici erken bıraktıysa başlamamış uzak istekler iptal edilir
+            for future in remote_futures.values():
+                future.cancel()
+            if executor:
+                executor.shutdown(wait=True)
+
+    def generate_audiobook(self, sentences: List[Dict], output_path: str = "audiobook.mp3") -> str:
+        """
+        Tüm kitabı hibrit olarak seslendir
+
+        Args:
+            sentences: Cümle listesi (sentence_processor'dan gelen)
+            output_path: Çıktı MP3 dosyası
+
+        Returns:
+            Output MP3 dosya yolu
+        """
+        total = len(sentences)
+
+        self._safe_print(f"\n{'='*60}")
+        self._safe_print(f"🔀 HİBRİT SESLENDİRME (Yerel + Uzak)")
+        self._safe_print(f"{'='*60}")
+        self._safe_print(f"📝 Cümle sayısı: {total}")
+        self._safe_print(f"⏰ Teslim süresi: {self.deadline_seconds / 60:.0f} dakika")
+        self._safe_print(f"🌐 Uzak motor: {type(self.remote_engine).__name__ if self.remote_engine else 'yok'}")
+        self._safe_print(f"{'='*60}\n")
+
+        start_time = time.time()
+        audio_chunks = []
+        failed_sentences = []
+
+        try:
+            for idx, audio in self.iter_audiobook(sentences):
+                if audio is None:
+                    failed_sentences.append(idx)
+                else:
+                    audio_chunks.append(audio)
+                if (idx + 1) % 10 == 0:
+                    self._safe_print(f"   ⏳ {idx + 1}/{total} tamamlandı")
+        finally:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+        if not audio_chunks:
+            raise Exception("❌ Hiç ses üretilemedi!")
+
+        self._safe_print("\n🔗 Ses dosyaları birleştiriliyor...")
+        final_audio = sum(audio_chunks).normalize()
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        self._safe_print(f"💾 Kaydediliyor: {output_path}")
+        final_audio.export(output_path, format="mp3", bitrate="192k", parameters=["-q:a", "2"])
+
+        elapsed_minutes = (time.time() - start_time) / 60
+
+        self._safe_print(f"\n{'='*60}")
+        self._safe_print(f"✅ TAMAMLANDI!")
+        self._safe_print(f"📁 Dosya: {output_path}")
+        self._safe_print(f"⏱️  İşlem süresi: {elapsed_minutes:.1f} dakika")
+        self._safe_print(f"🖥️  Yerel: {len(audio_chunks) - self.remote_rendered} cümle | "
+                         f"🌐 Uzak: {self.remote_rendered} cümle")
+
+        if failed_sentences:
+            self._safe_print(f"⚠️  Başarısız: {len(failed_sentences)} cümle")
+            self._safe_print(f"   Cümle numaraları: {failed_sentences[:10]}")
+
+        self._safe_print(f"{'='*60}")
+
+        return output_path
+
+
+def test_hybrid_scheduler():
+    """Test fonksiyonu"""
+    import sys
+    from tts_engine import M1OptimizedTTS
+    from custom_tts_api import CustomTTSAPI
+    from sentence_processor import SentenceProcessor
+
+    if len(sys.argv) < 2:
+        print("Kullanım: python hybrid_scheduler.py <voice_sample.wav> [teslim_dakika]")
+        sys.exit(1)
+
+    deadline = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    text = " ".join(["Bu hibrit zamanlayıcı için bir test cümlesidir."] * 30)
+    sentences = SentenceProcessor().split_into_sentences(text)
+
+    scheduler = HybridScheduler(
+        M1OptimizedTTS(sys.argv[1], use_progress_bar=False),
+        remote_engine=CustomTTSAPI(),
+        deadline_minutes=deadline
+    )
+    output = scheduler.generate_audiobook(sentences, "test_hybrid.mp3")
+    print(f"\n✅ Test tamamlandı: {output}")
+
+
+if __name__ == "__main__":
+    test_hybrid_scheduler()
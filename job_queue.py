@@ -0,0 +1,192 @@
+"""
+Job Queue - Arka Plan Sesli Kitap İş Kuyruğu
+Uzun işler web isteğinden bağımsız çalışır; tarayıcı kapansa da iş sürer.
+"""
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+class JobCancelled(Exception):
+    """İş kullanıcı tarafından iptal edildi"""
+
+
+class RenderJob:
+    """Tek bir arka plan işi (durum, ilerleme, ara çıktılar)"""
+
+    FINISHED_STATES = ("completed", "failed", "cancelled")
+
+    def __init__(self, job_id: str, title: str = ""):
+        self.id = job_id
+        self.title = title
+        self.status = "queued"       # queued, running, completed, failed, cancelled
+        self.progress = 0.0          # 0.0 - 1.0
+        self.description = "Sırada bekliyor..."
+        self.message = ""            # Kullanıcıya gösterilecek son bilgi (Markdown)
+        self.segments: List[str] = []  # Canlı dinleme parçaları
+        self.output_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in self.FINISHED_STATES
+
+    def cancelled(self) -> bool:
+        """İptal istendi mi?"""
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """İptal istendiyse işi durdur"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def report(self, progress: float, desc: str = ""):
+        """İlerleme bildir (iptal noktası olarak da kullanılır)"""
+        self.progress = max(0.0, min(1.0, progress))
+        if desc:
+            self.description = desc
+        self.check_cancelled()
+
+    def add_segment(self, path: str):
+        """Canlı dinleme parçası ekle"""
+        self.segments.append(path)
+
+    def discard_segments(self):
+        """Canlı dinleme parçalarını diskten sil (iş geçmişten düşünce)"""
+        for path in self.segments:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.segments = []
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'title': self.title,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'description': self.description,
+            'segments': len(self.segments),
+            'output_path': self.output_path,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobQueue:
+    """
+    Sınırlı sayıda işleme slotu olan arka plan iş kuyruğu
+
+    İş fonksiyonu ilk argüman olarak RenderJob alır ve çıktı dosya yolunu
+    döndürür; ilerlemeyi job.report() ile bildirir.
+    """
+
+    def __init__(self, max_concurrent: int = 1, max_history: int = 50):
+        """
+        Args:
+            max_concurrent: Aynı anda çalışabilecek iş sayısı (render slotu)
+            max_history: Bellekte tutulacak bitmiş iş sayısı
+        """
+        self.max_concurrent = max_concurrent
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="render")
+        self._jobs: Dict[str, RenderJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, title: str = "", **kwargs) -> str:
+        """
+        İşi kuyruğa ekle
+
+        Returns:
+            İş ID'si
+        """
+        job = RenderJob(uuid.uuid4().hex[:8], title)
+
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        print(f"📥 İş kuyruğa eklendi: {job.id} ({self.queued_count()} bekliyor)")
+        return job.id
+
+    def _run(self, job: RenderJob, fn: Callable, args, kwargs):
+        if job.cancelled():
+            job.status = "cancelled"
+            job.finished_at = datetime.now().isoformat()
+            return
+
+        job.status = "running"
+        job.started_at = datetime.now().isoformat()
+        job.description = "Başladı..."
+
+        try:
+            job.output_path = fn(job, *args, **kwargs)
+            job.status = "completed"
+            job.progress = 1.0
+            job.description = "✅ Tamamlandı!"
+        except JobCancelled:
+            job.status = "cancelled"
+            job.description = "🛑 İptal edildi"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.description = "❌ Başarısız"
+            print(f"❌ İş başarısız ({job.id}): {e}")
+        finally:
+            job.finished_at = datetime.now().isoformat()
+
+    def _prune(self):
+        """Eski bitmiş işleri unut (kilit altında çağrılır)"""
+        finished = [j for j in self._jobs.values() if j.finished]
+        excess = len(finished) - self.max_history
+        if excess > 0:
+            finished.sort(key=lambda j: j.finished_at or "")
+            for job in finished[:excess]:
+                del self._jobs[job.id]
+                job.discard_segments()
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        """ID'ye göre iş getir"""
+        with self._lock:
+            return self._jobs.get((job_id or "").strip())
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        İşi iptal et (sıradaysa hiç başlamaz, çalışıyorsa sıradaki cümlede durur)
+
+        Returns:
+            İş bulunduysa ve henüz bitmediyse True
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel_event.set()
+        if job.status == "queued":
+            job.description = "🛑 İptal edildi (başlamadan)"
+        return True
+
+    def queued_count(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j.status == "queued")
+
+    def running_count(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j.status == "running")
+    
+    def list_jobs(self) -> List[Dict]:
+        """Tüm işler (en yeni önce)"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        jobs.sort(key=lambda j: j.created_at, reverse=True)
+        return [j.to_dict() for j in jobs]
@@ -123,24 +123,25 @@ class LegalVoiceDownloader:
     ) -> bool:
         """TTS ile örnek ses üret (yedek referans için)"""
         try:
-            from TTS.api import TTS
+            from model_registry import get_model
             
             self._safe_print(f"🎤 TTS ile örnek oluşturuluyor: {voice_info['name']}")
             
-            # XTTS v2 modeli
-            tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to("cpu")
+            # XTTS v2 modeli (süreç genelinde paylaşılan kopya)
+            model = get_model(device="cpu")
             
             # Mevcut bir sesi referans al
             existing_voices = list(self.output_dir.glob("*.wav"))
             if existing_voices:
                 reference_voice = existing_voices[0]
                 
-                tts.tts_to_file(
-                    text=text,
-                    speaker_wav=str(reference_voice),
-                    language="tr",
-                    file_path=output_path
-                )
+                with model.lock:
+                    model.tts.tts_to_file(
+                        text=text,
+                        speaker_wav=str(reference_voice),
+                        language="tr",
+                        file_path=output_path
+                    )
                 
                 self._safe_print(f"   ✅ TTS örneği oluşturuldu: {output_path}")
                 return True
@@ -0,0 +1,271 @@
+"""
+Model Registry - Süreç Genelinde Paylaşılan TTS Modelleri
+Aynı model (model ID + cihaz) süreç boyunca yalnızca bir kez yüklenir;
+M1OptimizedTTS, AdvancedTTS ve indirme scriptleri aynı kopyayı kullanır.
+
+Birden fazla model aynı anda tutulabilir; yeni model yüklenmeden önce
+toplam boyut RAM bütçesini aşacaksa en uzun süredir kullanılmayan (LRU)
+model bellekten atılır. Motorlar modele her erişimde tutamaç üzerinden
+ulaşır; atılan modelin tutamacı boşalınca kayıttan yeniden istenir.
+"""
+import gc
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import torch
+from TTS.api import TTS
+from TTS.utils.generic_utils import get_user_data_dir
+
+
+XTTS_V2_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+
+def default_device() -> str:
+    """XTTS için kullanılacak cihaz (MPS'te FFT hatası olduğundan CPU)"""
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+class ModelHandle:
+    """
+    Paylaşılan model tutamacı
+
+    Model nesnesi thread-safe değildir; çıkarım yapan kod `with handle.lock:`
+    bloğu içinde çalışmalıdır.
+    """
+
+    def __init__(self, model_id: str, device: str, tts: TTS):
+        self.model_id = model_id
+        self.device = device
+        self.tts = tts
+        self.lock = threading.RLock()
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.size_mb = self._estimate_size_mb(tts)
+
+    @staticmethod
+    def _estimate_size_mb(tts: TTS) -> float:
+        """Model parametrelerinin bellekteki boyutu (MB)"""
+        total = 0
+        synthesizer = getattr(tts, "synthesizer", None)
+        for name in ("tts_model", "vocoder_model"):
+            module = getattr(synthesizer, name, None)
+            if isinstance(module, torch.nn.Module):
+                total += sum(p.numel() * p.element_size() for p in module.parameters())
+        return total / (1024 * 1024)
+
+    def touch(self):
+        """Son kullanım zamanını güncelle"""
+        self.last_used = time.time()
+
+
+class ModelRegistry:
+    """Model ID + cihaz anahtarıyla modelleri bir kez yükleyip paylaştırır"""
+
+    def __init__(self, ram_budget_mb: Optional[float] = None):
+        """
+        Args:
+            ram_budget_mb: Yüklü modellerin toplam boyut sınırı (MB)
+                (None ise SESLIKITAP_MODEL_RAM_MB, 0 = sınırsız)
+        """
+        if ram_budget_mb is None:
+            ram_budget_mb = float(os.getenv("SESLIKITAP_MODEL_RAM_MB", "6144"))
+        self.ram_budget_mb = ram_budget_mb
+        self._handles: Dict[Tuple[str, str], ModelHandle] = {}
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._known_sizes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _safe_print(self, message: str):
+        """Güvenli print - BrokenPipe hatası önlenir"""
+        try:
+            print(message)
+        except (BrokenPipeError, IOError):
+            pass
+
+    def get(self, model_id: str = XTTS_V2_MODEL, device: str = "cpu") -> ModelHandle:
+        """
+        Modeli getir (yüklü değilse yükle)
+
+        Aynı model için eşzamanlı çağrılar tek bir yüklemeyi bekler; farklı
+        modeller birbirini bekletmez.
+
+        Args:
+            model_id: Coqui model yolu (ör. tts_models/multilingual/multi-dataset/xtts_v2)
+            device: Hedef cihaz (cpu, cuda)
+
+        Returns:
+            Paylaşılan model tutamacı
+        """
+        key = (model_id, device)
+
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                handle.touch()
+                return handle
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Başka bir thread bu arada yüklemiş olabilir
+            with self._lock:
+                handle = self._handles.get(key)
+            if handle is not None:
+                handle.touch()
+                return handle
+
+            # Yer önceden açılır: eski model atılmadan yenisi yüklenirse bellek
+            # kısa süre de olsa iki modeli birden taşır
+            self._evict_over_budget(keep=key, incoming_mb=self._expected_size_mb(model_id))
+
+            self._safe_print(f"📥 Model yükleniyor: {model_id} ({device})")
+            self._safe_print("   (İlk seferinde indirilecek, biraz sürebilir)")
+            try:
+                tts = TTS(model_id).to(device)
+            except Exception as e:
+                self._safe_print(f"❌ Model yüklenirken hata: {e}")
+                raise
+
+            handle = ModelHandle(model_id, device, tts)
+            with self._lock:
+                self._handles[key] = handle
+                self._known_sizes[model_id] = handle.size_mb
+            self._safe_print(f"✅ Model yüklendi ve paylaşıma açıldı! (~{handle.size_mb:.0f} MB)")
+
+            self._evict_over_budget(keep=key)
+            return handle
+
+    def used_mb(self) -> float:
+        """Yüklü modellerin toplam tahmini boyutu (MB)"""
+        with self._lock:
+            return sum(h.size_mb for h in self._handles.values())
+
+    def _expected_size_mb(self, model_id: str) -> float:
+        """
+        Yüklenecek modelin tahmini boyutu (MB)
+
+        Daha önce yüklendiyse ölçülen boyut, değilse indirilmiş checkpoint
+        dosyalarının boyutu kullanılır (henüz indirilmemişse 0).
+        """
+        with self._lock:
+            if model_id in self._known_sizes:
+                return self._known_sizes[model_id]
+
+        model_dir = os.path.join(get_user_data_dir("tts"), model_id.replace("/", "--"))
+        if not os.path.isdir(model_dir):
+            return 0.0
+        total = sum(
+            entry.stat().st_size for entry in os.scandir(model_dir)
+            if entry.is_file() and entry.name.endswith((".pth", ".pt", ".safetensors"))
+        )
+        return total / (1024 * 1024)
+
+    def _evict_over_budget(self, keep: Tuple[str, str], incoming_mb: float = 0.0):
+        """
+        Bütçe aşıldıysa en uzun süredir kullanılmayan modelleri at
+
+        Args:
+            keep: Atılmayacak model anahtarı
+            incoming_mb: Birazdan yüklenecek modelin boyutu (yer açılır)
+        """
+        if self.ram_budget_mb <= 0:
+            return
+
+        with self._lock:
+            candidates = sorted(
+                (item for item in self._handles.items() if item[0] != keep),
+                key=lambda item: item[1].last_used
+            )
+
+        for key, handle in candidates:
+            if self.used_mb() + incoming_mb <= self.ram_budget_mb:
+                break
+            # Çıkarım yapılan model atlanır (kilit alınamıyorsa kullanımda)
+            if not handle.lock.acquire(blocking=False):
+                continue
+            try:
+                with self._lock:
+                    if self._handles.get(key) is not handle:
+                        continue
+                    del self._handles[key]
+                handle.tts = None
+            finally:
+                handle.lock.release()
+            self._safe_print(f"♻️  RAM bütçesi aşıldı, model bellekten atıldı: {handle.model_id} (LRU)")
+
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def is_loaded(self, model_id: str = XTTS_V2_MODEL, device: Optional[str] = None) -> bool:
+        """Model (herhangi bir cihazda veya verilen cihazda) yüklü mü?"""
+        with self._lock:
+            return any(
+                mid == model_id and (device is None or dev == device)
+                for mid, dev in self._handles
+            )
+
+    def idle_seconds(self, model_id: str = XTTS_V2_MODEL) -> Optional[float]:
+        """Modelin son kullanımından bu yana geçen süre (yüklü değilse None)"""
+        with self._lock:
+            handles = [h for (mid, _), h in self._handles.items() if mid == model_id]
+        if not handles:
+            return None
+        return time.time() - max(h.last_used for h in handles)
+
+    def unload(self, model_id: Optional[str] = None, device: Optional[str] = None) -> int:
+        """
+        Modelleri bellekten at
+
+        Çıkarım sürüyorsa tutamacın kilidi beklenir. Motorlar modeli tutamaç
+        üzerinden kullandığından bellek hemen serbest kalır; motor bir sonraki
+        çıkarımda modeli kayıttan yeniden ister.
+
+        Args:
+            model_id: Yalnızca bu model (None = hepsi)
+            device: Yalnızca bu cihaz (None = hepsi)
+
+        Returns:
+            Bırakılan model sayısı
+        """
+        with self._lock:
+            keys = [
+                key for key in self._handles
+                if (model_id is None or key[0] == model_id)
+                and (device is None or key[1] == device)
+            ]
+            handles = [self._handles.pop(key) for key in keys]
+
+        for handle in handles:
+            with handle.lock:
+                handle.tts = None
+
+        if handles:
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        return len(handles)
+
+    def loaded_models(self) -> List[Dict]:
+        """Yüklü modellerin özeti"""
+        with self._lock:
+            handles = list(self._handles.values())
+        return [
+            {
+                'model_id': h.model_id,
+                'device': h.device,
+                'size_mb': round(h.size_mb),
+                'idle_seconds': round(time.time() - h.last_used, 1)
+            }
+            for h in handles
+        ]
+
+
+# Süreç genelinde tek kayıt
+registry = ModelRegistry()
+
+
+def get_model(model_id: str = XTTS_V2_MODEL, device: str = "cpu") -> ModelHandle:
+    """Paylaşılan model tutamacını getir (kısayol)"""
+    return registry.get(model_id, device)
@@ -8,6 +8,7 @@ import os
 from typing import List, Dict
 from pydub import AudioSegment
 import time
+import uuid
 
 
 class OpenAITTSAPI:
@@ -106,7 +107,8 @@ class OpenAITTSAPI:
         
         start_time = time.time()
         
-        temp_dir = "temp_chunks"
+        # Çağrıya özel klasör: temizlik diğer işlerin parçalarına dokunmaz
+        temp_dir = os.path.join("temp_chunks", f"openai_{uuid.uuid4().hex[:12]}")
         os.makedirs(temp_dir, exist_ok=True)
         
         for i, sentence_data in enumerate(sentences):
@@ -0,0 +1,170 @@
+"""
+Reference Clip - Uzun Kayıtlardan Kısa Referans Klibi
+Katalogdaki sesli kitaplar saatlerce sürebilir; XTTS koşullandırması için
+10-30 saniyelik temiz bir kesit yeterlidir. En iyi kesit bir kez seçilip
+24 kHz mono WAV olarak cache'e yazılır, seslendirme yolunda uzun dosya hiç
+çözülmez (yalnızca başlığı okunur).
+"""
+import hashlib
+import os
+from math import gcd
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+
+REFERENCE_DIR = "cache/references"
+REFERENCE_SAMPLE_RATE = 24000
+
+# Bu süreden uzun kaynaklar için klip çıkarılır (saniye)
+MAX_DIRECT_REFERENCE_SECONDS = 60.0
+
+# Klip uzunluğu (10-30 sn önerilir) ve en iyi kesit için taranan süre
+CLIP_SECONDS = 20.0
+SCAN_SECONDS = 600.0
+
+# Baştaki jenerik/müzik kısmını atla
+SKIP_SECONDS = 30.0
+
+
+def probe_audio(path: str) -> Dict:
+    """
+    Ses dosyasının yalnızca başlığını oku (PCM çözülmez)
+
+    Returns:
+        {'duration', 'sample_rate', 'channels', 'frames'}
+    """
+    info = sf.info(str(path))
+    return {
+        'duration': info.frames / info.samplerate if info.samplerate else 0.0,
+        'sample_rate': info.samplerate,
+        'channels': info.channels,
+        'frames': info.frames
+    }
+
+
+def measure_loudness(path: str, max_seconds: float = MAX_DIRECT_REFERENCE_SECONDS) -> float:
+    """Ortalama seviye (RMS, dBFS) - en fazla max_seconds okunur"""
+    sample_rate = probe_audio(path)['sample_rate']
+    audio, _ = sf.read(str(path), frames=int(max_seconds * sample_rate), dtype='float32', always_2d=True)
+    rms = float(np.sqrt(np.mean(audio.mean(axis=1) ** 2))) if len(audio) else 0.0
+    return round(20 * np.log10(rms + 1e-9), 1)
+
+
+def clip_path_for(source: str) -> str:
+    """Kaynak için kararlı klip yolu (aynı addaki farklı klasörler çakışmaz)"""
+    source = Path(source)
+    digest = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(REFERENCE_DIR, f"{source.stem[:60]}_{digest}.wav")
+
+
+def find_best_segment(source: str, clip_seconds: float = CLIP_SECONDS,
+                      scan_seconds: float = SCAN_SECONDS) -> float:
+    """
+    Referans için en uygun kesitin başlangıcını bul
+
+    Taranan bölge saniyelik bloklar halinde okunur (bellekte yalnızca blok
+    başına RMS/tepe tutulur). Konuşma yoğunluğu yüksek, seviyesi dengeli ve
+    kırpılma içermeyen pencere seçilir.
+
+    Returns:
+        Kesit başlangıcı (saniye)
+    """
+    info = probe_audio(source)
+    sample_rate = info['sample_rate']
+    duration = info['duration']
+
+    start = SKIP_SECONDS if duration > SKIP_SECONDS + clip_seconds * 2 else 0.0
+    stop = min(duration, start + scan_seconds)
+
+    rms_db, peaks = [], []
+    for block in sf.blocks(str(source), blocksize=sample_rate, start=int(start * sample_rate),
+                           stop=int(stop * sample_rate), dtype='float32', always_2d=True):
+        mono = block.mean(axis=1)
+        rms_db.append(20 * np.log10(np.sqrt(np.mean(mono ** 2)) + 1e-9))
+        peaks.append(float(np.max(np.abs(block))))
+
+    window = int(clip_seconds)
+    if len(rms_db) <= window:
+        return start
+
+    rms_db = np.array(rms_db)
+    noise_floor = np.percentile(rms_db, 10)
+    active = (rms_db > noise_floor + 12).astype(float)
+    clipped = (np.array(peaks) >= 0.99).astype(float)
+
+    # Pencere ortalamaları kümülatif toplamlarla (O(n))
+    def window_mean(values: np.ndarray) -> np.ndarray:
+        cumulative = np.concatenate([[0.0], np.cumsum(values)])
+        return (cumulative[window:] - cumulative[:-window]) / window
+
+    level_std = np.sqrt(np.maximum(window_mean(rms_db ** 2) - window_mean(rms_db) ** 2, 0.0))
+    score = window_mean(active) - 0.5 * window_mean(clipped) - 0.01 * level_std
+
+    return start + float(np.argmax(score))
+
+
+def extract_reference_clip(source: str, output_path: str, clip_seconds: float = CLIP_SECONDS) -> Dict:
+    """
+    Kaynaktan referans klibi çıkar (24 kHz mono, tepe normalize)
+
+    Args:
+        source: Uzun ses kaydı
+        output_path: Klip WAV yolu
+        clip_seconds: Klip uzunluğu
+
+    Returns:
+        {'path', 'offset', 'seconds'}
+    """
+    offset = find_best_segment(source, clip_seconds)
+    sample_rate = probe_audio(source)['sample_rate']
+
+    audio, _ = sf.read(str(source), start=int(offset * sample_rate),
+                       frames=int(clip_seconds * sample_rate), dtype='float32', always_2d=True)
+    audio = audio.mean(axis=1)
+
+    if sample_rate != REFERENCE_SAMPLE_RATE:
+        divisor = gcd(REFERENCE_SAMPLE_RATE, sample_rate)
+        audio = signal.resample_poly(audio, REFERENCE_SAMPLE_RATE // divisor, sample_rate // divisor)
+
+    peak = float(np.max(np.abs(audio))) if len(audio) else 0.0
+    if peak > 0:
+        audio = audio / peak * 0.95
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    temp_path = output_path + ".tmp.wav"
+    sf.write(temp_path, audio.astype(np.float32), REFERENCE_SAMPLE_RATE)
+    os.replace(temp_path, output_path)
+
+    return {
+        'path': output_path,
+        'offset': round(offset, 1),
+        'seconds': round(len(audio) / REFERENCE_SAMPLE_RATE, 1)
+    }
+
+
+def ensure_reference_clip(source: str) -> str:
+    """
+    Seslendirmede kullanılacak referans yolunu getir
+
+    Kısa dosyalar olduğu gibi kullanılır. Uzun dosyaların klibi yoksa (veya
+    kaynak klipten yeniyse) bir kez çıkarılır; sonraki çağrılar yalnızca
+    başlık okur.
+
+    Returns:
+        Referans ses yolu (kısa kaynak veya çıkarılmış klip)
+    """
+    if probe_audio(source)['duration'] <= MAX_DIRECT_REFERENCE_SECONDS:
+        return source
+
+    clip = clip_path_for(source)
+    if os.path.exists(clip) and os.path.getmtime(clip) >= os.path.getmtime(source):
+        return clip
+
+    print(f"✂️  Uzun kayıttan referans klibi çıkarılıyor: {os.path.basename(source)}")
+    result = extract_reference_clip(source, clip)
+    print(f"   ✅ {result['seconds']} sn klip ({result['offset']} sn'den): {clip}")
+    return clip
@@ -0,0 +1,231 @@
+"""
+Segmented Render - Uzun Belgeler için Sabit Bellekli Üretim
+Cümleler sınırlı boyutta segmentler halinde işlenir, her segment diske
+yazılır (checkpoint) ve en sonda ffmpeg ile akış halinde birleştirilir.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydub import AudioSegment
+
+
+class SegmentedAudiobook:
+    """
+    Segment bazlı sesli kitap üretimi
+
+    Bellekte aynı anda yalnızca bir segmentin sesi tutulur. Tamamlanan
+    segmentler manifest'e işlenir; iş yarıda kalırsa aynı girdilerle
+    tekrar başlatıldığında bitmiş segmentler atlanır.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+
+    # Bu süreçte render edilmekte olan klasörler (aynı girdili eşzamanlı işler
+    # aynı klasörü paylaşıp birbirinin segmentlerini silmesin)
+    _active_dirs = set()
+    _active_lock = threading.Lock()
+
+    def __init__(self, work_dir: str, total_sentences: int, segment_size: int = 50):
+        """
+        Args:
+            work_dir: Segmentlerin ve manifest'in tutulacağı klasör
+            total_sentences: Toplam cümle sayısı
+            segment_size: Segment başına cümle sayısı
+        """
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = self.work_dir / self.MANIFEST_NAME
+        self.total_sentences = total_sentences
+        self.segment_size = segment_size
+        self.manifest = self._load_manifest()
+
+    @staticmethod
+    def work_key(*parts) -> str:
+        """Girdilerden kararlı bir klasör anahtarı üret (devam ettirme için)"""
+        raw = "|".join(str(p) for p in parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def claim(cls, renders_dir: str, key: str, owner: str, total_sentences: int,
+              segment_size: int = 50) -> "SegmentedAudiobook":
+        """
+        Anahtarın klasörünü bu iş için ayır
+
+        Aynı anahtarla çalışan başka bir iş yoksa ortak klasör kullanılır
+        (yarıda kalan render kaldığı yerden devam eder). Varsa iş kendi
+        klasöründe sıfırdan başlar.
+
+        Args:
+            renders_dir: Render klasörlerinin kökü
+            key: work_key() çıktısı
+            owner: İş ID'si (çakışmada klasör adına eklenir)
+            total_sentences: Toplam cümle sayısı
+            segment_size: Segment başına cümle sayısı
+
+        Returns:
+            Ayrılmış SegmentedAudiobook (iş bitince release() çağrılmalı)
+        """
+        work_dir = os.path.abspath(os.path.join(renders_dir, key))
+        with cls._active_lock:
+            if work_dir in cls._active_dirs:
+                work_dir = os.path.abspath(os.path.join(renders_dir, f"{key}_{owner}"))
+            cls._active_dirs.add(work_dir)
+        return cls(work_dir, total_sentences, segment_size)
+
+    def release(self):
+        """claim() ile alınan klasörü serbest bırak (dosyalar silinmez)"""
+        with self._active_lock:
+            self._active_dirs.discard(os.path.abspath(self.work_dir))
+
+    def _load_manifest(self) -> Dict:
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if (manifest.get('total_sentences') == self.total_sentences
+                        and manifest.get('segment_size') == self.segment_size):
+                    return manifest
+            except (OSError, ValueError):
+                pass
+        return {
+            'total_sentences': self.total_sentences,
+            'segment_size': self.segment_size,
+            'segments': {}
+        }
+
+    def _save_manifest(self):
+        """Manifest'i atomik olarak yaz (yarım dosya kalmaz)"""
+        temp_file = self.manifest_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, self.manifest_file)
+
+    def segment_ranges(self) -> List[Tuple[int, int, int]]:
+        """(segment_no, başlangıç, bitiş) listesi - bitiş hariç"""
+        return [
+            (no, start, min(start + self.segment_size, self.total_sentences))
+            for no, start in enumerate(range(0, self.total_sentences, self.segment_size))
+        ]
+
+    def is_done(self, segment_no: int) -> bool:
+        """Segment daha önce tamamlandı mı?"""
+        entry = self.manifest['segments'].get(str(segment_no))
+        if not entry:
+            return False
+        # Tüm cümleleri başarısız segmentin dosyası yoktur (path None)
+        if not entry['path']:
+            return True
+        return Path(entry['path']).exists()
+
+    def completed_count(self) -> int:
+        return sum(1 for no, _, _ in self.segment_ranges() if self.is_done(no))
+
+    def write_segment(self, segment_no: int, start: int, end: int,
+                      audio_chunks: List[AudioSegment], failed: List[int]) -> Optional[str]:
+        """
+        Segmenti WAV olarak diske yaz ve manifest'e işle
+
+        Returns:
+            Segment dosya yolu (hiç ses yoksa None - manifest'e de None yazılır,
+            segment tamamlanmış sayılır)
+        """
+        path = None
+        if audio_chunks:
+            path = self.work_dir / f"segment_{segment_no:05d}.wav"
+            sum(audio_chunks).export(str(path), format="wav")
+            path = str(path)
+
+        self.manifest['segments'][str(segment_no)] = {
+            'path': path,
+            'start': start,
+            'end': end,
+            'failed': failed
+        }
+        self._save_manifest()
+        return path
+
+    def failed_sentences(self) -> List[int]:
+        failed = []
+        for entry in self.manifest['segments'].values():
+            failed.extend(entry.get('failed', []))
+        return sorted(failed)
+
+    def stitch(self, output_path: str) -> str:
+        """
+        Segmentleri ffmpeg concat ile tek MP3'e birleştir
+
+        Ses belleğe yüklenmez; ffmpeg dosyaları sırayla okuyup kodlar.
+
+        Returns:
+            Çıktı dosya yolu
+        """
+        paths = []
+        for no, _, _ in self.segment_ranges():
+            entry = self.manifest['segments'].get(str(no))
+            if entry and entry['path'] and Path(entry['path']).exists():
+                paths.append(Path(entry['path']).resolve())
+
+        if not paths:
+            raise Exception("❌ Hiç ses üretilemedi!")
+
+        list_file = self.work_dir / "concat.txt"
+        with open(list_file, 'w', encoding='utf-8') as f:
+            for path in paths:
+                escaped = str(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        command = [
+            AudioSegment.converter, "-y", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", str(list_file),
+            "-c:a", "libmp3lame", "-b:a", "192k", "-q:a", "2",
+            output_path
+        ]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"❌ Segmentler birleştirilemedi: {result.stderr.strip()}")
+
+        return output_path
+
+    def cleanup(self):
+        """Segmentleri ve manifest'i sil, klasörü serbest bırak"""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.release()
+
+
+def save_render_plan(path: str, sentences: List[Dict], meta: Dict):
+    """
+    Cümle planını kaydet (taslak render'ı final render'da yeniden kullanmak için)
+
+    Args:
+        path: plan.json yolu
+        sentences: SentenceProcessor çıktısı
+        meta: Kaynak bilgileri (full_text, page_count, word_count, ...)
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'sentences': sentences}, f, ensure_ascii=False)
+    os.replace(temp_file, path)
+
+
+def load_render_plan(path: str) -> Optional[Tuple[List[Dict], Dict]]:
+    """
+    Kaydedilmiş cümle planını yükle
+
+    Returns:
+        (cümleler, meta) veya plan yoksa/bozuksa None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+        return plan['sentences'], plan['meta']
+    except (OSError, ValueError, KeyError):
+        return None
@@ -93,6 +93,39 @@ class SentenceProcessor:
         else:
             return 'statement'
     
+    def is_dialogue(self, sentence: str) -> bool:
+        """Cümle bir konuşma (tırnak veya konuşma çizgisi) içeriyor mu?"""
+        sentence = sentence.strip()
+        if any(mark in sentence for mark in '"“”«»'):
+            return True
+        return sentence.startswith(('—', '–', '- '))
+    
+    def assign_dialogue_voices(self, sentences: List[Dict], voices: List[str]) -> List[Dict]:
+        """
+        Diyalog cümlelerine karakter sesleri ata
+        
+        Ardışık diyalog cümleleri tek bir konuşma sırası sayılır; her yeni
+        sıra bir sonraki karakter sesine geçer (anlatım cümleleri sırayı bitirir).
+        
+        Args:
+            sentences: split_into_sentences çıktısı
+            voices: Karakter sesi dosya yolları
+            
+        Returns:
+            Aynı cümleler - diyaloglara 'voice' alanı eklenmiş (anlatıcı için None)
+        """
+        turn = -1
+        in_dialogue = False
+        
+        for sentence in sentences:
+            dialogue = bool(voices) and (sentence['type'] == 'dialogue' or self.is_dialogue(sentence['text']))
+            if dialogue and not in_dialogue:
+                turn += 1
+            in_dialogue = dialogue
+            sentence['voice'] = voices[turn % len(voices)] if dialogue else None
+        
+        return sentences
+    
     def calculate_pause(self, sentence: str) -> float:
         """Cümle sonrası duraklama süresi (saniye)"""
         sentence = sentence.rstrip()
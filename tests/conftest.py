@@ -0,0 +1,9 @@
+"""
+Test ortamı - modüller depo kökünden içe aktarılır
+
+Yalnızca model gerektirmeyen modüller test edilir (torch/TTS gerekmez).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,52 @@
+"""audio_dsp - WSOLA hız ve faz vokoderi ton kaydırma"""
+import numpy as np
+import pytest
+
+from audio_dsp import pitch_shift, time_stretch_wsola
+
+SAMPLE_RATE = 24000
+
+
+def sine(freq, seconds=1.0):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def dominant_frequency(wav):
+    spectrum = np.abs(np.fft.rfft(wav * np.hanning(len(wav))))
+    return np.fft.rfftfreq(len(wav), 1 / SAMPLE_RATE)[np.argmax(spectrum)]
+
+
+@pytest.mark.parametrize("rate", [0.8, 1.25, 1.5])
+def test_time_stretch_length(rate):
+    wav = sine(220)
+    stretched = time_stretch_wsola(wav, rate, SAMPLE_RATE)
+
+    assert stretched.dtype == np.float32
+    assert abs(len(stretched) - len(wav) / rate) < 0.02 * len(wav)
+
+
+def test_time_stretch_keeps_pitch():
+    stretched = time_stretch_wsola(sine(220), 1.25, SAMPLE_RATE)
+
+    assert dominant_frequency(stretched) == pytest.approx(220, rel=0.03)
+
+
+def test_time_stretch_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        time_stretch_wsola(sine(220), 0, SAMPLE_RATE)
+
+
+@pytest.mark.parametrize("semitones", [-12, 12])
+def test_pitch_shift_keeps_length_and_moves_pitch(semitones):
+    wav = sine(220)
+    shifted = pitch_shift(wav, semitones, SAMPLE_RATE)
+
+    assert len(shifted) == len(wav)
+    assert dominant_frequency(shifted) == pytest.approx(220 * 2 ** (semitones / 12), rel=0.05)
+
+
+def test_pitch_shift_zero_is_identity():
+    wav = sine(220)
+
+    assert np.array_equal(pitch_shift(wav, 0, SAMPLE_RATE), wav)
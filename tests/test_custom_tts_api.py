@@ -0,0 +1,83 @@
+"""EndpointPool - yönlendirme ve havuzdan çıkarma"""
+from custom_tts_api import EndpointPool
+
+
+def make_pool(count):
+    urls = [f"http://key@host{i}:8020" for i in range(count)]
+    return EndpointPool(urls, max_failures=2, eject_seconds=60, health_interval=3600)
+
+
+def test_least_outstanding_endpoint_is_chosen():
+    pool = make_pool(2)
+    first = pool.acquire()
+    second = pool.acquire()
+
+    assert first is not second
+    pool.release(first, success=True)
+    assert pool.acquire() is first
+
+
+def test_excluded_endpoints_are_skipped():
+    pool = make_pool(2)
+    first = pool.acquire()
+
+    assert pool.acquire(exclude={id(first)}) is not first
+    assert pool.acquire(exclude={id(e) for e in pool.endpoints}) is None
+
+
+def test_failing_endpoint_is_ejected():
+    pool = make_pool(2)
+    bad = pool.endpoints[0]
+    bad.outstanding = 2
+    for _ in range(2):
+        pool.release(bad, success=False)
+
+    assert not bad.healthy
+    assert pool.acquire() is pool.endpoints[1]
+
+
+def test_success_resets_failure_count():
+    pool = make_pool(2)
+    endpoint = pool.endpoints[0]
+    endpoint.outstanding = 2
+    pool.release(endpoint, success=False)
+    pool.release(endpoint, success=True)
+
+    assert endpoint.consecutive_failures == 0
+    assert endpoint.healthy
+
+
+def test_last_healthy_endpoint_is_never_ejected():
+    pool = make_pool(1)
+    endpoint = pool.endpoints[0]
+    for _ in range(5):
+        assert pool.acquire() is endpoint
+        pool.release(endpoint, success=False)
+
+    assert endpoint.healthy
+    assert pool.acquire() is endpoint
+
+
+def test_health_probe_ejects_unresponsive_healthy_endpoint(monkeypatch):
+    pool = make_pool(2)
+    down, up = pool.endpoints
+    monkeypatch.setattr(pool, "check_health", lambda endpoint: endpoint is up)
+
+    pool._probe_healthy()
+
+    assert not down.healthy
+    assert up.healthy
+
+    # Son sağlıklı sunucu yoklamada da çıkarılmaz
+    monkeypatch.setattr(pool, "check_health", lambda endpoint: False)
+    pool._probe_healthy()
+    assert up.healthy
+
+
+def test_close_stops_health_thread():
+    pool = EndpointPool(["http://a:1", "http://b:1"], health_interval=0.01)
+    pool.check_health = lambda endpoint: True
+
+    pool.close()
+
+    assert not pool._health_thread.is_alive()
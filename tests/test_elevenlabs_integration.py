@@ -0,0 +1,119 @@
+"""ElevenLabs kota defteri ve yanıt cache'i"""
+from elevenlabs_integration import ElevenLabsResponseCache, ElevenLabsUsageLedger
+
+
+def test_reserve_within_quota(tmp_path):
+    ledger = ElevenLabsUsageLedger(monthly_quota=100, ledger_file=tmp_path / "usage.json")
+
+    assert ledger.try_reserve(60)
+    assert ledger.used() == 60
+    assert ledger.remaining() == 40
+
+
+def test_reserve_over_quota_changes_nothing(tmp_path):
+    ledger = ElevenLabsUsageLedger(monthly_quota=100, ledger_file=tmp_path / "usage.json")
+    ledger.try_reserve(60)
+
+    assert not ledger.try_reserve(41)
+    assert ledger.used() == 60
+
+
+def test_release_returns_characters(tmp_path):
+    ledger = ElevenLabsUsageLedger(monthly_quota=100, ledger_file=tmp_path / "usage.json")
+    ledger.try_reserve(60)
+    ledger.release(60)
+
+    assert ledger.used() == 0
+    ledger.release(10)
+    assert ledger.used() == 0
+
+
+def test_ledger_persists(tmp_path):
+    ledger_file = tmp_path / "usage.json"
+    ElevenLabsUsageLedger(monthly_quota=100, ledger_file=ledger_file).try_reserve(25)
+
+    assert ElevenLabsUsageLedger(monthly_quota=100, ledger_file=ledger_file).used() == 25
+
+
+def test_cache_key_ignores_settings_order():
+    a = ElevenLabsResponseCache.make_key("Merhaba", "v1", "m1", {"stability": 0.5, "style": 0.0})
+    b = ElevenLabsResponseCache.make_key("Merhaba", "v1", "m1", {"style": 0.0, "stability": 0.5})
+    c = ElevenLabsResponseCache.make_key("Merhaba!", "v1", "m1", {"stability": 0.5, "style": 0.0})
+
+    assert a == b
+    assert a != c
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = ElevenLabsResponseCache(cache_dir=str(tmp_path / "cache"))
+    key = ElevenLabsResponseCache.make_key("Merhaba", "v1", "m1", {})
+
+    assert not cache.contains(key)
+    assert cache.get(key) is None
+
+    cache.put(key, b"mp3-data")
+
+    assert cache.contains(key)
+    assert cache.get(key) == b"mp3-data"
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+
+
+class _Response:
+    def __init__(self, status_code, body=b"", json_body=None):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode("utf-8", "replace")
+        self._json = json_body
+
+    def json(self):
+        if self._json is None:
+            raise ValueError("JSON değil")
+        return self._json
+
+    def iter_content(self, chunk_size=4096):
+        yield self.content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def make_tts(tmp_path, monkeypatch, post):
+    import elevenlabs_integration
+
+    monkeypatch.setattr(elevenlabs_integration.requests, "post", post)
+    tts = elevenlabs_integration.ElevenLabsTTS(api_key=None, use_cache=False)
+    tts.api_key = "test"
+    tts.ledger = ElevenLabsUsageLedger(monthly_quota=500, ledger_file=tmp_path / "usage.json")
+    return tts
+
+
+def test_non_json_error_releases_once(tmp_path, monkeypatch):
+    tts = make_tts(tmp_path, monkeypatch, lambda *a, **k: _Response(502, b"<html>Bad Gateway</html>"))
+
+    assert tts.generate_speech("Merhaba dünya") is None
+    assert tts.ledger.used() == 0
+    assert tts.ledger.remaining() == 500
+
+
+def test_connection_error_releases_reservation(tmp_path, monkeypatch):
+    import requests
+
+    def post(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("bağlantı yok")
+
+    tts = make_tts(tmp_path, monkeypatch, post)
+
+    assert tts.generate_speech("Merhaba dünya") is None
+    assert list(tts.generate_speech_stream("Merhaba dünya")) == []
+    assert tts.ledger.used() == 0
+
+
+def test_successful_request_keeps_reservation(tmp_path, monkeypatch):
+    tts = make_tts(tmp_path, monkeypatch, lambda *a, **k: _Response(200, b"mp3"))
+
+    assert tts.generate_speech("Merhaba") == b"mp3"
+    assert b"".join(tts.generate_speech_stream("Merhaba")) == b"mp3"
+    assert tts.ledger.used() == 2 * len("Merhaba")
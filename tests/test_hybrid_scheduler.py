@@ -0,0 +1,95 @@
+"""HybridScheduler.plan_offload - taşma seçimi"""
+from hybrid_scheduler import HybridScheduler
+
+
+class _LocalEngine:
+    device = "cpu"
+
+
+def make_scheduler(**kwargs):
+    kwargs.setdefault("protect_head", 10)
+    kwargs.setdefault("min_offload_run", 5)
+    return HybridScheduler(_LocalEngine(), **kwargs)
+
+
+def statements(count):
+    return [{'text': f"Cümle {i}.", 'type': 'statement'} for i in range(count)]
+
+
+def test_selection_is_capped_at_needed_from_the_tail():
+    scheduler = make_scheduler()
+    sentences = statements(200)
+
+    assert scheduler.plan_offload(list(range(200)), sentences, 12) == list(range(188, 200))
+
+
+def test_small_need_still_takes_a_minimum_run():
+    scheduler = make_scheduler()
+    sentences = statements(200)
+
+    assert scheduler.plan_offload(list(range(200)), sentences, 3) == list(range(195, 200))
+
+
+def test_short_runs_and_protected_head_stay_local():
+    scheduler = make_scheduler()
+    sentences = statements(40)
+    # Her 4. cümle soru: kesintisiz bloklar 3 cümlede kalır
+    for i in range(0, 40, 4):
+        sentences[i]['type'] = 'question'
+
+    assert scheduler.plan_offload(list(range(40)), sentences, 10) == []
+
+    sentences = statements(14)
+    assert scheduler.plan_offload(list(range(14)), sentences, 10) == []
+
+
+def test_runs_are_collected_until_need_is_met():
+    scheduler = make_scheduler()
+    sentences = statements(60)
+    sentences[50]['type'] = 'dialogue'
+
+    offload = scheduler.plan_offload(list(range(60)), sentences, 12)
+
+    # Sondaki 9'luk blok tamamen, kalan 3 için önceki bloktan en az 5 cümle
+    assert offload == list(range(45, 50)) + list(range(51, 60))
+
+
+class _RecordingLocalEngine(_LocalEngine):
+    SAMPLE_RATE = 24000
+
+    def __init__(self, temp_dir):
+        self.temp_dir = temp_dir
+        self.rendered = []
+
+    def generate_single_sentence(self, text, output_path, show_progress=True, sentence_type=None):
+        from pydub import AudioSegment
+        self.rendered.append(text)
+        AudioSegment.silent(duration=100, frame_rate=self.SAMPLE_RATE).export(output_path, format="wav")
+        return True
+
+
+class _FailingRemoteEngine:
+    def __init__(self):
+        self.requested = []
+
+    def generate_speech(self, text, output_path=None):
+        self.requested.append(text)
+        return None
+
+
+def test_overflow_goes_remote_and_failures_fall_back_to_local(tmp_path):
+    local = _RecordingLocalEngine(str(tmp_path))
+    remote = _FailingRemoteEngine()
+    scheduler = HybridScheduler(local, remote_engine=remote, deadline_minutes=0,
+                                local_seconds_per_sentence=1.0)
+    sentences = statements(30)
+
+    results = list(scheduler.iter_audiobook(sentences, 0, 30))
+
+    assert [idx for idx, _ in results] == list(range(30))
+    assert all(audio is not None for _, audio in results)
+    # Korunan baş hiç uzak motora gitmez, kuyruk sonu gider
+    assert remote.requested == [f"Cümle {i}." for i in range(10, 30)]
+    # Başarısız uzak cümleler yerelde yeniden üretilir
+    assert sorted(local.rendered) == sorted(s['text'] for s in sentences)
+    assert scheduler.temp_dir.startswith(str(tmp_path))
@@ -0,0 +1,67 @@
+"""SegmentedAudiobook - checkpoint ve devam ettirme"""
+import os
+
+from pydub import AudioSegment
+
+from segmented_render import SegmentedAudiobook
+
+
+def silence(ms=100):
+    return AudioSegment.silent(duration=ms, frame_rate=24000)
+
+
+def test_segment_ranges_cover_all_sentences(tmp_path):
+    book = SegmentedAudiobook(str(tmp_path / "book"), total_sentences=12, segment_size=5)
+
+    assert book.segment_ranges() == [(0, 0, 5), (1, 5, 10), (2, 10, 12)]
+
+
+def test_finished_segments_survive_restart(tmp_path):
+    work_dir = str(tmp_path / "book")
+    book = SegmentedAudiobook(work_dir, total_sentences=10, segment_size=5)
+    book.write_segment(0, 0, 5, [silence(), silence()], failed=[3])
+
+    resumed = SegmentedAudiobook(work_dir, total_sentences=10, segment_size=5)
+
+    assert resumed.is_done(0)
+    assert not resumed.is_done(1)
+    assert resumed.completed_count() == 1
+    assert resumed.failed_sentences() == [3]
+
+
+def test_all_failed_segment_counts_as_done(tmp_path):
+    book = SegmentedAudiobook(str(tmp_path / "book"), total_sentences=10, segment_size=5)
+
+    assert book.write_segment(1, 5, 10, [], failed=[5, 6, 7, 8, 9]) is None
+    assert book.manifest['segments']['1']['path'] is None
+    assert book.is_done(1)
+
+
+def test_missing_segment_file_is_rendered_again(tmp_path):
+    book = SegmentedAudiobook(str(tmp_path / "book"), total_sentences=5, segment_size=5)
+    path = book.write_segment(0, 0, 5, [silence()], failed=[])
+
+    os.remove(path)
+
+    assert not book.is_done(0)
+
+
+def test_changed_plan_discards_manifest(tmp_path):
+    work_dir = str(tmp_path / "book")
+    SegmentedAudiobook(work_dir, total_sentences=10, segment_size=5).write_segment(0, 0, 5, [silence()], [])
+
+    assert SegmentedAudiobook(work_dir, total_sentences=11, segment_size=5).completed_count() == 0
+
+
+def test_concurrent_claims_get_separate_directories(tmp_path):
+    renders = str(tmp_path / "renders")
+    first = SegmentedAudiobook.claim(renders, "key", "job1", total_sentences=5)
+    second = SegmentedAudiobook.claim(renders, "key", "job2", total_sentences=5)
+
+    assert first.work_dir != second.work_dir
+
+    first.release()
+    second.release()
+    third = SegmentedAudiobook.claim(renders, "key", "job3", total_sentences=5)
+    assert third.work_dir == first.work_dir
+    third.release()
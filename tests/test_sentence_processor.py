@@ -0,0 +1,35 @@
+"""SentenceProcessor.assign_dialogue_voices - konuşma sırası"""
+from sentence_processor import SentenceProcessor
+
+
+def sentences(*texts):
+    processor = SentenceProcessor()
+    return [{'text': t, 'type': processor.classify_sentence(t)} for t in texts]
+
+
+def test_turns_rotate_through_character_voices():
+    result = SentenceProcessor().assign_dialogue_voices(sentences(
+        "Kapı açıldı.",
+        "— Kimsin sen?",
+        "— Benim, dedi.",
+        "Adam içeri girdi.",
+        "— Geç kaldın.",
+        "Sessizlik oldu.",
+        "— Biliyorum.",
+    ), ["a.wav", "b.wav"])
+
+    assert [s['voice'] for s in result] == [None, "a.wav", "a.wav", None, "b.wav", None, "a.wav"]
+
+
+def test_quotes_count_as_dialogue():
+    result = SentenceProcessor().assign_dialogue_voices(
+        sentences('"Gel buraya" diye bağırdı.'), ["a.wav"]
+    )
+
+    assert result[0]['voice'] == "a.wav"
+
+
+def test_without_voices_everything_is_narrated():
+    result = SentenceProcessor().assign_dialogue_voices(sentences("— Merhaba.", "Anlatım."), [])
+
+    assert [s['voice'] for s in result] == [None, None]
@@ -0,0 +1,91 @@
+"""VoiceCatalog.apply_updates - kararlı ses ID'leri"""
+import json
+
+from voice_catalog import VoiceCatalog
+
+
+def fields(duration=20.0):
+    return {
+        "category": "short_sample",
+        "category_tr": "Kısa Örnek",
+        "duration_seconds": duration,
+        "sample_rate": 24000,
+        "quality": "medium",
+        "file_size": 1000,
+        "file_mtime": 0
+    }
+
+
+def ids(catalog):
+    return {v['file_name']: v['id'] for v in catalog.catalog['voices']}
+
+
+def test_new_voices_get_sequential_ids(tmp_path):
+    catalog = VoiceCatalog(str(tmp_path))
+    catalog.apply_updates({"a.wav": fields(), "b.wav": fields()})
+
+    assert ids(catalog) == {"a.wav": 1, "b.wav": 2}
+    assert catalog.get_voice_by_id(2)['file_name'] == "b.wav"
+
+
+def test_removed_ids_are_not_reused(tmp_path):
+    catalog = VoiceCatalog(str(tmp_path))
+    catalog.apply_updates({"a.wav": fields(), "b.wav": fields()})
+    catalog.apply_updates({"c.wav": fields()}, removed=["a.wav"])
+
+    assert ids(catalog) == {"b.wav": 2, "c.wav": 3}
+    assert catalog.get_voice_by_id(1) is None
+
+
+def test_changed_voice_keeps_its_id(tmp_path):
+    catalog = VoiceCatalog(str(tmp_path))
+    catalog.apply_updates({"a.wav": fields(), "b.wav": fields()})
+    version = catalog.version
+    catalog.apply_updates({"a.wav": fields(duration=45.0)})
+
+    assert ids(catalog) == {"a.wav": 1, "b.wav": 2}
+    assert catalog.get_voice_by_id(1)['duration_seconds'] == 45.0
+    assert catalog.version == version + 1
+
+
+def test_next_id_survives_reload(tmp_path):
+    catalog = VoiceCatalog(str(tmp_path))
+    catalog.apply_updates({"a.wav": fields(), "b.wav": fields()})
+    catalog.apply_updates({}, removed=["b.wav"])
+
+    reloaded = VoiceCatalog(str(tmp_path))
+    reloaded.apply_updates({"c.wav": fields()})
+
+    assert ids(reloaded) == {"a.wav": 1, "c.wav": 3}
+
+
+def test_duplicate_ids_in_old_catalog_are_fixed(tmp_path):
+    catalog = VoiceCatalog(str(tmp_path))
+    catalog.apply_updates({"a.wav": fields(), "b.wav": fields()})
+    data = json.loads((tmp_path / "catalog.json").read_text(encoding="utf-8"))
+    for voice in data['voices']:
+        voice['id'] = 1
+    del data['next_id']
+    (tmp_path / "catalog.json").write_text(json.dumps(data), encoding="utf-8")
+
+    reloaded = VoiceCatalog(str(tmp_path))
+
+    assert sorted(ids(reloaded).values()) == [1, 2]
+    assert reloaded.catalog['next_id'] == 3
+
+
+def test_style_siblings_are_not_indexed_as_voices(tmp_path):
+    for name in ("anlatici.wav", "anlatici_question.wav", "anlatici_heyecan.wav",
+                 "yetim_question.wav", "baska.wav"):
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "anlatici.styles.json").write_text(
+        json.dumps({"exclamation": {"file": "anlatici_heyecan.wav"}}), encoding="utf-8"
+    )
+    catalog = VoiceCatalog(str(tmp_path))
+    catalog.apply_updates({"anlatici_question.wav": fields()})
+
+    changed, removed = catalog.pending_changes()
+
+    # Ana sesi olmayan `_question` dosyası bağımsız sestir
+    assert sorted(p.name for p in changed) == ["anlatici.wav", "baska.wav", "yetim_question.wav"]
+    assert removed == ["anlatici_question.wav"]
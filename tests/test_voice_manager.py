@@ -0,0 +1,63 @@
+"""VoiceManager - SQLite kütüphanesi ve kullanım sayaçları"""
+import sqlite3
+
+import pytest
+
+from voice_manager import VoiceManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    sample = tmp_path / "sample.wav"
+    sample.write_bytes(b"RIFF")
+    manager = VoiceManager(str(tmp_path / "voices"), usage_flush_seconds=3600)
+    manager.sample = sample
+    return manager
+
+
+def stored_usage(manager, voice_id):
+    with sqlite3.connect(str(manager.db_file)) as conn:
+        return conn.execute("SELECT usage_count FROM voices WHERE id = ?", (voice_id,)).fetchone()[0]
+
+
+def test_usage_is_buffered_until_flush(manager):
+    voice_id = manager.add_voice(str(manager.sample), "Anlatıcı", tags=["kitap"])
+    for _ in range(3):
+        manager.increment_usage(voice_id)
+
+    assert stored_usage(manager, voice_id) == 0
+    assert manager.get_voice(voice_id)['usage_count'] == 3
+
+    assert manager.flush_usage() == 1
+    assert stored_usage(manager, voice_id) == 3
+    assert manager.get_voice(voice_id)['usage_count'] == 3
+    assert manager.flush_usage() == 0
+
+
+def test_flush_adds_to_counts_written_elsewhere(manager):
+    voice_id = manager.add_voice(str(manager.sample), "Anlatıcı")
+    other = VoiceManager(str(manager.voices_dir), usage_flush_seconds=3600)
+
+    manager.increment_usage(voice_id)
+    other.increment_usage(voice_id)
+    other.increment_usage(voice_id)
+    manager.flush_usage()
+    other.flush_usage()
+
+    assert stored_usage(manager, voice_id) == 3
+
+
+def test_pending_usage_reorders_listing(manager):
+    first = manager.add_voice(str(manager.sample), "Birinci")
+    second = manager.add_voice(str(manager.sample), "İkinci")
+    manager.increment_usage(second)
+
+    assert [v['id'] for v in manager.list_voices()] == [second, first]
+
+
+def test_tags_filter(manager):
+    tagged = manager.add_voice(str(manager.sample), "Anlatıcı", tags=["kitap", "erkek"])
+    manager.add_voice(str(manager.sample), "Diğer", tags=["reklam"])
+
+    assert [v['id'] for v in manager.list_voices(tags=["kitap"])] == [tagged]
+    assert manager.get_voice(tagged)['tags'] == ["kitap", "erkek"]
@@ -2,27 +2,70 @@
 TTS Engine - M1 Optimize Ses Üretim Motoru
 """
 import torch
-from TTS.api import TTS
 from pydub import AudioSegment
+import numpy as np
+import soundfile as sf
 import os
 from tqdm import tqdm
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, Iterator
+import hashlib
+from contextlib import contextmanager
+import json
+import inspect
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+from queue import Queue
 import time
 import sys
+import uuid
+
+from model_registry import registry, default_device, ModelHandle, XTTS_V2_MODEL
+from audio_dsp import time_stretch_wsola, StyleProcessor
+from conditioning_bank import ConditioningBank
+from reference_clip import probe_audio, ensure_reference_clip, MAX_DIRECT_REFERENCE_SECONDS
+
+# Geçici parça klasörlerinin kökü - kök asla silinmez, her motor kendi alt klasörünü kullanır
+TEMP_ROOT = "temp_chunks"
+
+
+def unique_temp_dir(prefix: str = "") -> str:
+    """TEMP_ROOT altında çağırana özel geçici klasör yolu"""
+    return os.path.join(TEMP_ROOT, f"{prefix}{uuid.uuid4().hex[:12]}")
 
 
 class M1OptimizedTTS:
-    # Model cache - Singleton pattern (Optimizasyon Seviye 3)
-    _model_cache = None
-    _cached_device = None
+    # Konuşmacı latent cache'i - referans ses her cümlede yeniden işlenmez
+    # {anahtar: (gpt_cond_latent, speaker_embedding)}
+    _latent_cache = {}
+    # Genel kilit yalnızca sözlük erişimi içindir; hesaplama anahtara özel kilitle
+    # yapılır (farklı seslerin latent'leri birbirini beklemeden hesaplanır)
+    _latent_lock = threading.Lock()
+    _latent_key_locks = {}
+    LATENT_CACHE_DIR = "cache/latents"
     
-    def __init__(self, voice_sample_path: str, use_progress_bar: bool = True):
+    # Karışık ses tanım dosyası uzantısı (ses yolu yerine kullanılabilir)
+    BLEND_SUFFIX = ".blend.json"
+    
+    # XTTS v2 çıkış örnekleme hızı
+    SAMPLE_RATE = 24000
+    
+    def __init__(self, voice_sample_path: str, use_progress_bar: bool = True, temp_dir: Optional[str] = None,
+                 speed: float = 1.0, pitch: int = 0, emotion: str = "neutral",
+                 use_conditioning_bank: bool = True, deterministic: Optional[bool] = None):
         """
         M1 Mac için optimize edilmiş TTS motoru
         
         Args:
             voice_sample_path: Klonlanacak sesin yolu (10-30 saniye, WAV format)
             use_progress_bar: Progress bar kullan (web arayüzünde False önerilir)
+            temp_dir: Geçici ses parçaları klasörü (None ise temp_chunks altında motora
+                özel bir klasör - cleanup() yalnızca bu klasörü siler)
+            speed: Konuşma hızı (0.5-2.0) - model içinde uygulanır, ton değişmez
+            pitch: Ses tonu (-5..+5) - son işleme aşamasında uygulanır
+            emotion: Duygu tonu (neutral, happy, excited, sad)
+            use_conditioning_bank: Cümle tipine özel referans kesitleri varsa kullan
+            deterministic: Örneklemeyi cümle hash'iyle tohumla - aynı cümle her
+                seferinde aynı sesi üretir (None ise SESLIKITAP_DETERMINISTIC, varsayılan kapalı)
         """
         # GPU Desteği (Optimizasyon Seviye 1)
         import os
@@ -49,55 +92,123 @@ class M1OptimizedTTS:
             raise FileNotFoundError(f"Ses örneği bulunamadı: {voice_sample_path}")
         
         # Ses dosyası bilgilerini göster
-        import soundfile as sf
+        if voice_sample_path.endswith(self.BLEND_SUFFIX):
+            # Karışık ses: latent'ler kaynak seslerden türetilir
+            blend = self.read_blend(voice_sample_path)
+            self._safe_print(f"🎨 Karışık ses: {os.path.basename(blend['voice1'])} + "
+                             f"{os.path.basename(blend['voice2'])} (oran {blend['ratio']:.2f})")
+        else:
+            self._describe_reference(voice_sample_path)
+        
+        self.voice_sample = voice_sample_path
+        
+        # Model yükle - süreç genelindeki kayıttan paylaşılır (Optimizasyon Seviye 3)
+        # Arka planda ön yükleme sürüyorsa kilit sayesinde onun bitmesi beklenir
+        self.model = M1OptimizedTTS.load_model(self.device)
+        
+        self.speed = speed
+        self.style = self._create_style(pitch, emotion)
+        self.deterministic = self._deterministic_default(deterministic)
+        
+        # Cümle tipi → latent (soru/ünlem/diyalog için ayrı referans kesitleri)
+        self.conditioning = {}
+        if use_conditioning_bank:
+            self.precompute_conditioning_bank()
+        
+        # Geçici dosyalar için klasör
+        self.temp_dir = temp_dir or unique_temp_dir()
+        os.makedirs(self.temp_dir, exist_ok=True)
+    
+    def _describe_reference(self, voice_sample_path: str):
+        """Referans ses bilgilerini göster ve süreyi kontrol et (yalnızca dosya başlığı okunur)"""
         try:
-            audio_data, sample_rate = sf.read(voice_sample_path)
-            duration = len(audio_data) / sample_rate
+            info = probe_audio(voice_sample_path)
+            duration = info['duration']
+            sample_rate = info['sample_rate']
             self._safe_print(f"\n{'='*60}")
             self._safe_print(f"🎵 REFERANS SES BİLGİLERİ (SES KLONLAMA İÇİN)")
             self._safe_print(f"{'='*60}")
             self._safe_print(f"📁 Dosya: {voice_sample_path}")
             self._safe_print(f"⏱️  Süre: {duration:.1f} saniye")
             self._safe_print(f"🔊 Sample Rate: {sample_rate} Hz")
-            self._safe_print(f"📊 Boyut: {len(audio_data)} sample")
+            self._safe_print(f"📊 Boyut: {info['frames']} sample")
             
             if duration < 3:
                 self._safe_print(f"⚠️  UYARI: Ses çok kısa ({duration:.1f}s). En az 10-30 saniye önerilir!")
             elif duration < 10:
                 self._safe_print(f"⚠️  UYARI: Ses biraz kısa ({duration:.1f}s). 10-30 saniye önerilir.")
-            elif duration > 60:
-                self._safe_print(f"⚠️  UYARI: Ses çok uzun ({duration:.1f}s). 10-30 saniye arası önerilir!")
+            elif duration > MAX_DIRECT_REFERENCE_SECONDS:
+                self._safe_print(f"✂️  Uzun kayıt ({duration:.1f}s): otomatik çıkarılan referans klibi kullanılacak")
             else:
                 self._safe_print(f"✅ Ses süresi uygun!")
             self._safe_print(f"{'='*60}\n")
         except Exception as e:
             self._safe_print(f"❌ HATA: Ses dosyası okunamadı: {e}")
             raise
+    
+    @staticmethod
+    def detect_device() -> str:
+        """XTTS için kullanılacak cihaz (MPS'te FFT hatası olduğundan CPU)"""
+        return default_device()
+    
+    @property
+    def tts(self):
+        """
+        Paylaşılan Coqui TTS nesnesi
         
-        self.voice_sample = voice_sample_path
+        Motor modeli kendisi tutmaz; kayıt modeli (RAM bütçesi veya boşta
+        bekleme yüzünden) attıysa tutamaç boşalır ve model kayıttan yeniden
+        istenir.
+        """
+        tts = self.model.tts
+        while tts is None:
+            self.model = registry.get(self.model.model_id, self.model.device)
+            tts = self.model.tts
+        return tts
+    
+    @classmethod
+    def load_model(cls, device: str) -> ModelHandle:
+        """
+        XTTS modelini kayıttan getir (yüklü değilse yükle, thread-safe)
         
-        # Model yükle (Cache kullan - Optimizasyon Seviye 3)
-        if M1OptimizedTTS._model_cache is None or M1OptimizedTTS._cached_device != self.device:
-            self._safe_print("📥 XTTS v2 modeli yükleniyor...")
-            self._safe_print("   (İlk seferinde ~2GB indirecek, biraz sürebilir)")
+        Args:
+            device: Hedef cihaz (cpu, cuda)
             
-            try:
-                M1OptimizedTTS._model_cache = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(self.device)
-                M1OptimizedTTS._cached_device = self.device
-                self._safe_print("✅ Model yüklendi ve cache'lendi!")
-            except Exception as e:
-                self._safe_print(f"❌ Model yüklenirken hata: {e}")
-                raise
-        else:
-            self._safe_print("✅ Model cache'den yüklendi (hızlı başlatma)!")
+        Returns:
+            Paylaşılan model tutamacı
+        """
+        return registry.get(XTTS_V2_MODEL, device)
+    
+    @classmethod
+    def unload_model(cls) -> bool:
+        """
+        XTTS modelini bellekten at (boşta bekleme süresi dolunca)
         
-        self.tts = M1OptimizedTTS._model_cache
+        Disk latent cache'i korunur; bir sonraki işte model yeniden yüklenir.
         
-        # Geçici dosyalar için klasör
-        self.temp_dir = "temp_chunks"
-        os.makedirs(self.temp_dir, exist_ok=True)
+        Returns:
+            Model yüklüyse ve bırakıldıysa True
+        """
+        if not registry.unload(XTTS_V2_MODEL):
+            return False
+        
+        with cls._latent_lock:
+            cls._latent_cache.clear()
+        
+        cls._safe_print("💤 XTTS modeli boşta kaldığı için bellekten kaldırıldı")
+        return True
+    
+    @classmethod
+    def is_model_loaded(cls) -> bool:
+        return registry.is_loaded(XTTS_V2_MODEL)
+    
+    @classmethod
+    def idle_seconds(cls) -> float:
+        """Modelin son kullanımından bu yana geçen süre (yüklü değilse 0)"""
+        return registry.idle_seconds(XTTS_V2_MODEL) or 0.0
     
-    def _safe_print(self, message: str):
+    @staticmethod
+    def _safe_print(message: str):
         """Güvenli print - BrokenPipe hatası önlenir"""
         try:
             print(message)
@@ -106,7 +217,373 @@ class M1OptimizedTTS:
             # Web arayüzünde pipe bozulabilir, sessizce devam et
             pass
     
-    def generate_single_sentence(self, text: str, output_path: str, show_progress: bool = True) -> bool:
+    @staticmethod
+    def _deterministic_default(deterministic: Optional[bool]) -> bool:
+        if deterministic is None:
+            return os.getenv("SESLIKITAP_DETERMINISTIC", "0") == "1"
+        return deterministic
+    
+    @staticmethod
+    def sentence_seed(text: str, language: str = "tr") -> int:
+        """Cümle metninden kararlı örnekleme tohumu (süreçten bağımsız)"""
+        digest = hashlib.sha256(f"{language}|{text.strip()}".encode("utf-8")).hexdigest()
+        return int(digest[:8], 16)
+    
+    @contextmanager
+    def _sampling_seed(self, text: str, language: str = "tr"):
+        """
+        Deterministik modda örneklemeyi cümleye özel tohumla
+        
+        Global RNG durumu fork_rng ile korunur; model kilidi içinde
+        çağrıldığından başka bir çıkarım tohumu bozamaz. Böylece cache'ten
+        gelen, kısmen yeniden üretilen ve devam ettirilen cümleler tam
+        render ile aynı dalga formunu verir.
+        """
+        if not self.deterministic:
+            yield
+            return
+        devices = [torch.cuda.current_device()] if self.device == "cuda" else []
+        with torch.random.fork_rng(devices=devices):
+            torch.manual_seed(self.sentence_seed(text, language))
+            yield
+    
+    @staticmethod
+    def _latent_key(speaker_wav: str) -> str:
+        """Referans ses için cache anahtarı (yol + boyut + değişiklik zamanı)"""
+        stat = os.stat(speaker_wav)
+        raw = f"{os.path.abspath(speaker_wav)}|{stat.st_size}|{int(stat.st_mtime)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    
+    @classmethod
+    def latent_cache_path(cls, speaker_wav: str) -> str:
+        """Referans sesin disk latent cache dosyası"""
+        return os.path.join(cls.LATENT_CACHE_DIR, f"{cls._latent_key(speaker_wav)}.pt")
+    
+    @classmethod
+    def _latent_key_lock(cls, key: str) -> threading.Lock:
+        """Latent anahtarına özel kilit (aynı ses iki kez hesaplanmaz)"""
+        with cls._latent_lock:
+            return cls._latent_key_locks.setdefault(key, threading.Lock())
+    
+    def get_speaker_latents(self, speaker_wav: Optional[str] = None) -> Tuple:
+        """
+        Referans sesin XTTS latent'lerini getir (bellek > disk > hesapla)
+        
+        Args:
+            speaker_wav: Referans ses (None ise motorun kendi referansı)
+            
+        Returns:
+            (gpt_cond_latent, speaker_embedding)
+        """
+        speaker_wav = speaker_wav or self.voice_sample
+        if speaker_wav.endswith(self.BLEND_SUFFIX):
+            blend = self.read_blend(speaker_wav)
+            return self.blend_latents(blend['voice1'], blend['voice2'], blend['ratio'])
+        
+        key = self._latent_key(speaker_wav)
+        
+        with M1OptimizedTTS._latent_lock:
+            cached = M1OptimizedTTS._latent_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Uzun kayıtlar XTTS'e verilmez: kısa referans klibinin latent'leri kullanılır
+        reference = ensure_reference_clip(speaker_wav)
+        if reference != speaker_wav:
+            cached = self.get_speaker_latents(reference)
+            with M1OptimizedTTS._latent_lock:
+                M1OptimizedTTS._latent_cache[key] = cached
+            return cached
+        
+        with self._latent_key_lock(key):
+            with M1OptimizedTTS._latent_lock:
+                cached = M1OptimizedTTS._latent_cache.get(key)
+            if cached is not None:
+                return cached
+            
+            disk_path = os.path.join(self.LATENT_CACHE_DIR, f"{key}.pt")
+            if os.path.exists(disk_path):
+                latents = torch.load(disk_path, map_location=self.device)
+                cached = (latents["gpt_cond_latent"], latents["speaker_embedding"])
+            else:
+                model = self.tts.synthesizer.tts_model
+                config = model.config
+                with self.model.lock:
+                    gpt_cond_latent, speaker_embedding = model.get_conditioning_latents(
+                        audio_path=[speaker_wav],
+                        gpt_cond_len=config.gpt_cond_len,
+                        max_ref_length=config.max_ref_len,
+                        sound_norm_refs=config.sound_norm_refs
+                    )
+                cached = (gpt_cond_latent, speaker_embedding)
+                
+                os.makedirs(self.LATENT_CACHE_DIR, exist_ok=True)
+                torch.save(
+                    {"gpt_cond_latent": gpt_cond_latent, "speaker_embedding": speaker_embedding},
+                    disk_path
+                )
+            
+            with M1OptimizedTTS._latent_lock:
+                M1OptimizedTTS._latent_cache[key] = cached
+            return cached
+    
+    @staticmethod
+    def read_blend(blend_path: str) -> Dict:
+        """Karışık ses tanımını oku ({voice1, voice2, ratio})"""
+        with open(blend_path, 'r', encoding='utf-8') as f:
+            blend = json.load(f)
+        base_dir = os.path.dirname(blend_path)
+        for name in ('voice1', 'voice2'):
+            # Göreli yollar tanım dosyasının klasörüne göredir
+            if not os.path.isabs(blend[name]) and not os.path.exists(blend[name]):
+                blend[name] = os.path.join(base_dir, blend[name])
+        blend['ratio'] = float(blend.get('ratio', 0.5))
+        return blend
+    
+    def blend_latents(self, voice1: str, voice2: str, ratio: float = 0.5) -> Tuple:
+        """
+        İki sesin latent'lerini karıştır (latent uzayında, dalga formu değil)
+        
+        Kaynak latent'ler mevcut cache'ten gelir; karışım kaynak anahtarları
+        ve orandan türetilen anahtarla bellek + disk cache'e yazılır, aynı
+        karışım sonraki render'larda hesaplanmadan kullanılır.
+        
+        Args:
+            voice1: İlk referans ses
+            voice2: İkinci referans ses
+            ratio: Karışım oranı (0.0=sadece voice1, 1.0=sadece voice2)
+            
+        Returns:
+            (gpt_cond_latent, speaker_embedding)
+        """
+        if not 0.0 <= ratio <= 1.0:
+            raise ValueError(f"Karışım oranı 0-1 arasında olmalı: {ratio}")
+        
+        raw = f"blend|{self._latent_key(voice1)}|{self._latent_key(voice2)}|{ratio:.3f}"
+        key = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        
+        disk_path = os.path.join(self.LATENT_CACHE_DIR, f"{key}.pt")
+        
+        with M1OptimizedTTS._latent_lock:
+            cached = M1OptimizedTTS._latent_cache.get(key)
+        if cached is None and os.path.exists(disk_path):
+            latents = torch.load(disk_path, map_location=self.device)
+            cached = (latents["gpt_cond_latent"], latents["speaker_embedding"])
+            with M1OptimizedTTS._latent_lock:
+                M1OptimizedTTS._latent_cache[key] = cached
+        if cached is not None:
+            return cached
+        
+        gpt1, speaker1 = self.get_speaker_latents(voice1)
+        gpt2, speaker2 = self.get_speaker_latents(voice2)
+        
+        # GPT koşul latent'leri token bazında doğrusal karışım (uzunluklar farklıysa kısa olana göre)
+        length = min(gpt1.shape[1], gpt2.shape[1])
+        gpt_cond_latent = torch.lerp(gpt1[:, :length], gpt2[:, :length], ratio)
+        
+        # Konuşmacı gömmesi: doğrusal karışım, norm kaynakların karışımına ölçeklenir
+        speaker_embedding = torch.lerp(speaker1, speaker2, ratio)
+        target_norm = (1 - ratio) * speaker1.norm() + ratio * speaker2.norm()
+        speaker_embedding = speaker_embedding * (target_norm / speaker_embedding.norm().clamp_min(1e-8))
+        
+        cached = (gpt_cond_latent, speaker_embedding)
+        os.makedirs(self.LATENT_CACHE_DIR, exist_ok=True)
+        torch.save(
+            {"gpt_cond_latent": gpt_cond_latent, "speaker_embedding": speaker_embedding},
+            disk_path
+        )
+        
+        with M1OptimizedTTS._latent_lock:
+            M1OptimizedTTS._latent_cache[key] = cached
+        return cached
+    
+    def precompute_conditioning_bank(self):
+        """
+        Referans sesin koşullandırma bankasını hazırla (bir kez, disk cache'li)
+        
+        Seslendirme sırasında cümle tipine göre latent seçimi yalnızca bir
+        sözlük aramasıdır; cümle başına referans kodlaması yapılmaz.
+        """
+        excerpts = ConditioningBank(self.voice_sample).excerpts()
+        for sentence_type, excerpt_path in excerpts.items():
+            try:
+                self.conditioning[sentence_type] = self.get_speaker_latents(excerpt_path)
+            except Exception as e:
+                self._safe_print(f"⚠️  Stil kesiti işlenemedi ({sentence_type}): {e}")
+        
+        if self.conditioning:
+            self._safe_print(f"🎭 Koşullandırma bankası: {', '.join(sorted(self.conditioning))}")
+    
+    def _latents_for(self, speaker_wav: Optional[str], sentence_type: Optional[str]) -> Tuple:
+        """Cümle tipine uygun latent'ler (banka yalnızca motorun kendi sesi için)"""
+        if sentence_type and (speaker_wav is None or speaker_wav == self.voice_sample):
+            cached = self.conditioning.get(sentence_type)
+            if cached is not None:
+                return cached
+        return self.get_speaker_latents(speaker_wav)
+    
+    def _inference_kwargs(self) -> Dict:
+        """tts_to_file ile aynı örnekleme ayarları (model config'inden)"""
+        config = self.tts.synthesizer.tts_model.config
+        return {
+            "temperature": config.temperature,
+            "length_penalty": config.length_penalty,
+            "repetition_penalty": config.repetition_penalty,
+            "top_k": config.top_k,
+            "top_p": config.top_p
+        }
+    
+    def _create_style(self, pitch: int, emotion: str) -> Optional[StyleProcessor]:
+        """Ton/duygu ayarı varsa son işleme aşamasını oluştur"""
+        style = StyleProcessor(self.SAMPLE_RATE, pitch=pitch, emotion=emotion)
+        return style if style.active else None
+    
+    def _native_speed_supported(self, method) -> bool:
+        """XTTS sürümü `speed` parametresini destekliyor mu? (Coqui TTS >= 0.20)"""
+        try:
+            return "speed" in inspect.signature(method).parameters
+        except (TypeError, ValueError):
+            return False
+    
+    def _speed_kwargs(self, method, speed: float) -> Dict:
+        """Hız destekleniyorsa modele verilecek parametre"""
+        if speed != 1.0 and self._native_speed_supported(method):
+            return {"speed": speed}
+        return {}
+    
+    @staticmethod
+    def _char_limit(model, language: str) -> int:
+        """XTTS tokenizer'ının dil için karakter sınırı (bilinmiyorsa 250)"""
+        char_limits = getattr(getattr(model, "tokenizer", None), "char_limits", None) or {}
+        return char_limits.get(language, 250)
+    
+    def _apply_speed_fallback(self, wav: np.ndarray, speed: float, applied: Dict) -> np.ndarray:
+        """Model hızı uygulayamadıysa WSOLA ile esnet (ton korunur)"""
+        if speed != 1.0 and not applied:
+            return time_stretch_wsola(wav, speed, self.SAMPLE_RATE)
+        return wav
+    
+    def synthesize(self, text: str, speaker_wav: Optional[str] = None, language: str = "tr",
+                   speed: Optional[float] = None, sentence_type: Optional[str] = None) -> np.ndarray:
+        """
+        Metni cache'lenmiş latent'lerle seslendir (dosyaya yazmadan)
+        
+        Args:
+            text: Metin
+            speaker_wav: Referans ses (None ise motorun kendi referansı)
+            language: Dil kodu
+            speed: Konuşma hızı (None ise motorun hızı)
+            sentence_type: Cümle tipi (question, exclamation, dialogue, statement)
+                - koşullandırma bankasından latent seçimi için
+            
+        Returns:
+            float32 ses dizisi (SAMPLE_RATE Hz, mono)
+        """
+        gpt_cond_latent, speaker_embedding = self._latents_for(speaker_wav, sentence_type)
+        speed = self.speed if speed is None else speed
+        model = self.tts.synthesizer.tts_model
+        speed_kwargs = self._speed_kwargs(model.inference, speed)
+        
+        # model.inference metni bölmez; XTTS'in token sınırını aşan metinler
+        # tts() ile aynı şekilde cümlelere ayrılıp art arda seslendirilir
+        parts = [text]
+        if len(text) > self._char_limit(model, language):
+            parts = self.tts.synthesizer.split_into_sentences(text)
+        
+        # Paylaşılan model thread-safe değil: çıkarım tutamaç kilidiyle yapılır
+        wavs = []
+        with self.model.lock, torch.inference_mode(), self._sampling_seed(text, language):
+            self.model.touch()
+            for part in parts:
+                out = model.inference(
+                    part,
+                    language,
+                    gpt_cond_latent,
+                    speaker_embedding,
+                    **self._inference_kwargs(),
+                    **speed_kwargs
+                )
+                wav = out["wav"]
+                if torch.is_tensor(wav):
+                    wav = wav.cpu().numpy()
+                wavs.append(np.asarray(wav, dtype=np.float32).reshape(-1))
+        
+        wav = np.concatenate(wavs) if wavs else np.zeros(0, dtype=np.float32)
+        return self._apply_speed_fallback(wav, speed, speed_kwargs)
+    
+    def synthesize_stream(
+        self,
+        text: str,
+        speaker_wav: Optional[str] = None,
+        language: str = "tr",
+        stream_chunk_size: int = 20,
+        speed: Optional[float] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        Metni XTTS akış çıkarımıyla seslendir - GPT çözümlemesi sürerken
+        ses parçaları döndürülür (ilk ses cümle bitmeden gelir)
+        
+        Args:
+            text: Metin (uzun metinler cümlelere bölünerek işlenir)
+            speaker_wav: Referans ses (None ise motorun kendi referansı)
+            language: Dil kodu
+            stream_chunk_size: Parça başına GPT token sayısı (küçük = daha erken ilk ses)
+            speed: Konuşma hızı (None ise motorun hızı)
+            
+        Yields:
+            float32 ses parçaları (SAMPLE_RATE Hz, mono)
+        """
+        gpt_cond_latent, speaker_embedding = self.get_speaker_latents(speaker_wav)
+        speed = self.speed if speed is None else speed
+        model = self.tts.synthesizer.tts_model
+        speed_kwargs = self._speed_kwargs(model.inference_stream, speed)
+        
+        # Kilit, inference_mode ve RNG bağlamı tek bir üretici thread'e aittir:
+        # generator her adımda farklı bir thread'de devam ettirilebilir (Gradio,
+        # Starlette), bu yüzden bağlamlar yield boyunca açık tutulmaz. Parçalar
+        # kuyrukla aktarılır; tüketici erken bırakırsa üretici sonraki parçada durur.
+        chunks = Queue()
+        stop = threading.Event()
+        done = object()
+        
+        def produce():
+            try:
+                with self.model.lock, torch.inference_mode(), self._sampling_seed(text, language):
+                    self.model.touch()
+                    stream = model.inference_stream(
+                        text,
+                        language,
+                        gpt_cond_latent,
+                        speaker_embedding,
+                        stream_chunk_size=stream_chunk_size,
+                        enable_text_splitting=True,
+                        **self._inference_kwargs(),
+                        **speed_kwargs
+                    )
+                    for chunk in stream:
+                        if stop.is_set():
+                            break
+                        if torch.is_tensor(chunk):
+                            chunk = chunk.cpu().numpy()
+                        chunks.put(np.asarray(chunk, dtype=np.float32).squeeze())
+                chunks.put(done)
+            except Exception as e:
+                chunks.put(e)
+        
+        threading.Thread(target=produce, name="xtts-stream", daemon=True).start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield self._apply_speed_fallback(item, speed, speed_kwargs)
+        finally:
+            stop.set()
+    
+    def generate_single_sentence(self, text: str, output_path: str, show_progress: bool = True,
+                                 sentence_type: Optional[str] = None) -> bool:
         """Tek bir cümleyi seslendir"""
         try:
             if show_progress:
@@ -114,13 +591,12 @@ class M1OptimizedTTS:
             
             # TTS çağrısını yap - SES KLONLAMA İÇİN OPTİMİZE
             # NOT: XTTS v2'de fazla parametre ses klonlamayı bozuyor!
-            # Sadece temel parametreleri kullanıyoruz
-            self.tts.tts_to_file(
-                text=text,
-                speaker_wav=self.voice_sample,  # REFERANS SES - ÖNEMLİ!
-                language="tr",
-                file_path=output_path
-            )
+            # Sadece temel parametreleri kullanıyoruz (tts_to_file ile aynı)
+            # Referans ses latent'leri bir kez hesaplanıp cache'leniyor
+            wav = self.synthesize(text, self.voice_sample, language="tr", sentence_type=sentence_type)
+            if self.style:
+                wav = self.style.process(wav)
+            sf.write(output_path, wav, self.SAMPLE_RATE)
             
             # Dosya oluşturuldu mu kontrol et
             if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
@@ -139,54 +615,90 @@ class M1OptimizedTTS:
             traceback.print_exc()
             return False
     
-    def generate_batch(self, texts: List[str], output_paths: List[str]) -> List[bool]:
+    def generate_batch(self, texts: List[str], output_paths: List[str],
+                       sentence_types: Optional[List[str]] = None) -> List[bool]:
         """
         Batch olarak birden fazla cümleyi işle (Optimizasyon Seviye 2)
         
         Args:
             texts: İşlenecek metinler
             output_paths: Çıktı dosya yolları
+            sentence_types: Cümle tipleri (koşullandırma bankası için, opsiyonel)
             
         Returns:
             Her cümle için başarı durumu (True/False)
         """
+        if sentence_types is None:
+            sentence_types = [None] * len(texts)
+        
+        if not self.style:
+            return [
+                self.generate_single_sentence(text, output_path, show_progress=False,
+                                              sentence_type=sentence_type)
+                for text, output_path, sentence_type in zip(texts, output_paths, sentence_types)
+            ]
+        
+        # Stil aşaması: model bir sonraki cümleyi üretirken önceki cümlelerin
+        # ton/vurgu işlemesi thread havuzunda sürer
+        pending = []
+        for text, output_path, sentence_type in zip(texts, output_paths, sentence_types):
+            try:
+                wav = self.synthesize(text, self.voice_sample, language="tr", sentence_type=sentence_type)
+                pending.append((output_path, self.style.submit(wav)))
+            except Exception as e:
+                self._safe_print(f"\n❌ HATA: {type(e).__name__}: {e}")
+                self._safe_print(f"   Metin: {text[:100]}")
+                pending.append((output_path, None))
+        
         results = []
-        for text, output_path in zip(texts, output_paths):
-            success = self.generate_single_sentence(text, output_path, show_progress=False)
-            results.append(success)
+        for output_path, future in pending:
+            if future is None:
+                results.append(False)
+                continue
+            try:
+                sf.write(output_path, future.result(), self.SAMPLE_RATE)
+                results.append(True)
+            except Exception as e:
+                self._safe_print(f"\n❌ Son işleme hatası: {e}")
+                results.append(False)
         return results
     
-    def generate_audiobook(
-        self, 
+    def iter_audiobook(
+        self,
         sentences: List[Dict],
-        output_path: str = "audiobook.mp3",
         start_from: int = 0
-    ) -> str:
+    ) -> Iterator[Tuple[int, Optional[AudioSegment]]]:
         """
-        Tüm kitabı seslendir
+        Cümleleri sırayla seslendir, her biri bittiği anda döndür
+        
+        Web arayüzünde ilk cümleler hazır olur olmaz dinlenebilsin diye
+        generate_audiobook bu generator üzerine kuruludur.
         
         Args:
             sentences: Cümle listesi (sentence_processor'dan gelen)
-            output_path: Çıktı dosyası yolu
             start_from: Hangi cümleden başlanacak (hata durumunda devam için)
+            
+        Yields:
+            (cümle indeksi, duraklama eklenmiş ses) - başarısız cümlede ses None
         """
-        
         total = len(sentences)
-        self._safe_print(f"\n🎙️  {total} cümle seslendiriliyor...")
-        self._safe_print(f"⏱️  Tahmini süre: {self.estimate_time(total)}")
+        os.makedirs(self.temp_dir, exist_ok=True)
+        
+        # Karakter sesi atanmış diyaloglar varsa ses başına şeritlerle üret
+        if any(s.get('voice') for s in sentences[start_from:]):
+            yield from self._iter_multivoice(sentences, start_from)
+            return
         
         # Batch processing için ayar (Optimizasyon Seviye 2)
-        # CPU için batch=1 daha stabil
-        BATCH_SIZE = 1  # CPU için tek tek işle (3-5 sn/cümle)
+        # CPU için batch=1 daha stabil; stil aşaması varsa son işleme bir
+        # sonraki cümlenin üretimiyle örtüşsün diye küçük batch'ler kullanılır
+        BATCH_SIZE = 4 if self.style else 1
         if BATCH_SIZE > 1:
             self._safe_print(f"🔄 Batch processing aktif: {BATCH_SIZE} cümle/batch")
         
         if start_from > 0:
             self._safe_print(f"🔄 {start_from}. cümleden devam ediliyor...")
         
-        audio_chunks = []
-        failed_sentences = []
-        
         start_time = time.time()
         
         # Progress bar - Web arayüzünde tqdm devre dışı
@@ -206,6 +718,7 @@ class M1OptimizedTTS:
             
             # Batch için metinler ve dosya yolları hazırla
             batch_texts = [s['text'] for s in batch_sentences]
+            batch_types = [s.get('type') for s in batch_sentences]
             batch_paths = [os.path.join(self.temp_dir, f"chunk_{j:04d}.wav") 
                           for j in range(i, batch_end)]
             
@@ -213,53 +726,115 @@ class M1OptimizedTTS:
                 # Batch işle
                 if BATCH_SIZE > 1:
                     self._safe_print(f"   🎤 Batch {i+1}-{batch_end}/{total} işleniyor...")
-                    results = self.generate_batch(batch_texts, batch_paths)
+                    results = self.generate_batch(batch_texts, batch_paths, batch_types)
                 else:
                     # Tek cümle için
-                    results = [self.generate_single_sentence(batch_texts[0], batch_paths[0])]
+                    results = [self.generate_single_sentence(batch_texts[0], batch_paths[0],
+                                                             sentence_type=batch_types[0])]
                 
                 # Her cümle için ses dosyalarını yükle
+                batch_audio = []
                 for j, (success, sentence_data) in enumerate(zip(results, batch_sentences)):
                     sentence_idx = i + j
                     
                     if not success:
-                        failed_sentences.append(sentence_idx)
+                        batch_audio.append((sentence_idx, None))
                         continue
                     
-                    chunk_path = batch_paths[j]
-                    
-                    # Ses dosyasını yükle
-                    audio = AudioSegment.from_wav(chunk_path)
-                    
-                    # Normalize et
-                    audio = audio.normalize()
-                    
-                    # Duraklama ekle
-                    pause_ms = int(sentence_data['pause_after'] * 1000)
-                    silence = AudioSegment.silent(duration=pause_ms)
-                    
-                    audio_chunks.append(audio + silence)
-                
-                # İlerleme göstergesi
-                processed = i + len(batch_sentences)
-                if processed % 15 == 0 or processed == total:
-                    elapsed = time.time() - start_time
-                    avg_time = elapsed / (processed - start_from)
-                    remaining = avg_time * (total - processed)
-                    self._safe_print(f"   💾 {processed}/{total} tamamlandı")
-                    self._safe_print(f"   ⏱️  Kalan süre: ~{remaining/60:.1f} dakika")
-                
-                # Web arayüzü için ilerleme
-                if not self.use_progress_bar and processed % 5 == 0:
-                    progress_pct = ((processed - start_from) / (total - start_from)) * 100
-                    self._safe_print(f"   ⏳ İlerleme: {processed}/{total} ({progress_pct:.1f}%)")
+                    batch_audio.append((sentence_idx, self._load_chunk(batch_paths[j], sentence_data)))
                 
             except Exception as e:
                 self._safe_print(f"\n⚠️  Hata (batch {i}-{batch_end}): {e}")
                 for j in range(i, batch_end):
-                    failed_sentences.append(j)
+                    yield j, None
                 continue
+            
+            # İlerleme göstergesi
+            processed = i + len(batch_sentences)
+            if processed % 15 == 0 or processed == total:
+                elapsed = time.time() - start_time
+                avg_time = elapsed / (processed - start_from)
+                remaining = avg_time * (total - processed)
+                self._safe_print(f"   💾 {processed}/{total} tamamlandı")
+                self._safe_print(f"   ⏱️  Kalan süre: ~{remaining/60:.1f} dakika")
+            
+            # Web arayüzü için ilerleme
+            if not self.use_progress_bar and processed % 5 == 0:
+                progress_pct = ((processed - start_from) / (total - start_from)) * 100
+                self._safe_print(f"   ⏳ İlerleme: {processed}/{total} ({progress_pct:.1f}%)")
+            
+            for item in batch_audio:
+                yield item
+    
+    def _load_chunk(self, chunk_path: str, sentence_data: Dict) -> AudioSegment:
+        """Cümle WAV'ını yükle, normalize et ve duraklamayı ekle"""
+        audio = AudioSegment.from_wav(chunk_path).normalize()
+        pause_ms = int(sentence_data['pause_after'] * 1000)
+        return audio + AudioSegment.silent(duration=pause_ms)
+    
+    def _iter_multivoice(
+        self,
+        sentences: List[Dict],
+        start_from: int = 0
+    ) -> Iterator[Tuple[int, Optional[AudioSegment]]]:
+        """
+        Çok sesli üretim: her ses (anlatıcı + karakterler) kendi şeridinde
+        
+        Cümleler 'voice' alanına göre şeritlere ayrılır; her şerit kendi
+        cümlelerini sırayla, o sesin cache'lenmiş latent'leriyle üretir. Model
+        tek kopyadır (ses değişimi yalnızca latent seçimidir); çıkarım model
+        kilidiyle sıralanırken stil işleme ve dosya yazımı şeritler arasında
+        örtüşür. Sonuçlar okuma sırasıyla döndürülür.
+        """
+        lanes: Dict[str, List[int]] = {}
+        for idx in range(start_from, len(sentences)):
+            voice = sentences[idx].get('voice') or self.voice_sample
+            lanes.setdefault(voice, []).append(idx)
+        
+        # Latent'ler şeritler başlamadan bir kez hazırlanır
+        for voice in lanes:
+            self.get_speaker_latents(voice)
+        self._safe_print(f"🎭 Çok sesli üretim: {len(lanes)} şerit ({len(sentences) - start_from} cümle)")
+        
+        results = {idx: Future() for lane in lanes.values() for idx in lane}
+        stop = threading.Event()
+        
+        def run_lane(voice: str, indices: List[int]):
+            for idx in indices:
+                if stop.is_set():
+                    # Tüketici durdu (iptal) - kalan cümleler üretilmez
+                    results[idx].set_result(None)
+                    continue
+                sentence_data = sentences[idx]
+                chunk_path = os.path.join(self.temp_dir, f"chunk_{idx:04d}.wav")
+                try:
+                    wav = self.synthesize(sentence_data['text'], voice, language="tr",
+                                          sentence_type=sentence_data.get('type'))
+                    if self.style:
+                        wav = self.style.process(wav)
+                    sf.write(chunk_path, wav, self.SAMPLE_RATE)
+                    results[idx].set_result(self._load_chunk(chunk_path, sentence_data))
+                except Exception as e:
+                    self._safe_print(f"\n❌ HATA (cümle {idx}, {os.path.basename(voice)}): {type(e).__name__}: {e}")
+                    results[idx].set_result(None)
+        
+        with ThreadPoolExecutor(max_workers=min(len(lanes), 4), thread_name_prefix="voice-lane") as executor:
+            for voice, indices in lanes.items():
+                executor.submit(run_lane, voice, indices)
+            
+            try:
+                for idx in range(start_from, len(sentences)):
+                    yield idx, results[idx].result()
+            finally:
+                stop.set()
+    
+    def export_audiobook(self, audio_chunks: List[AudioSegment], output_path: str) -> AudioSegment:
+        """
+        Ses parçalarını birleştir, normalize et ve MP3 olarak kaydet
         
+        Returns:
+            Birleştirilmiş ses
+        """
         if not audio_chunks:
             raise Exception("❌ Hiç ses üretilemedi!")
         
@@ -279,6 +854,39 @@ class M1OptimizedTTS:
             bitrate="192k",
             parameters=["-q:a", "2"]  # Yüksek kalite
         )
+        return final_audio
+    
+    def generate_audiobook(
+        self, 
+        sentences: List[Dict],
+        output_path: str = "audiobook.mp3",
+        start_from: int = 0
+    ) -> str:
+        """
+        Tüm kitabı seslendir
+        
+        Args:
+            sentences: Cümle listesi (sentence_processor'dan gelen)
+            output_path: Çıktı dosyası yolu
+            start_from: Hangi cümleden başlanacak (hata durumunda devam için)
+        """
+        
+        total = len(sentences)
+        self._safe_print(f"\n🎙️  {total} cümle seslendiriliyor...")
+        self._safe_print(f"⏱️  Tahmini süre: {self.estimate_time(total)}")
+        
+        audio_chunks = []
+        failed_sentences = []
+        
+        start_time = time.time()
+        
+        for sentence_idx, audio in self.iter_audiobook(sentences, start_from):
+            if audio is None:
+                failed_sentences.append(sentence_idx)
+            else:
+                audio_chunks.append(audio)
+        
+        final_audio = self.export_audiobook(audio_chunks, output_path)
         
         # İstatistikler
         duration_minutes = len(final_audio) / 1000 / 60
@@ -332,6 +940,126 @@ class M1OptimizedTTS:
             return f"~{minutes}d" if minutes > 0 else "< 1d"
 
 
+class SingleSpeakerTTS(M1OptimizedTTS):
+    """
+    Tek konuşmacılı hızlı Coqui modelleri (Glow-TTS, Tacotron2 vb.)
+    
+    Ses klonlama yapmaz; referans ses yok sayılır. Cümle üretimi, birleştirme
+    ve geçici dosya akışı M1OptimizedTTS ile aynıdır.
+    """
+    
+    def __init__(self, model_id: str, use_progress_bar: bool = True, temp_dir: Optional[str] = None,
+                 speed: float = 1.0, pitch: int = 0, emotion: str = "neutral"):
+        """
+        Args:
+            model_id: TurkishTTSModels ID'si (ör. vits_tr) veya Coqui model yolu
+            use_progress_bar: Progress bar kullan (web arayüzünde False önerilir)
+            temp_dir: Geçici ses parçaları klasörü (None ise motora özel)
+            speed: Konuşma hızı (Glow-TTS/VITS'te length_scale ile uygulanır)
+            pitch: Ses tonu (-5..+5)
+            emotion: Duygu tonu
+        """
+        self.model_path = resolve_model_path(model_id)
+        self.device = default_device()
+        self.use_progress_bar = use_progress_bar
+        self.voice_sample = None
+        self.speed = speed
+        
+        self.model = registry.get(self.model_path, self.device)
+        self.SAMPLE_RATE = self.tts.synthesizer.output_sample_rate
+        self.style = self._create_style(pitch, emotion)
+        self.deterministic = self._deterministic_default(None)
+        self.conditioning = {}
+        
+        self.temp_dir = temp_dir or unique_temp_dir()
+        os.makedirs(self.temp_dir, exist_ok=True)
+    
+    def synthesize(self, text: str, speaker_wav: Optional[str] = None, language: str = "tr",
+                   speed: Optional[float] = None, sentence_type: Optional[str] = None) -> np.ndarray:
+        """Metni seslendir (speaker_wav, language ve sentence_type yok sayılır)"""
+        speed = self.speed if speed is None else speed
+        model = self.tts.synthesizer.tts_model
+        native = speed != 1.0 and hasattr(model, "length_scale")
+        
+        with self.model.lock, torch.inference_mode(), self._sampling_seed(text):
+            self.model.touch()
+            if native:
+                # Süre tahmincisi olan modellerde hız = 1 / length_scale
+                original_scale = model.length_scale
+                model.length_scale = original_scale / speed
+            try:
+                wav = self.tts.tts(text=text)
+            finally:
+                if native:
+                    model.length_scale = original_scale
+        
+        wav = np.asarray(wav, dtype=np.float32).squeeze()
+        if speed != 1.0 and not native:
+            wav = time_stretch_wsola(wav, speed, self.SAMPLE_RATE)
+        return wav
+    
+    def synthesize_stream(self, text: str, speaker_wav: Optional[str] = None, language: str = "tr",
+                          stream_chunk_size: int = 20, speed: Optional[float] = None) -> Iterator[np.ndarray]:
+        """Akış çıkarımı yok: cümle cümle seslendirip her birini döndür"""
+        from sentence_processor import SentenceProcessor
+        
+        for sentence in SentenceProcessor().split_into_sentences(text):
+            yield self.synthesize(sentence['text'], speed=speed)
+
+
+def resolve_model_path(model_id: str) -> str:
+    """
+    Model ID'sini Coqui model yoluna çevir
+    
+    Raises:
+        ValueError: Model bilinmiyorsa veya Coqui ile yüklenemiyorsa
+    """
+    from voice_catalog import TurkishTTSModels
+    
+    if model_id.startswith("tts_models/"):
+        return model_id
+    
+    model = TurkishTTSModels.get_model_by_id(model_id)
+    if model is None:
+        raise ValueError(f"Bilinmeyen TTS modeli: {model_id}")
+    if model['engine'] != "coqui":
+        raise ValueError(f"{model['name']} bu sürümde desteklenmiyor (yalnızca Coqui modelleri)")
+    return model['model_path']
+
+
+def create_engine(
+    model_id: str,
+    voice_sample_path: Optional[str] = None,
+    use_progress_bar: bool = True,
+    temp_dir: Optional[str] = None,
+    speed: float = 1.0,
+    pitch: int = 0,
+    emotion: str = "neutral"
+) -> M1OptimizedTTS:
+    """
+    Model ID'sine göre TTS motoru oluştur
+    
+    Args:
+        model_id: TurkishTTSModels ID'si (xtts_v2, vits_tr, tacotron2_tr)
+        voice_sample_path: Referans ses (yalnızca XTTS için gerekli)
+        use_progress_bar: Progress bar kullan
+        temp_dir: Geçici ses parçaları klasörü (None ise motora özel)
+        speed: Konuşma hızı (model içinde, desteklenmiyorsa WSOLA ile)
+        pitch: Ses tonu (-5..+5, faz vokoderi ile son işleme)
+        emotion: Duygu tonu (kazanç + vurgu)
+        
+    Returns:
+        Aynı arayüzü sunan motor (synthesize, iter_audiobook, ...)
+    """
+    if resolve_model_path(model_id) == XTTS_V2_MODEL:
+        if not voice_sample_path:
+            raise ValueError("XTTS v2 için referans ses gerekli")
+        return M1OptimizedTTS(voice_sample_path, use_progress_bar=use_progress_bar, temp_dir=temp_dir,
+                              speed=speed, pitch=pitch, emotion=emotion)
+    return SingleSpeakerTTS(model_id, use_progress_bar=use_progress_bar, temp_dir=temp_dir,
+                            speed=speed, pitch=pitch, emotion=emotion)
+
+
 def test_tts_engine():
     """Test fonksiyonu"""
     import sys
@@ -0,0 +1,273 @@
+"""
+Yerel TTS Sunucusu - OpenAI-compatible /v1/audio/speech
+Cache'lenmiş XTTS modeli ve konuşmacı latent'leri üzerinde çalışır.
+
+CustomTTSAPI bu sunucuya `api_url` değiştirilerek bağlanabilir:
+    CustomTTSAPI("http://API_KEY@render-host:8020")
+
+Başlatma:
+    python tts_server.py --voice voices/benim_sesim.wav --port 8020
+"""
+import argparse
+import asyncio
+import io
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import soundfile as sf
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from pydub import AudioSegment
+
+from tts_engine import M1OptimizedTTS
+from voice_catalog import VoiceCatalog
+
+
+# OpenAI ses adları varsayılan referans sese yönlendirilir
+OPENAI_VOICES = {"alloy", "echo", "fable", "onyx", "nova", "shimmer"}
+
+# OpenAI API ile aynı sınırlar
+MAX_INPUT_CHARS = 4096
+MIN_SPEED, MAX_SPEED = 0.25, 4.0
+
+MEDIA_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "pcm": "audio/pcm"
+}
+
+
+class SpeechRequest(BaseModel):
+    """OpenAI /v1/audio/speech istek gövdesi"""
+    model: str = "tts-1"
+    input: str
+    voice: str = "alloy"
+    response_format: str = "mp3"
+    speed: float = 1.0
+    stream: bool = False
+
+
+class FifoSynthesisQueue:
+    """
+    Sıralı (FIFO) seslendirme kuyruğu
+
+    XTTS modeli tek bir işçi thread'inden kullanılır (model thread-safe değil).
+    İstekler geliş sırasıyla, her biri ayrı bir model çağrısıyla işlenir;
+    kuyruk yalnızca eşzamanlı istekleri sıraya koyar ve taşmayı sınırlar.
+    """
+
+    def __init__(self, engine: M1OptimizedTTS, max_queue: int = 256):
+        """
+        Args:
+            engine: Yüklenmiş TTS motoru
+            max_queue: Kuyruk kapasitesi (dolunca istek reddedilir)
+        """
+        self.engine = engine
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.processed = 0
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str, speaker_wav: str, speed: float = 1.0) -> Future:
+        """
+        İsteği kuyruğa ekle
+
+        Raises:
+            queue.Full: Kuyruk doluysa
+        """
+        future = Future()
+        self._queue.put_nowait((text, speaker_wav, speed, future))
+        return future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            text, speaker_wav, speed, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                wav = self.engine.synthesize(text, speaker_wav, speed=speed)
+                future.set_result(wav)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self.processed += 1
+
+
+def encode_audio(wav: np.ndarray, sample_rate: int, fmt: str) -> bytes:
+    """float32 diziyi istenen formata kodla"""
+    pcm16 = (np.clip(wav, -1.0, 1.0) * 32767).astype(np.int16)
+
+    if fmt == "pcm":
+        return pcm16.tobytes()
+
+    buffer = io.BytesIO()
+    if fmt in ("wav", "flac"):
+        sf.write(buffer, pcm16, sample_rate, format=fmt.upper())
+    else:
+        segment = AudioSegment(
+            pcm16.tobytes(), frame_rate=sample_rate, sample_width=2, channels=1
+        )
+        segment.export(buffer, format="mp3", bitrate="192k")
+    return buffer.getvalue()
+
+
+def wav_stream_header(sample_rate: int) -> bytes:
+    """Uzunluğu bilinmeyen akış için WAV başlığı (boyut alanları maksimum)"""
+    byte_rate = sample_rate * 2
+    return b"".join([
+        b"RIFF", (0xFFFFFFFF).to_bytes(4, "little"), b"WAVE",
+        b"fmt ", (16).to_bytes(4, "little"), (1).to_bytes(2, "little"), (1).to_bytes(2, "little"),
+        sample_rate.to_bytes(4, "little"), byte_rate.to_bytes(4, "little"),
+        (2).to_bytes(2, "little"), (16).to_bytes(2, "little"),
+        b"data", (0xFFFFFFFF).to_bytes(4, "little")
+    ])
+
+
+def iter_stream_audio(engine: M1OptimizedTTS, text: str, speaker_wav: str, fmt: str, speed: float = 1.0):
+    """Akış çıkarımı parçalarını PCM/WAV baytlarına çevir"""
+    if fmt == "wav":
+        yield wav_stream_header(engine.SAMPLE_RATE)
+    for chunk in engine.synthesize_stream(text, speaker_wav, speed=speed):
+        yield (np.clip(chunk, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+
+class VoiceResolver:
+    """İstekteki `voice` alanını referans ses dosyasına çevirir"""
+
+    def __init__(self, default_voice: str, voices_dir: str = "voices"):
+        self.default_voice = default_voice
+        self.voices_dir = Path(voices_dir)
+        self.catalog = VoiceCatalog(voices_dir)
+
+    def resolve(self, voice: str) -> Optional[str]:
+        """
+        Ses adını dosya yoluna çevir
+
+        Sıra: OpenAI ses adı > voices/ içindeki dosya adı > katalog görünen adı.
+        Dosya adları voices/ dışına çıkamaz (../ ve mutlak yollar reddedilir).
+        """
+        name = (voice or "").strip()
+        if not name or name.lower() in OPENAI_VOICES:
+            return self.default_voice
+
+        voices_root = self.voices_dir.resolve()
+        for candidate in (self.voices_dir / name, self.voices_dir / f"{name}.wav"):
+            resolved = candidate.resolve()
+            if resolved.parent == voices_root and resolved.is_file():
+                return str(candidate)
+
+        entry = self.catalog.get_voice_by_name(name)
+        return entry["file_path"] if entry else None
+
+
+def create_app(engine: M1OptimizedTTS, resolver: VoiceResolver,
+               api_key: Optional[str] = None, max_queue: int = 256) -> FastAPI:
+    """FastAPI uygulamasını oluştur"""
+    app = FastAPI(title="Sesli Kitap TTS Sunucusu")
+    synthesis_queue = FifoSynthesisQueue(engine, max_queue=max_queue)
+    started_at = time.time()
+
+    def check_auth(authorization: Optional[str]):
+        if api_key and authorization != f"Bearer {api_key}":
+            raise HTTPException(status_code=401, detail="Geçersiz API anahtarı")
+
+    @app.get("/health")
+    def health() -> Dict:
+        return {
+            "status": "ok",
+            "queue": synthesis_queue.pending(),
+            "processed": synthesis_queue.processed,
+            "uptime_seconds": round(time.time() - started_at, 1)
+        }
+
+    @app.get("/v1/models")
+    def list_models(authorization: Optional[str] = Header(None)) -> Dict:
+        check_auth(authorization)
+        models = ["tts-1", "tts-1-hd", "xtts_v2"]
+        return {"object": "list", "data": [{"id": m, "object": "model"} for m in models]}
+
+    @app.post("/v1/audio/speech")
+    async def speech(request: SpeechRequest, authorization: Optional[str] = Header(None)):
+        check_auth(authorization)
+
+        if not request.input.strip():
+            raise HTTPException(status_code=400, detail="Boş metin")
+        if len(request.input) > MAX_INPUT_CHARS:
+            raise HTTPException(status_code=400, detail=f"Metin en fazla {MAX_INPUT_CHARS} karakter olabilir")
+        if request.response_format not in MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"Desteklenmeyen format: {request.response_format}")
+        if not MIN_SPEED <= request.speed <= MAX_SPEED:
+            raise HTTPException(status_code=400, detail=f"Hız {MIN_SPEED}-{MAX_SPEED} aralığında olmalı")
+
+        speaker_wav = resolver.resolve(request.voice)
+        if speaker_wav is None:
+            raise HTTPException(status_code=404, detail=f"Bilinmeyen ses: {request.voice}")
+        
+        if request.stream:
+            # Akış: GPT çözümlemesi sürerken parçalar gönderilir (model kilidi
+            # kuyruk işçisiyle paylaşıldığından istekler yine sırayla çalışır)
+            if request.response_format not in ("pcm", "wav"):
+                raise HTTPException(status_code=400, detail="Akış yalnızca pcm ve wav formatında destekleniyor")
+            return StreamingResponse(
+                iter_stream_audio(engine, request.input, speaker_wav, request.response_format, request.speed),
+                media_type=MEDIA_TYPES[request.response_format]
+            )
+
+        try:
+            future = synthesis_queue.submit(request.input, speaker_wav, request.speed)
+        except queue.Full:
+            raise HTTPException(status_code=503, detail="Kuyruk dolu, daha sonra tekrar deneyin")
+
+        try:
+            wav = await asyncio.wrap_future(future)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Seslendirme hatası: {e}")
+
+        audio = encode_audio(wav, engine.SAMPLE_RATE, request.response_format)
+        return Response(content=audio, media_type=MEDIA_TYPES[request.response_format])
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible yerel XTTS sunucusu")
+    parser.add_argument("--voice", required=True, help="Varsayılan referans ses (WAV)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8020)
+    parser.add_argument("--api-key", default=None, help="Bearer anahtarı (opsiyonel)")
+    parser.add_argument("--max-queue", type=int, default=256, help="Bekleyen istek sınırı (dolunca 503)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    print("\n" + "="*60)
+    print("🛰️  YEREL TTS SUNUCUSU (OpenAI-compatible)")
+    print("="*60)
+
+    engine = M1OptimizedTTS(args.voice, use_progress_bar=False)
+    resolver = VoiceResolver(args.voice)
+
+    # Varsayılan sesin latent'lerini önceden hazırla
+    engine.get_speaker_latents(args.voice)
+
+    app = create_app(engine, resolver, api_key=args.api_key, max_queue=args.max_queue)
+
+    print(f"📡 Endpoint: http://{args.host}:{args.port}/v1/audio/speech")
+    print("="*60 + "\n")
+
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,13 @@
 Voice Catalog - Hazır Ses Klonları Kataloğu
 """
 import os
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
-import soundfile as sf
+
+from reference_clip import probe_audio, measure_loudness, ensure_reference_clip, MAX_DIRECT_REFERENCE_SECONDS
+from conditioning_bank import ConditioningBank
 
 
 class VoiceCatalog:
@@ -15,115 +18,336 @@ class VoiceCatalog:
         self.voices_dir = Path(voices_dir)
         self.catalog_file = self.voices_dir / "catalog.json"
         self.catalog = self._load_catalog()
+        
+        # Arka plan indeksleyici ile paylaşılır; version her güncellemede artar
+        self._lock = threading.RLock()
+        self.version = 0
+        self._rebuild_indexes()
     
     def _load_catalog(self) -> Dict:
-        """Katalog dosyasını yükle"""
+        """Katalog dosyasını yükle (eski kataloglarda çakışan ID'ler düzeltilir)"""
+        catalog = {"voices": []}
         if self.catalog_file.exists():
             with open(self.catalog_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {"voices": []}
+                catalog = json.load(f)
+        
+        voices = catalog.setdefault('voices', [])
+        next_id = max([catalog.get('next_id', 1)] + [v['id'] + 1 for v in voices])
+        seen = set()
+        for voice in voices:
+            if voice['id'] in seen:
+                voice['id'] = next_id
+                next_id += 1
+            seen.add(voice['id'])
+        catalog['next_id'] = next_id
+        return catalog
     
     def _save_catalog(self):
-        """Katalog dosyasını kaydet"""
-        with open(self.catalog_file, 'w', encoding='utf-8') as f:
+        """Katalog dosyasını atomik olarak kaydet (önce geçici dosya, sonra rename)"""
+        temp_file = self.catalog_file.with_suffix(".json.tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
             json.dump(self.catalog, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.catalog_file)
+    
+    def _rebuild_indexes(self):
+        """
+        ID, yol, ad ve kategori indekslerini ve dropdown seçeneklerini hazırla
+        
+        İndeksler tek bir sözlükte toplanıp tek atamayla değiştirilir; okuyanlar
+        kilit almadan her zaman tutarlı bir görüntü görür.
+        """
+        voices = self.catalog['voices']
+        by_category: Dict[str, List[Dict]] = {}
+        by_name: Dict[str, Dict] = {}
+        for voice in sorted(voices, key=lambda x: x['display_name']):
+            by_category.setdefault(voice['category'], []).append(voice)
+            by_name.setdefault(voice['display_name'].lower(), voice)
+            by_name.setdefault(Path(voice['file_name']).stem.lower(), voice)
+        
+        choices = sorted(
+            (f"{v['display_name']} - {v['artist']} ({v['duration_seconds']}s)", v['file_path'])
+            for v in voices
+        )
+        
+        self._index = {
+            'by_id': {v['id']: v for v in voices},
+            'by_path': {os.path.normpath(v['file_path']): v for v in voices},
+            'by_name': by_name,
+            'by_category': by_category,
+            'sorted': sorted(voices, key=lambda x: x['display_name']),
+            'choices': choices
+        }
     
     def scan_voices(self):
-        """Voices klasöründeki tüm sesleri tara ve katalogla"""
+        """
+        Voices klasöründeki tüm sesleri tara ve katalogla
+        
+        Tarama artımlıdır: dosya boyutu ve değişiklik zamanı kayıttakiyle
+        aynıysa dosya açılmaz. Yeni/değişen dosyalarda yalnızca başlık okunur.
+        Arka planda paralel indeksleme için VoiceIndexer kullanılır.
+        """
         print("\n🔍 Ses klasörü taranıyor...")
         
-        # WAV dosyalarını bul
-        wav_files = list(self.voices_dir.glob("*.wav"))
+        changed_files, removed = self.pending_changes()
+        analyzed = {}
+        for wav_file in changed_files:
+            try:
+                analyzed[wav_file.name] = self.analyze_file(wav_file)
+            except Exception as e:
+                print(f"  ⚠️  {wav_file.name}: {e}")
+        
+        self.apply_updates(analyzed, removed)
+        
+        # Klibi eksik kalmış eski kayıtlar
+        if self.prepare_references():
+            self._save_catalog()
+    
+    def pending_changes(self) -> Tuple[List[Path], List[str]]:
+        """
+        Kataloğa göre değişiklikleri bul (yalnızca stat - dosyalar açılmaz)
         
-        existing_files = {v['file_name'] for v in self.catalog['voices']}
-        new_voices = []
+        Başka bir sesin stil kesiti olan dosyalar (`<ad>_question.wav`,
+        manifest'teki `file` girdileri) ayrı ses olarak listelenmez.
         
-        for wav_file in wav_files:
-            if wav_file.name in existing_files:
+        Returns:
+            (yeni veya değişmiş WAV dosyaları, artık olmayan dosya adları)
+        """
+        with self._lock:
+            existing = {v['file_name']: v for v in self.catalog['voices']}
+        
+        style_files = ConditioningBank.style_files(self.voices_dir)
+        changed_files = []
+        present = set()
+        for wav_file in self.voices_dir.glob("*.wav"):
+            if wav_file.name in style_files:
                 continue
-            
             try:
-                # Ses bilgilerini oku
-                data, sr = sf.read(str(wav_file))
-                duration = len(data) / sr
-                
-                # Otomatik kategori ve isim çıkar
-                name = wav_file.stem
-                
-                # Sanatçı/eser bilgisi varsa ayır
-                artist = "Bilinmiyor"
-                work = name
-                
-                if "OKAN BAYÜLGEN" in name.upper():
-                    artist = "Okan Bayülgen"
-                    work = name.replace("OKAN BAYÜLGENİN SESİYLE", "").replace("OKAN BAYÜLGEN", "").strip()
-                elif "AKIN ALTAN" in name.upper():
-                    artist = "Akın Altan"
-                    work = name.replace("seslendiren Akın ALTAN", "").strip()
-                
-                # Kategorize et
-                if duration < 60:
-                    category = "short_sample"
-                    category_tr = "Kısa Örnek"
-                elif duration < 300:
-                    category = "voice_sample"
-                    category_tr = "Ses Örneği"
-                else:
-                    category = "audiobook"
-                    category_tr = "Sesli Kitap"
-                
-                voice_info = {
-                    "id": len(self.catalog['voices']) + len(new_voices) + 1,
-                    "file_name": wav_file.name,
-                    "file_path": str(wav_file),
-                    "display_name": work,
-                    "artist": artist,
-                    "category": category,
-                    "category_tr": category_tr,
-                    "duration_seconds": round(duration, 1),
-                    "sample_rate": sr,
-                    "language": "tr",
-                    "gender": "male",  # Varsayılan
-                    "quality": "high" if duration > 30 else "medium"
-                }
-                
-                new_voices.append(voice_info)
-                print(f"  ✅ {voice_info['display_name']} - {voice_info['artist']}")
-                
-            except Exception as e:
-                print(f"  ⚠️  {wav_file.name}: {e}")
+                stat = wav_file.stat()
+            except OSError:
+                continue
+            present.add(wav_file.name)
+            voice = existing.get(wav_file.name)
+            if voice is None or not self._is_unchanged(voice, stat):
+                changed_files.append(wav_file)
+        
+        removed = [name for name in existing if name not in present]
+        return changed_files, removed
+    
+    def analyze_file(self, wav_file: Path) -> Dict:
+        """
+        Tek dosyayı analiz et: başlık, seviye ve (uzunsa) referans klibi
+        
+        Thread-safe'tir; katalog durumunu değiştirmez (apply_updates ile uygulanır).
+        """
+        stat = wav_file.stat()
+        
+        # Ses bilgilerini oku (yalnızca başlık - PCM çözülmez)
+        fields = self._audio_fields(probe_audio(str(wav_file)), stat)
+        
+        reference = str(wav_file)
+        if fields['duration_seconds'] > MAX_DIRECT_REFERENCE_SECONDS:
+            reference = ensure_reference_clip(str(wav_file))
+            fields['reference_path'] = reference
+        fields['loudness_db'] = measure_loudness(reference)
+        return fields
+    
+    def apply_updates(self, analyzed: Dict[str, Dict], removed: Optional[List[str]] = None) -> bool:
+        """
+        Analiz sonuçlarını kataloğa tek seferde uygula
+        
+        Yeni katalog kopya üzerinde hazırlanıp referansı değiştirilir; okuyanlar
+        hiçbir zaman yarım güncellenmiş listeyi görmez.
+        
+        Args:
+            analyzed: {dosya adı: analyze_file sonucu}
+            removed: Katalogdan çıkarılacak dosya adları
+            
+        Returns:
+            Katalog değişti mi?
+        """
+        removed = set(removed or [])
+        if not analyzed and not removed:
+            print("\n📝 Yeni ses bulunamadı (tümü zaten katalogda)")
+            return False
         
-        # Yeni sesleri kataloga ekle
-        if new_voices:
-            self.catalog['voices'].extend(new_voices)
+        with self._lock:
+            voices = [dict(v) for v in self.catalog['voices'] if v['file_name'] not in removed]
+            by_name = {v['file_name']: v for v in voices}
+            next_id = self.catalog['next_id']
+            added = updated = 0
+            
+            for file_name, fields in analyzed.items():
+                voice = by_name.get(file_name)
+                if voice is not None:
+                    # Değişen dosya: eski klip/latent bilgisi geçersiz
+                    voice.pop('reference_path', None)
+                    voice.pop('latents_path', None)
+                    voice.update(fields)
+                    updated += 1
+                else:
+                    voice = self._build_voice_info(self.voices_dir / file_name, fields, next_id)
+                    next_id += 1
+                    voices.append(voice)
+                    added += 1
+                    print(f"  ✅ {voice['display_name']} - {voice['artist']}")
+            
+            # ID'ler yeniden kullanılmaz: silinen sesin ID'si başka sese geçmez
+            self.catalog = dict(self.catalog, voices=voices, next_id=next_id)
+            self._rebuild_indexes()
+            self.version += 1
             self._save_catalog()
-            print(f"\n✅ {len(new_voices)} yeni ses kataloğa eklendi!")
+        
+        if added:
+            print(f"\n✅ {added} yeni ses kataloğa eklendi!")
+        if updated:
+            print(f"🔄 {updated} değişen ses güncellendi")
+        if removed:
+            print(f"🗑️  {len(removed)} silinen ses katalogdan çıkarıldı")
+        return True
+    
+    @staticmethod
+    def _is_unchanged(voice: Dict, stat: os.stat_result) -> bool:
+        """Kayıt dosyanın güncel hâlini mi gösteriyor? (boyut + mtime)"""
+        return (voice.get('file_size') == stat.st_size
+                and voice.get('file_mtime') == int(stat.st_mtime))
+    
+    @staticmethod
+    def _audio_fields(info: Dict, stat: os.stat_result) -> Dict:
+        """Başlıktan ve dosya bilgisinden türetilen alanlar"""
+        duration = info['duration']
+        
+        # Kategorize et
+        if duration < 60:
+            category = "short_sample"
+            category_tr = "Kısa Örnek"
+        elif duration < 300:
+            category = "voice_sample"
+            category_tr = "Ses Örneği"
         else:
-            print("\n📝 Yeni ses bulunamadı (tümü zaten katalogda)")
+            category = "audiobook"
+            category_tr = "Sesli Kitap"
+        
+        return {
+            "category": category,
+            "category_tr": category_tr,
+            "duration_seconds": round(duration, 1),
+            "sample_rate": info['sample_rate'],
+            "quality": "high" if duration > 30 else "medium",
+            "file_size": stat.st_size,
+            "file_mtime": int(stat.st_mtime)
+        }
     
-    def get_voices_by_category(self, category: Optional[str] = None) -> List[Dict]:
-        """Kategoriye göre sesleri getir"""
-        voices = self.catalog['voices']
+    def _build_voice_info(self, wav_file: Path, fields: Dict, voice_id: int) -> Dict:
+        """Yeni ses için katalog kaydı oluştur"""
+        # Otomatik kategori ve isim çıkar
+        name = wav_file.stem
         
-        if category:
-            voices = [v for v in voices if v['category'] == category]
+        # Sanatçı/eser bilgisi varsa ayır
+        artist = "Bilinmiyor"
+        work = name
+        
+        if "OKAN BAYÜLGEN" in name.upper():
+            artist = "Okan Bayülgen"
+            work = name.replace("OKAN BAYÜLGENİN SESİYLE", "").replace("OKAN BAYÜLGEN", "").strip()
+        elif "AKIN ALTAN" in name.upper():
+            artist = "Akın Altan"
+            work = name.replace("seslendiren Akın ALTAN", "").strip()
+        
+        voice_info = {
+            "id": voice_id,
+            "file_name": wav_file.name,
+            "file_path": str(wav_file),
+            "display_name": work,
+            "artist": artist,
+            "language": "tr",
+            "gender": "male"  # Varsayılan
+        }
+        voice_info.update(fields)
+        return voice_info
+    
+    def _attach_reference(self, voice: Dict) -> bool:
+        """Uzun kayda referans klibi ekle (klip zaten varsa False)"""
+        if voice['duration_seconds'] <= MAX_DIRECT_REFERENCE_SECONDS:
+            return False
+        if voice.get('reference_path') and os.path.exists(voice['reference_path']):
+            return False
         
-        return sorted(voices, key=lambda x: x['display_name'])
+        try:
+            voice['reference_path'] = ensure_reference_clip(voice['file_path'])
+            voice.pop('latents_path', None)
+            return True
+        except Exception as e:
+            print(f"  ⚠️  Referans klibi çıkarılamadı ({voice['file_name']}): {e}")
+            return False
+    
+    def prepare_references(self) -> int:
+        """
+        Uzun kayıtlar için kısa referans kliplerini hazırla (bir kez)
+        
+        Returns:
+            Klibi yeni çıkarılan ses sayısı
+        """
+        with self._lock:
+            return sum(self._attach_reference(voice) for voice in self.catalog['voices'])
+    
+    def precompute_latents(self, engine) -> int:
+        """
+        Referans kliplerinin XTTS latent'lerini önceden hesapla ve kayda ekle
+        
+        Args:
+            engine: M1OptimizedTTS (model yüklü)
+            
+        Returns:
+            Latent'i yeni hesaplanan ses sayısı
+        """
+        with self._lock:
+            pending = [
+                voice for voice in self.catalog['voices']
+                if not (voice.get('latents_path') and os.path.exists(voice['latents_path']))
+            ]
+        
+        # Hesaplama kilit dışında: katalog okumaları beklemez
+        latents = {}
+        for voice in pending:
+            reference = voice.get('reference_path') or voice['file_path']
+            try:
+                engine.get_speaker_latents(reference)
+                latents[voice['file_name']] = engine.latent_cache_path(reference)
+            except Exception as e:
+                print(f"  ⚠️  Latent hesaplanamadı ({voice['file_name']}): {e}")
+        
+        if latents:
+            with self._lock:
+                for voice in self.catalog['voices']:
+                    if voice['file_name'] in latents:
+                        voice['latents_path'] = latents[voice['file_name']]
+                self._save_catalog()
+        return len(latents)
+    
+    def get_voices_by_category(self, category: Optional[str] = None) -> List[Dict]:
+        """Kategoriye göre sesleri getir (ada göre sıralı, indeksten)"""
+        index = self._index
+        if category:
+            return list(index['by_category'].get(category, []))
+        return list(index['sorted'])
     
     def get_voice_by_id(self, voice_id: int) -> Optional[Dict]:
         """ID'ye göre ses bilgisi getir"""
-        for voice in self.catalog['voices']:
-            if voice['id'] == voice_id:
-                return voice
-        return None
+        return self._index['by_id'].get(voice_id)
+    
+    def get_voice_by_path(self, file_path: str) -> Optional[Dict]:
+        """Dosya yoluna göre ses bilgisi getir"""
+        return self._index['by_path'].get(os.path.normpath(file_path))
+    
+    def get_voice_by_name(self, name: str) -> Optional[Dict]:
+        """Görünen ada veya dosya adına (uzantısız) göre ses getir - büyük/küçük harf duyarsız"""
+        return self._index['by_name'].get(name.strip().lower())
     
     def get_voice_choices(self) -> List[tuple]:
-        """Gradio dropdown için ses seçenekleri"""
-        choices = []
-        for voice in self.catalog['voices']:
-            label = f"{voice['display_name']} - {voice['artist']} ({voice['duration_seconds']}s)"
-            choices.append((label, voice['file_path']))
-        return sorted(choices)
+        """Gradio dropdown için ses seçenekleri (önceden sıralanmış)"""
+        return list(self._index['choices'])
     
     def print_catalog(self):
         """Kataloğu güzelce yazdır"""
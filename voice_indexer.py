@@ -0,0 +1,131 @@
+"""
+Voice Indexer - Ses Kütüphanesinin Arka Planda İndekslenmesi
+voices/ klasörü izlenir; yeni veya değişen dosyalar thread havuzunda analiz
+edilir (başlık, seviye, referans klibi) ve katalog tek seferde güncellenir.
+Model yüklüyse yeni seslerin XTTS latent'leri de önceden hesaplanır.
+
+İzleme watchdog kuruluysa dosya sistemi olaylarıyla, değilse periyodik
+stat karşılaştırmasıyla (polling) yapılır.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from voice_catalog import VoiceCatalog
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """WAV değişikliklerinde indeksleyiciyi uyandır"""
+
+    def __init__(self, wake: threading.Event):
+        self.wake = wake
+
+    def on_any_event(self, event):
+        paths = (getattr(event, 'src_path', ''), getattr(event, 'dest_path', ''))
+        if any(str(path).lower().endswith('.wav') for path in paths):
+            self.wake.set()
+
+
+class VoiceIndexer:
+    """Kataloğu güncel tutan arka plan indeksleyici"""
+
+    def __init__(
+        self,
+        catalog: VoiceCatalog,
+        poll_interval: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        engine_provider: Optional[Callable[[], object]] = None
+    ):
+        """
+        Args:
+            catalog: Güncellenecek katalog
+            poll_interval: Kontrol aralığı (sn, None ise SESLIKITAP_VOICE_POLL_SECONDS, varsayılan 5)
+            max_workers: Analiz thread sayısı (None = CPU sayısına göre, en fazla 4)
+            engine_provider: Latent hesaplamak için motor döndüren fonksiyon
+                (model yüklü değilse None döndürmeli - indeksleyici model yüklemez)
+        """
+        if poll_interval is None:
+            poll_interval = float(os.getenv("SESLIKITAP_VOICE_POLL_SECONDS", "5"))
+        self.catalog = catalog
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.engine_provider = engine_provider
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def index_once(self) -> bool:
+        """
+        Değişen dosyaları paralel analiz et ve kataloğa uygula
+
+        Returns:
+            Katalog değişti mi?
+        """
+        changed_files, removed = self.catalog.pending_changes()
+        if not changed_files and not removed:
+            return False
+
+        started = time.time()
+        analyzed = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="voice-index") as executor:
+            futures = {executor.submit(self.catalog.analyze_file, f): f for f in changed_files}
+            for future, wav_file in futures.items():
+                try:
+                    analyzed[wav_file.name] = future.result()
+                except Exception as e:
+                    print(f"  ⚠️  {wav_file.name}: {e}")
+
+        updated = self.catalog.apply_updates(analyzed, removed)
+        print(f"📚 Ses kütüphanesi indekslendi: {len(analyzed)} dosya ({time.time() - started:.1f} sn)")
+
+        engine = self.engine_provider() if self.engine_provider else None
+        if engine is not None:
+            self.catalog.precompute_latents(engine)
+        return updated
+
+    def start(self) -> "VoiceIndexer":
+        """İzlemeyi başlat (birden fazla çağrı güvenli)"""
+        if self._thread is not None:
+            return self
+
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_ChangeHandler(self._wake), str(self.catalog.voices_dir), recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+
+        self._thread = threading.Thread(target=self._run, name="voice-indexer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """İzlemeyi durdur"""
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.index_once()
+            except Exception as e:
+                print(f"⚠️  Ses indeksleme hatası: {e}")
+
+            # watchdog varsa olay gelene kadar bekler; polling yedek olarak sürer
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._observer is not None:
+                # Kopyalama sürerken dosya yarım olabilir: olaylar yatışsın
+                time.sleep(1.0)
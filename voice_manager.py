@@ -1,34 +1,148 @@
 """
 Voice Manager - Ses yönetimi ve kütüphanesi
+Kayıtlar SQLite'ta tutulur (WAL modu - birden fazla süreç aynı kütüphaneyi
+güvenle paylaşır). Kullanım sayaçları bellekte biriktirilip periyodik olarak
+toplu yazılır; voices_metadata.json yalnızca dışa aktarım biçimidir.
 """
 from pathlib import Path
 from typing import List, Dict, Optional
+from collections import Counter
+import atexit
 import json
 import hashlib
+import os
+import sqlite3
+import threading
 from datetime import datetime
 import shutil
 
 
 class VoiceManager:
-    def __init__(self, voices_dir: str = "voices"):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS voices (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            gender TEXT NOT NULL DEFAULT 'unknown',
+            language TEXT NOT NULL DEFAULT 'tr',
+            file_path TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            usage_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS voice_tags (
+            voice_id TEXT NOT NULL REFERENCES voices(id) ON DELETE CASCADE,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (voice_id, tag)
+        );
+        CREATE INDEX IF NOT EXISTS idx_voices_gender ON voices(gender);
+        CREATE INDEX IF NOT EXISTS idx_voices_language ON voices(language);
+        CREATE INDEX IF NOT EXISTS idx_voices_usage ON voices(usage_count DESC);
+        CREATE INDEX IF NOT EXISTS idx_voice_tags_tag ON voice_tags(tag);
+    """
+    
+    def __init__(self, voices_dir: str = "voices", usage_flush_seconds: Optional[float] = None):
+        """
+        Args:
+            voices_dir: Ses klasörü
+            usage_flush_seconds: Kullanım sayaçlarının yazılma aralığı
+                (None ise SESLIKITAP_USAGE_FLUSH_SECONDS, varsayılan 30)
+        """
         self.voices_dir = Path(voices_dir)
         self.voices_dir.mkdir(exist_ok=True)
         
-        # Metadata dosyası
+        # Veritabanı ve dışa aktarım dosyası
+        self.db_file = self.voices_dir / "voices.db"
         self.metadata_file = self.voices_dir / "voices_metadata.json"
-        self.metadata = self._load_metadata()
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_file), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+        self._import_json_metadata()
+        
+        # Yazma arkası (write-behind) kullanım sayaçları
+        if usage_flush_seconds is None:
+            usage_flush_seconds = float(os.getenv("SESLIKITAP_USAGE_FLUSH_SECONDS", "30"))
+        self.usage_flush_seconds = usage_flush_seconds
+        self._pending_usage = Counter()
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush_usage)
+    
+    def _import_json_metadata(self):
+        """İlk açılışta eski voices_metadata.json kayıtlarını veritabanına aktar"""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM voices LIMIT 1").fetchone():
+                return
+        if not self.metadata_file.exists():
+            return
+        
+        with open(self.metadata_file, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        
+        with self._lock, self._conn:
+            for voice in metadata.values():
+                self._insert(voice)
+        if metadata:
+            print(f"📦 {len(metadata)} ses JSON'dan veritabanına aktarıldı")
+    
+    def _insert(self, voice: Dict):
+        self._conn.execute(
+            """INSERT OR REPLACE INTO voices
+               (id, name, description, gender, language, file_path, file_name,
+                created_at, updated_at, usage_count)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (voice['id'], voice['name'], voice.get('description', ''), voice.get('gender', 'unknown'),
+             voice.get('language', 'tr'), voice['file_path'], voice['file_name'],
+             voice['created_at'], voice['updated_at'], voice.get('usage_count', 0))
+        )
+        self._set_tags(voice['id'], voice.get('tags') or [])
     
-    def _load_metadata(self) -> dict:
-        """Metadata dosyasını yükle"""
-        if self.metadata_file.exists():
-            with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+    def _set_tags(self, voice_id: str, tags: List[str]):
+        self._conn.execute("DELETE FROM voice_tags WHERE voice_id = ?", (voice_id,))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO voice_tags (voice_id, tag) VALUES (?, ?)",
+            [(voice_id, tag) for tag in tags]
+        )
     
-    def _save_metadata(self):
-        """Metadata dosyasını kaydet"""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+    def _rows_to_voices(self, rows: List[sqlite3.Row]) -> List[Dict]:
+        """Satırları eski metadata sözlüğü biçimine çevir (etiketler tek sorguda)"""
+        voices = [dict(row) for row in rows]
+        if not voices:
+            return voices
+        
+        ids = [v['id'] for v in voices]
+        placeholders = ",".join("?" * len(ids))
+        tags: Dict[str, List[str]] = {}
+        for voice_id, tag in self._conn.execute(
+            f"SELECT voice_id, tag FROM voice_tags WHERE voice_id IN ({placeholders}) ORDER BY rowid", ids
+        ):
+            tags.setdefault(voice_id, []).append(tag)
+        
+        for voice in voices:
+            voice['tags'] = tags.get(voice['id'], [])
+            # Henüz yazılmamış kullanımlar da görünsün
+            voice['usage_count'] += self._pending_usage.get(voice['id'], 0)
+        return voices
+    
+    def export_json(self, path: Optional[str] = None) -> str:
+        """
+        Kütüphaneyi JSON olarak dışa aktar (eski voices_metadata.json biçimi)
+        
+        Returns:
+            Yazılan dosya yolu
+        """
+        path = Path(path) if path else self.metadata_file
+        metadata = {voice['id']: voice for voice in self.list_voices()}
+        
+        temp_file = path.with_suffix(".json.tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, path)
+        return str(path)
     
     def add_voice(
         self,
@@ -71,8 +185,8 @@ class VoiceManager:
         # Kopyala
         shutil.copy2(audio_path, new_path)
         
-        # Metadata kaydet
-        self.metadata[voice_id] = {
+        # Kaydet
+        voice = {
             'id': voice_id,
             'name': name,
             'description': description,
@@ -86,7 +200,9 @@ class VoiceManager:
             'usage_count': 0
         }
         
-        self._save_metadata()
+        with self._lock, self._conn:
+            self._insert(voice)
+        self.export_json()
         
         print(f"✅ Ses eklendi: {name} (ID: {voice_id})")
         
@@ -94,7 +210,10 @@ class VoiceManager:
     
     def get_voice(self, voice_id: str) -> Optional[Dict]:
         """Ses bilgilerini getir"""
-        return self.metadata.get(voice_id)
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM voices WHERE id = ?", (voice_id,)).fetchall()
+            voices = self._rows_to_voices(rows)
+        return voices[0] if voices else None
     
     def list_voices(
         self,
@@ -105,73 +224,120 @@ class VoiceManager:
         """
         Sesleri listele (filtreli)
         
+        Filtreleme ve sıralama veritabanı indeksleriyle yapılır.
+        
         Args:
             gender: Cinsiyet filtresi
             language: Dil filtresi
             tags: Etiket filtresi
             
         Returns:
-            Ses listesi
+            Ses listesi (kullanım sayısına göre azalan)
         """
-        
-        voices = list(self.metadata.values())
+        conditions, params = [], []
         
         # Filtrele
         if gender:
-            voices = [v for v in voices if v['gender'] == gender]
+            conditions.append("gender = ?")
+            params.append(gender)
         
         if language:
-            voices = [v for v in voices if v['language'] == language]
+            conditions.append("language = ?")
+            params.append(language)
         
         if tags:
-            voices = [
-                v for v in voices 
-                if any(tag in v['tags'] for tag in tags)
-            ]
+            placeholders = ",".join("?" * len(tags))
+            conditions.append(
+                f"EXISTS (SELECT 1 FROM voice_tags t WHERE t.voice_id = voices.id AND t.tag IN ({placeholders}))"
+            )
+            params.extend(tags)
         
-        # Kullanım sayısına göre sırala
-        voices.sort(key=lambda x: x['usage_count'], reverse=True)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         
+        # Kullanım sayısına göre sırala
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM voices {where} ORDER BY usage_count DESC", params
+            ).fetchall()
+            voices = self._rows_to_voices(rows)
+            pending = bool(self._pending_usage)
+        
+        if pending:
+            # Yazılmamış sayaçlar sırayı değiştirmiş olabilir
+            voices.sort(key=lambda x: x['usage_count'], reverse=True)
         return voices
     
     def update_voice(self, voice_id: str, **kwargs):
         """Ses bilgilerini güncelle"""
-        if voice_id not in self.metadata:
-            raise ValueError(f"Ses bulunamadı: {voice_id}")
-        
         # Güncellenebilir alanlar
-        updatable = ['name', 'description', 'gender', 'language', 'tags']
-        
-        for key, value in kwargs.items():
-            if key in updatable:
-                self.metadata[voice_id][key] = value
-        
-        self.metadata[voice_id]['updated_at'] = datetime.now().isoformat()
-        self._save_metadata()
+        updatable = ['name', 'description', 'gender', 'language']
+        fields = {key: value for key, value in kwargs.items() if key in updatable}
+        fields['updated_at'] = datetime.now().isoformat()
+        
+        with self._lock, self._conn:
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            cursor = self._conn.execute(
+                f"UPDATE voices SET {assignments} WHERE id = ?", [*fields.values(), voice_id]
+            )
+            if cursor.rowcount == 0:
+                raise ValueError(f"Ses bulunamadı: {voice_id}")
+            if 'tags' in kwargs:
+                self._set_tags(voice_id, kwargs['tags'] or [])
+        self.export_json()
         
         print(f"✅ Ses güncellendi: {voice_id}")
     
     def delete_voice(self, voice_id: str):
         """Ses sil"""
-        if voice_id not in self.metadata:
+        voice = self.get_voice(voice_id)
+        if voice is None:
             raise ValueError(f"Ses bulunamadı: {voice_id}")
         
         # Dosyayı sil
-        file_path = Path(self.metadata[voice_id]['file_path'])
+        file_path = Path(voice['file_path'])
         if file_path.exists():
             file_path.unlink()
         
-        # Metadata'dan sil
-        del self.metadata[voice_id]
-        self._save_metadata()
+        # Kayıttan sil (etiketler CASCADE ile)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM voices WHERE id = ?", (voice_id,))
+            self._pending_usage.pop(voice_id, None)
+        self.export_json()
         
         print(f"🗑️  Ses silindi: {voice_id}")
     
     def increment_usage(self, voice_id: str):
-        """Kullanım sayısını artır"""
-        if voice_id in self.metadata:
-            self.metadata[voice_id]['usage_count'] += 1
-            self._save_metadata()
+        """
+        Kullanım sayısını artır (bellekte biriktirilir, periyodik toplu yazılır)
+        """
+        with self._lock:
+            self._pending_usage[voice_id] += 1
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.usage_flush_seconds, self.flush_usage)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush_usage(self) -> int:
+        """
+        Biriken kullanım sayaçlarını tek işlemde yaz
+        
+        Artış olarak yazılır (usage_count + n); diğer süreçlerin
+        yazdıklarının üzerine yazılmaz.
+        
+        Returns:
+            Güncellenen ses sayısı
+        """
+        with self._lock:
+            pending, self._pending_usage = self._pending_usage, Counter()
+            self._flush_timer = None
+            if not pending:
+                return 0
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE voices SET usage_count = usage_count + ? WHERE id = ?",
+                    [(count, voice_id) for voice_id, count in pending.items()]
+                )
+        return len(pending)
     
     def get_voice_path(self, voice_id: str) -> Optional[str]:
         """Ses dosyası yolunu getir"""